@@ -0,0 +1 @@
+# 性能基准脚本包初始化文件
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地帧服务延迟基准
+用本地负载生成器请求 /frame，对比每次启动进程、冷句柄（每次重新打开视频）和热句柄（句柄池复用）
+的延迟分位数
+
+用法:
+    python -m benchmarks.bench_frame_server [视频文件路径] [--requests 100] [--clients 4]
+"""
+
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+from benchmarks.bench_scene_detect import make_test_video
+from src.core.frame_reader import FrameReader
+from src.core.frame_server import FrameServer
+
+
+def fetch(connection: http.client.HTTPConnection, video_path: str, frame_number: int) -> float:
+    """请求一帧，返回耗时（秒）"""
+    start = time.perf_counter()
+    connection.request("GET", f"/frame?path={quote(video_path)}&frame={frame_number}&width=640")
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"请求失败: {response.status}")
+    return time.perf_counter() - start
+
+
+def report(name: str, latencies: list, elapsed: float):
+    """打印延迟分位数"""
+    values = np.array(latencies) * 1000
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    print(f"{name:<14} {len(values):5d} 次  p50 {p50:7.1f} ms  p90 {p90:7.1f} ms  p99 {p99:7.1f} ms  "
+          f"最大 {values.max():7.1f} ms  {len(values) / elapsed:7.1f} 次/秒")
+
+
+def run_sequential(server: FrameServer, video_path: str, frames: list, cold: bool) -> tuple:
+    """单客户端顺序请求；cold 为 True 时每次请求前关闭所有空闲句柄"""
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port)
+    latencies = []
+    start = time.perf_counter()
+    for frame_number in frames:
+        if cold:
+            server.pool.clear()
+        latencies.append(fetch(connection, video_path, frame_number))
+    connection.close()
+    return latencies, time.perf_counter() - start
+
+
+def run_concurrent(server: FrameServer, video_path: str, frames: list, clients: int) -> tuple:
+    """多客户端并发请求（每个客户端一个 keep-alive 连接）"""
+    host, port = server.server_address[:2]
+    latencies = []
+    lock = threading.Lock()
+
+    def client(part: list):
+        connection = http.client.HTTPConnection(host, port)
+        local = [fetch(connection, video_path, frame_number) for frame_number in part]
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(frames[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def run_subprocess(video_path: str, frames: list, output_dir: str) -> tuple:
+    """每次请求启动一个 Python 进程（当前各工具的做法）"""
+    latencies = []
+    start = time.perf_counter()
+    for frame_number in frames:
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "frame", video_path, "-o",
+                        os.path.join(output_dir, "frame.jpg"), "--frame", str(frame_number), "--width", "640"],
+                       check=True, stdout=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - begin)
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地帧服务延迟基准")
+    parser.add_argument('video', nargs='?', help="视频文件路径（默认生成1080p测试视频）")
+    parser.add_argument('--requests', type=int, default=100, help="每组请求数")
+    parser.add_argument('--clients', type=int, default=4, help="并发客户端数")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    os.environ["VFE_CACHE_DIR"] = temp_dir.name
+    video_path = args.video
+    if not video_path:
+        video_path = os.path.join(temp_dir.name, "bench_1080p.mp4")
+        print("生成1080p测试视频...")
+        make_test_video(video_path, frames=1200)
+    video_path = os.path.abspath(video_path)
+
+    with FrameReader(video_path) as reader:
+        total_frames = reader.total_frames
+        print(f"视频: {video_path} ({reader.width}×{reader.height}, {total_frames} 帧)")
+
+    rng = random.Random(0)
+    random_frames = [rng.randrange(total_frames) for _ in range(args.requests)]
+    # 顺序浏览：每次向后若干帧，热句柄可继续跳帧而不必 seek
+    sequential_frames = [(i * 5) % total_frames for i in range(args.requests)]
+
+    server = FrameServer(port=0, max_handles=args.clients * 2)
+    server.start()
+    print(f"服务地址: {server.url}\n")
+
+    report("每次启动进程", *run_subprocess(video_path, random_frames[:5], temp_dir.name))
+    report("冷句柄 随机", *run_sequential(server, video_path, random_frames, cold=True))
+    report("热句柄 随机", *run_sequential(server, video_path, random_frames, cold=False))
+    report("冷句柄 顺序", *run_sequential(server, video_path, sequential_frames, cold=True))
+    report("热句柄 顺序", *run_sequential(server, video_path, sequential_frames, cold=False))
+    report(f"热句柄 {args.clients}并发", *run_concurrent(server, video_path, random_frames, args.clients))
+    print(f"\n句柄池: {server.pool.stats()}")
+
+    server.shutdown()
+    server.server_close()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程传帧基准
+对比经管道 pickle 整帧与经共享内存帧环只传描述符的往返耗时（子进程写帧，主进程取回）
+
+用法:
+    python -m benchmarks.bench_shared_frames [--width 3840] [--height 2160] [--frames 100]
+"""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from src.core.shared_frame_ring import SharedFrameRing
+
+
+def pickle_producer(connection, shape: tuple):
+    """子进程：每收到一次请求，经管道发送整帧"""
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    while connection.recv() is not None:
+        frame[0, 0, 0] += 1
+        connection.send(frame)
+
+
+def ring_producer(connection, spec: tuple, shape: tuple):
+    """子进程：每收到一次请求，把帧写入帧环并发送描述符"""
+    ring = SharedFrameRing.attach(spec)
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    while connection.recv() is not None:
+        frame[0, 0, 0] += 1
+        connection.send(ring.write(frame))
+    ring.close()
+
+
+def run(name: str, target, args: tuple, frames: int, receive) -> None:
+    """启动子进程，逐帧请求并统计往返耗时"""
+    context = multiprocessing.get_context('spawn')
+    connection, child_connection = context.Pipe()
+    process = context.Process(target=target, args=(child_connection,) + args)
+    process.start()
+
+    # 预热一次（子进程初始化、页面分配）
+    connection.send(True)
+    receive(connection.recv())
+
+    latencies = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        connection.send(True)
+        frame = receive(connection.recv())
+        latencies.append(time.perf_counter() - start)
+        assert frame is not None
+    connection.send(None)
+    process.join()
+
+    values = np.array(latencies) * 1000
+    p50, p90 = np.percentile(values, [50, 90])
+    print(f"{name:<16} p50 {p50:7.2f} ms  p90 {p90:7.2f} ms  {frames / values.sum() * 1000:7.1f} 帧/秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨进程传帧基准")
+    parser.add_argument('--width', type=int, default=3840, help="帧宽度")
+    parser.add_argument('--height', type=int, default=2160, help="帧高度")
+    parser.add_argument('--frames', type=int, default=100, help="传输帧数")
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    print(f"帧尺寸: {args.width}×{args.height} ({np.prod(shape) / 1024 / 1024:.1f} MB)\n")
+
+    run("pickle 经管道", pickle_producer, (shape,), args.frames, lambda frame: frame)
+
+    with SharedFrameRing.for_frame(args.width, args.height) as ring:
+        run("帧环 复制取回", ring_producer, (ring.spec(), shape), args.frames, ring.read)
+        run("帧环 零复制", ring_producer, (ring.spec(), shape), args.frames, ring.view)
+
+
+if __name__ == "__main__":
+    main()
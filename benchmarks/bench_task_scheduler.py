@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务调度基准
+后台有若干逐帧解码的长任务时，测量交互跳转的延迟：后台任务不让出 与 每帧调用 yield_point 对比；
+并对比线程池中交互任务与批量任务的排队延迟
+
+用法:
+    python -m benchmarks.bench_task_scheduler [视频文件路径] [--background 2] [--seeks 40]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.bench_scene_detect import make_test_video
+from src.core.frame_reader import FrameReader
+from src.core.task_scheduler import TaskScheduler
+
+
+def background_decode(scheduler: TaskScheduler, video_path: str, stop: threading.Event,
+                      cooperative: bool, counter: list):
+    """后台任务：循环顺序解码整个视频，cooperative 时每帧让出"""
+    with FrameReader(video_path) as reader:
+        while not stop.is_set():
+            for _ in reader.iter_range(0, reader.total_frames):
+                if stop.is_set():
+                    break
+                if cooperative:
+                    scheduler.yield_point(TaskScheduler.PRIORITY_BATCH, stop.is_set)
+                counter[0] += 1
+
+
+def measure_seeks(scheduler: TaskScheduler, video_path: str, seeks: int, interval: float) -> np.ndarray:
+    """交互跳转：随机帧号，每次间隔 interval 秒，返回每次耗时（毫秒）"""
+    rng = random.Random(0)
+    latencies = []
+    with FrameReader(video_path) as reader:
+        for _ in range(seeks):
+            frame_number = rng.randrange(reader.total_frames)
+            start = time.perf_counter()
+            with scheduler.active(TaskScheduler.PRIORITY_INTERACTIVE):
+                reader.read_at(frame_number)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(interval)
+    return np.array(latencies) * 1000
+
+
+def run_case(name: str, video_path: str, background: int, cooperative: bool, seeks: int, interval: float):
+    """运行一组：启动后台任务，测量跳转延迟和后台吞吐"""
+    scheduler = TaskScheduler()
+    stop = threading.Event()
+    counter = [0]
+    threads = [threading.Thread(target=background_decode, args=(scheduler, video_path, stop, cooperative, counter))
+               for _ in range(background)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    start = time.perf_counter()
+    values = measure_seeks(scheduler, video_path, seeks, interval)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    p50, p95 = np.percentile(values, [50, 95])
+    print(f"{name:<16} 跳转 p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  最大 {values.max():7.1f} ms  "
+          f"后台 {counter[0] / elapsed:6.1f} 帧/秒")
+
+
+def run_queue(video_path: str, tasks: int):
+    """线程池排队：先提交大量批量任务，再穿插提交交互任务，对比两类的排队延迟"""
+    scheduler = TaskScheduler(workers=2)
+    reader_lock = threading.Lock()
+    reader = FrameReader(video_path)
+
+    def decode(frame_number: int):
+        with reader_lock:
+            return reader.read_at(frame_number) is not None
+
+    rng = random.Random(1)
+    futures = [scheduler.submit(TaskScheduler.PRIORITY_BATCH, decode, i % reader.total_frames) for i in range(tasks)]
+    for _ in range(tasks // 10):
+        futures.append(scheduler.submit(TaskScheduler.PRIORITY_INTERACTIVE, decode,
+                                        rng.randrange(reader.total_frames)))
+        time.sleep(0.02)
+    for future in futures:
+        future.result()
+    scheduler.shutdown()
+    reader.release()
+
+    stats = scheduler.stats()
+    for name in ('interactive', 'batch'):
+        latency = stats[name]['queue_latency']
+        print(f"排队 {name:<12} {latency['count']:5d} 个  平均 {latency['mean_ms']:8.1f} ms  "
+              f"p95 {latency['p95_ms']:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="任务调度基准")
+    parser.add_argument('video', nargs='?', help="视频文件路径（默认生成1080p测试视频）")
+    parser.add_argument('--background', type=int, default=2, help="后台解码任务数")
+    parser.add_argument('--seeks', type=int, default=40, help="跳转次数")
+    parser.add_argument('--interval', type=float, default=0.1, help="两次跳转的间隔（秒）")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    video_path = args.video
+    if not video_path:
+        video_path = os.path.join(temp_dir.name, "bench_1080p.mp4")
+        print("生成1080p测试视频...")
+        make_test_video(video_path, frames=600)
+    print(f"CPU: {os.cpu_count()} 核，后台任务: {args.background}\n")
+
+    run_case("无后台任务", video_path, 0, False, args.seeks, args.interval)
+    run_case("后台不让出", video_path, args.background, False, args.seeks, args.interval)
+    run_case("后台帧边界让出", video_path, args.background, True, args.seeks, args.interval)
+    print()
+    run_queue(video_path, 200)
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩略图条生成耗时基准
+统计冷启动生成和读取缓存的耗时，并按单张缩略图耗时估算1小时1080p视频的生成时间
+
+用法:
+    python -m benchmarks.bench_thumbnail_strip [视频文件路径]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_scene_detect import make_test_video
+from src.core.frame_reader import FrameReader
+from src.core.thumbnail_strip import ThumbnailStripBuilder
+
+
+def main():
+    video_path = sys.argv[1] if len(sys.argv) > 1 else None
+    temp_dir = tempfile.TemporaryDirectory()
+    # 使用临时缓存目录，保证第一次生成是冷启动
+    os.environ["VFE_CACHE_DIR"] = temp_dir.name
+    if not video_path:
+        video_path = os.path.join(temp_dir.name, "bench_1080p.mp4")
+        print("生成1080p测试视频...")
+        make_test_video(video_path, frames=3000)
+
+    with FrameReader(video_path) as reader:
+        total_frames = reader.total_frames
+        fps = reader.fps or 30
+        print(f"视频: {video_path} ({reader.width}×{reader.height}, {total_frames} 帧)")
+
+    builder = ThumbnailStripBuilder()
+    start = time.perf_counter()
+    strip = builder.build(video_path)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ThumbnailStripBuilder().build(video_path)
+    warm = time.perf_counter() - start
+
+    per_thumb = cold / strip.count
+    print(f"冷启动生成 {strip.count} 张: {cold:7.2f} s（每张 {per_thumb * 1000:6.1f} ms）")
+    print(f"读取缓存:           {warm * 1000:7.1f} ms（{strip.nbytes / 1024:.0f} KB）")
+
+    # 缩略图间隔远大于关键帧间隔时，每张耗时约为一次定位+解码到目标帧，与视频时长无关
+    gap = total_frames / strip.count
+    hour_gap = fps * 3600 / builder.count
+    print(f"当前缩略图间隔 {gap:.0f} 帧，1小时视频间隔 {hour_gap:.0f} 帧")
+    print(f"估算1小时1080p视频生成 {builder.count} 张: 约 {per_thumb * builder.count:.1f} s")
+
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
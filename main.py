@@ -2,16 +2,22 @@
 # -*- coding: utf-8 -*-
 """
 视频帧提取器主程序入口
+不带参数时启动图形界面，带子命令时运行命令行模式（见 src/cli.py）
 """
 
 import sys
-from PySide6.QtWidgets import QApplication
-from src.ui.main_window import MainWindow
-from src.utils.config_utils import ConfigUtils
 
 
 def main():
     """主函数"""
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('-psn'):
+        from src.cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+    
+    from PySide6.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+    from src.utils.config_utils import ConfigUtils
+    
     app = QApplication(sys.argv)
     
     # 从配置文件加载信息
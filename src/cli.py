@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行模块
+提供无界面的帧导出和分析命令
+
+用法示例:
+    python main.py scenes video.mp4 --json
+    python main.py export video.mp4 -o frames --mode scene --format WEBP --width 1280
+    python main.py scan videos/ --json
+    python main.py list --min-duration 600 --min-height 1080
+    python main.py batch videos/ -o frames --mode scene --workers 4
+    python main.py watch incoming/ -o frames --mode interval --step 30
+    python main.py serve --port 8765 --handles 16
+    python main.py contact-sheet video.mp4 -o sheet.jpg --columns 10 --interval 10
+    python main.py --perf --perf-output perf.prom export video.mp4 -o frames
+"""
+
+import argparse
+import json
+import signal
+import sys
+from typing import List, Optional
+
+from .core.batch_exporter import BatchExporter
+from .core.capture_pool import CapturePool
+from .core.border_detector import BorderDetector
+from .core.contact_sheet import ContactSheetExporter
+from .core.frame_exporter import FrameExporter
+from .core.folder_watcher import WatchFolderService
+from .core.frame_reader import FrameReader
+from .core.frame_server import FrameServer
+from .core.job_runner import BatchJobRunner
+from .core.media_catalog import MediaCatalog
+from .core.media_prober import MediaProber
+from .core.output_cache import OutputCache
+from .core.perf_stats import PerfStats
+from .core.scene_detector import SceneDetector
+from .core.sharpness_scorer import SharpnessScorer
+from .utils.image_utils import ImageUtils
+
+
+def parse_roi(text: str):
+    """解析裁剪区域参数 x,y,w,h"""
+    values = [int(v) for v in text.split(',')]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("裁剪区域格式应为 x,y,w,h")
+    return tuple(values)
+
+
+def parse_frames(text: str) -> List[int]:
+    """解析帧号列表参数：逗号分隔的帧号，或 @文件（JSON数组或 scenes --json 的输出）"""
+    if text.startswith('@'):
+        with open(text[1:], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('frames') or data.get('cuts') or []
+        return [int(v) for v in data]
+    return [int(v) for v in text.split(',') if v.strip()]
+
+
+def add_output_arguments(parser: argparse.ArgumentParser):
+    """添加输出格式相关参数"""
+    parser.add_argument('--format', default='JPEG', choices=list(ImageUtils.SUPPORTED_FORMATS.keys()),
+                        help="输出图片格式")
+    parser.add_argument('--quality', type=int, default=None, help="编码质量 1-100")
+    parser.add_argument('--width', type=int, default=None, help="输出宽度（只指定一边时保持宽高比）")
+    parser.add_argument('--height', type=int, default=None, help="输出高度（只指定一边时保持宽高比）")
+    parser.add_argument('--roi', type=parse_roi, default=None, help="裁剪区域 x,y,w,h")
+    parser.add_argument('--auto-crop', action='store_true', help="自动检测并去除黑边")
+    parser.add_argument('--dedup', action='store_true', help="跳过近似重复的帧")
+    parser.add_argument('--dedup-threshold', type=int, default=5, help="近似重复的汉明距离阈值（0-64）")
+    parser.add_argument('--dedup-scope', default='recent', choices=['recent', 'global'],
+                        help="去重范围：最近几帧或全部已导出帧（batch / watch 时跨视频比较）")
+    parser.add_argument('--dedup-method', default='dhash', choices=['dhash', 'phash'], help="感知哈希算法")
+
+
+def add_selection_arguments(parser: argparse.ArgumentParser):
+    """添加选帧相关参数"""
+    parser.add_argument('--mode', default='interval', choices=['interval', 'scene', 'sharpest', 'motion'],
+                        help="选帧模式：按步长、每个镜头一帧、每个区间最清晰的一帧或画面变化时导出")
+    parser.add_argument('--step', type=int, default=1,
+                        help="按步长导出时的帧间隔；sharpest 模式下的区间长度；motion 模式下的探测步长")
+    parser.add_argument('--motion-threshold', type=float, default=0.01,
+                        help="motion 模式的触发阈值（变化像素占比 0-1）")
+    parser.add_argument('--motion-cooldown', type=int, default=0,
+                        help="motion 模式两次触发之间的最小间隔（帧）")
+    parser.add_argument('--start', type=int, default=0, help="起始帧号")
+    parser.add_argument('--end', type=int, default=None, help="结束帧号（不含）")
+
+
+def add_job_arguments(parser: argparse.ArgumentParser):
+    """添加续传和输出缓存相关参数"""
+    parser.add_argument('--resume', action='store_true', help="维护任务清单，中断后重新运行时跳过已完成的帧和视频")
+    parser.add_argument('--output-cache', action='store_true',
+                        help="使用输出缓存：相同视频、帧号和输出规格的图片直接硬链接或复制，不再解码编码")
+    parser.add_argument('--cache-size', type=int, default=OutputCache.DEFAULT_MAX_MB, help="输出缓存大小上限（MB）")
+
+
+def build_settings(args) -> dict:
+    """根据命令行参数生成导出规格"""
+    return {
+        'outputs': [{
+            'format': args.format,
+            'quality': args.quality,
+            'width': args.width,
+            'height': args.height,
+        }],
+        'roi': args.roi,
+        'auto_crop': args.auto_crop,
+        'dedup': args.dedup,
+        'dedup_threshold': args.dedup_threshold,
+        'dedup_scope': args.dedup_scope,
+        'dedup_method': args.dedup_method,
+        'mode': getattr(args, 'mode', 'interval'),
+        'frame_step': getattr(args, 'step', 1),
+        'start_frame': getattr(args, 'start', 0),
+        'end_frame': getattr(args, 'end', None),
+        'motion_threshold': getattr(args, 'motion_threshold', 0.01),
+        'motion_cooldown': getattr(args, 'motion_cooldown', 0),
+        'resume': getattr(args, 'resume', False),
+        'output_cache': getattr(args, 'output_cache', False),
+        'output_cache_mb': getattr(args, 'cache_size', OutputCache.DEFAULT_MAX_MB),
+    }
+
+
+def cmd_scenes(args) -> int:
+    """检测镜头切换"""
+    detector = SceneDetector(method=args.method, threshold=args.threshold,
+                             min_scene_len=args.min_scene_len, frame_step=args.step)
+    cuts = detector.detect(args.video)
+    if not cuts:
+        print(f"无法读取视频: {args.video}", file=sys.stderr)
+        return 1
+
+    with FrameReader(args.video) as reader:
+        total_frames, fps = reader.total_frames, reader.fps
+    frames = SceneDetector.representative_frames(cuts, total_frames)
+
+    if args.json:
+        print(json.dumps({'video': args.video, 'fps': fps, 'cuts': cuts, 'frames': frames},
+                         ensure_ascii=False))
+    else:
+        for index, (cut, frame) in enumerate(zip(cuts, frames)):
+            seconds = cut / fps if fps > 0 else 0
+            print(f"镜头 {index + 1:4d}: 起始帧 {cut:8d} ({seconds:9.2f} 秒)  代表帧 {frame}")
+    return 0
+
+
+def cmd_frame(args) -> int:
+    """导出单帧（可在附近窗口内挑选最清晰的一帧）"""
+    with FrameReader(args.video) as reader:
+        if not reader.is_opened():
+            print(f"无法读取视频: {args.video}", file=sys.stderr)
+            return 1
+
+        frame_number = args.frame
+        if args.time is not None:
+            frame_number = int(args.time * reader.fps) if reader.fps > 0 else 0
+
+        if args.sharpest_within > 0:
+            start = max(0, frame_number - args.sharpest_within)
+            window = reader.iter_range(start, frame_number + args.sharpest_within + 1)
+            best = SharpnessScorer.pick_sharpest(window)
+            frame_number, frame = (best[0], best[1]) if best else (frame_number, None)
+        else:
+            frame = reader.read_at(frame_number)
+
+    if frame is None:
+        print(f"读取第 {frame_number} 帧失败", file=sys.stderr)
+        return 1
+
+    settings = build_settings(args)
+    roi = args.roi or (BorderDetector.detect(args.video) if args.auto_crop else None)
+    # 输出格式以文件扩展名为准
+    output = dict(settings['outputs'][0], path=args.output,
+                  format=ImageUtils.get_format_from_extension(args.output))
+    paths = FrameExporter.export_frame(frame, [output], args.output, roi)
+    print(f"已导出第 {frame_number} 帧: {paths[0]}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    """从单个视频导出帧"""
+    exporter = BatchExporter(build_settings(args))
+    stats = exporter.export_video(args.video, args.output_dir, args.frames)
+    print(f"已处理 {stats['frames_processed']} 帧，导出 {stats['frames_exported']} 帧，写入 {stats['files_written']} 个文件，"
+          f"{stats['bytes_written'] / 1024 / 1024:.2f} MB，用时 {stats['elapsed_seconds']:.2f} 秒")
+    if stats['frames_resumed']:
+        print(f"按任务清单跳过上次已完成的 {stats['frames_resumed']} 帧")
+    if stats['cache_hits'] or stats['cache_misses']:
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        print(f"输出缓存命中 {stats['cache_hits']}/{lookups}（{stats['cache_hits'] / lookups:.0%}），"
+              f"其中 {stats['frames_cached']} 帧未解码")
+    if stats['frames_skipped']:
+        print(f"跳过近似重复帧 {stats['frames_skipped']} 帧，"
+              f"约节省 {stats['bytes_saved'] / 1024 / 1024:.2f} MB")
+    if stats['frames_failed']:
+        print(f"导出失败 {stats['frames_failed']} 帧", file=sys.stderr)
+    return 0 if stats['frames_exported'] or stats['frames_resumed'] or stats['frames_cached'] else 1
+
+
+def print_media_info(info: dict, as_json: bool):
+    """输出一条媒体信息"""
+    if as_json:
+        print(json.dumps(info, ensure_ascii=False), flush=True)
+    elif info['error']:
+        print(f"{info['path']}: {info['error']}", flush=True)
+    else:
+        frame_count = info['real_frame_count'] if info.get('real_frame_count') is not None else info['frame_count']
+        print(f"{info['path']}: {info['width']}×{info['height']} {info['fps']:.2f}fps "
+              f"{frame_count} 帧 {info['duration']:.1f} 秒 {info['codec']}", flush=True)
+
+
+def cmd_scan(args) -> int:
+    """扫描目录、探测视频信息并写入媒体库（边扫描边输出）"""
+    catalog = None if args.no_catalog else MediaCatalog()
+    prober = MediaProber(catalog, workers=args.workers, count_frames=args.count_frames)
+    count = 0
+    for info in prober.scan(args.directory, recursive=not args.no_recursive):
+        count += 1
+        print_media_info(info, args.json)
+    if catalog:
+        removed = catalog.remove_missing(args.directory)
+        catalog.close()
+        if removed and not args.json:
+            print(f"从媒体库移除 {removed} 个已不存在的文件", file=sys.stderr)
+    if not args.json:
+        print(f"共 {count} 个视频", file=sys.stderr)
+    return 0
+
+
+def cmd_list(args) -> int:
+    """从媒体库列出或搜索视频（不打开视频文件）"""
+    catalog = MediaCatalog()
+    results = catalog.search(text=args.search, directory=args.directory,
+                             min_duration=args.min_duration, max_duration=args.max_duration,
+                             min_width=args.min_width, min_height=args.min_height,
+                             order_by=args.sort, limit=args.limit)
+    catalog.close()
+    for info in results:
+        print_media_info(info, args.json)
+    if not args.json:
+        print(f"共 {len(results)} 个视频", file=sys.stderr)
+    return 0
+
+
+def cmd_batch(args) -> int:
+    """对目录中的所有视频执行导出"""
+    runner = BatchJobRunner(build_settings(args), workers=args.workers, memory_limit_mb=args.memory_limit)
+    jobs = runner.plan_jobs(args.directory, args.output_dir, recursive=not args.no_recursive)
+    if not jobs:
+        print(f"目录中没有视频文件: {args.directory}", file=sys.stderr)
+        return 1
+    print(f"共 {len(jobs)} 个视频，{sum(job['size'] for job in jobs) / 1024 / 1024:.1f} MB，"
+          f"{runner.workers} 个进程，内存上限 {args.memory_limit} MB")
+
+    def on_job_done(done: int, total: int, stats: dict):
+        status = f"失败: {stats['error']}" if stats.get('error') else (
+            f"导出 {stats['frames_exported']} 帧，{stats['elapsed_seconds']:.1f} 秒，"
+            f"{stats['frames_per_second']:.1f} 帧/秒，{stats['source_mb_per_second']:.1f} MB/秒")
+        if stats.get('frames_resumed'):
+            status += f"（跳过上次已完成的 {stats['frames_resumed']} 帧）"
+        if stats.get('frames_cached'):
+            status += f"（从输出缓存恢复 {stats['frames_cached']} 帧）"
+        if stats.get('frames_failed'):
+            status += f"（导出失败 {stats['frames_failed']} 帧）"
+        print(f"[{done}/{total}] {stats['video']}: {status}")
+
+    runner.progress_callback = on_job_done
+    try:
+        summary = runner.run(jobs)
+    except KeyboardInterrupt:
+        # 撤回未开始的任务，等待子进程在帧边界停止后关闭进程池
+        summary = runner.shutdown(cancel_futures=True)
+        print(f"已取消，导出 {summary['frames_exported']} 帧", file=sys.stderr)
+        return 130
+    print(f"完成 {len(summary['jobs'])} 个视频，导出 {summary['frames_exported']} 帧，"
+          f"写入 {summary['bytes_written'] / 1024 / 1024:.1f} MB，用时 {summary['elapsed_seconds']:.1f} 秒；"
+          f"合计 {summary['frames_per_second']:.1f} 帧/秒，读取 {summary['source_mb_per_second']:.1f} MB/秒")
+    if summary['cache_hits'] or summary['cache_misses']:
+        print(f"输出缓存命中 {summary['cache_hits']}/{summary['cache_hits'] + summary['cache_misses']}"
+              f"（{summary['cache_hit_rate']:.0%}），其中 {summary['frames_cached']} 帧未解码直接恢复")
+    if summary['frames_failed']:
+        print(f"导出失败 {summary['frames_failed']} 帧", file=sys.stderr)
+    if summary['failed']:
+        print(f"失败 {len(summary['failed'])} 个: {', '.join(summary['failed'])}", file=sys.stderr)
+    return 0 if not summary['failed'] else 1
+
+
+def cmd_watch(args) -> int:
+    """监视目录，新视频写入完成后自动导出"""
+    def on_event(event: str, data: dict):
+        if event == 'queued':
+            print(f"发现新视频: {data['video']}（{data['size'] / 1024 / 1024:.1f} MB，等待 {data['queued']} 个）")
+        elif event == 'started':
+            print(f"开始处理: {data['video']}（运行 {data['running']} 个，等待 {data['queued']} 个）")
+        elif data.get('error'):
+            print(f"处理失败: {data['video']}: {data['error']}", file=sys.stderr)
+        else:
+            resumed = f"（跳过已完成的 {data['frames_resumed']} 帧）" if data.get('frames_resumed') else ""
+            if data.get('frames_cached'):
+                resumed += f"（从输出缓存恢复 {data['frames_cached']} 帧）"
+            print(f"处理完成: {data['video']}: 导出 {data['frames_exported']} 帧，{data['elapsed_seconds']:.1f} 秒{resumed}")
+
+    service = WatchFolderService(args.directory, args.output_dir, build_settings(args), workers=args.workers,
+                                 memory_limit_mb=args.memory_limit, settle_seconds=args.settle,
+                                 poll_interval=args.poll_interval, recursive=not args.no_recursive,
+                                 process_existing=not args.skip_existing, use_polling=args.polling,
+                                 callback=on_event)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: service.stop())
+    print(f"正在监视 {args.directory}，按 Ctrl+C 停止")
+    summary = service.run()
+    print(f"已停止，共处理 {summary['jobs_completed']} 个视频，导出 {summary['frames_exported']} 帧")
+    return 0 if not summary['jobs_failed'] else 1
+
+
+def cmd_serve(args) -> int:
+    """启动本地 HTTP 帧服务"""
+    try:
+        server = FrameServer(args.host, args.port, max_handles=args.handles, root=args.root, verbose=args.verbose)
+    except OSError as e:
+        print(f"启动服务失败: {e}", file=sys.stderr)
+        return 1
+    print(f"帧服务已启动: {server.url}（最多 {args.handles} 个视频句柄），按 Ctrl+C 停止")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def cmd_contact_sheet(args) -> int:
+    """导出拼版图及 JSON / WebVTT 索引"""
+    roi = args.roi or (BorderDetector.detect(args.video) if args.auto_crop else None)
+    exporter = ContactSheetExporter(columns=args.columns, rows=args.rows, tile_width=args.tile_width,
+                                    format_name=ImageUtils.get_format_from_extension(args.output),
+                                    quality=args.quality, roi=roi)
+    index = exporter.export(args.video, args.output, count=args.count, interval=args.interval)
+    if not index:
+        return 1
+    print(f"已导出 {len(index['tiles'])} 个格子，共 {len(index['sheets'])} 页: {', '.join(index['sheets'])}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="video-frame-extractor", description="视频帧提取器命令行")
+    parser.add_argument('--perf', action='store_true', help="统计热路径耗时，退出时输出（也可设置 VFE_PERF=1）")
+    parser.add_argument('--perf-output', default=None,
+                        help="性能统计输出文件，.prom/.txt 为 Prometheus 格式，其余为 JSON（默认打印摘要到标准错误）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scenes = subparsers.add_parser('scenes', help="检测镜头切换点")
+    scenes.add_argument('video', help="视频文件路径")
+    scenes.add_argument('--method', default='luma', choices=list(SceneDetector.DEFAULT_THRESHOLDS.keys()),
+                        help="比较方法")
+    scenes.add_argument('--threshold', type=float, default=None, help="切换阈值")
+    scenes.add_argument('--min-scene-len', type=int, default=15, help="最短镜头长度（帧）")
+    scenes.add_argument('--step', type=int, default=1, help="检测步长（帧）")
+    scenes.add_argument('--json', action='store_true', help="以JSON格式输出")
+    scenes.set_defaults(func=cmd_scenes)
+
+    frame = subparsers.add_parser('frame', help="导出单帧")
+    frame.add_argument('video', help="视频文件路径")
+    frame.add_argument('-o', '--output', required=True, help="输出文件路径")
+    position = frame.add_mutually_exclusive_group(required=True)
+    position.add_argument('--frame', type=int, help="帧号")
+    position.add_argument('--time', type=float, help="时间（秒）")
+    frame.add_argument('--sharpest-within', type=int, default=0,
+                       help="在 ±N 帧范围内挑选最清晰的一帧")
+    add_output_arguments(frame)
+    frame.set_defaults(func=cmd_frame)
+
+    export = subparsers.add_parser('export', help="从视频导出帧")
+    export.add_argument('video', help="视频文件路径")
+    export.add_argument('-o', '--output-dir', required=True, help="输出目录")
+    add_selection_arguments(export)
+    export.add_argument('--frames', type=parse_frames, default=None,
+                        help="指定帧号：逗号分隔，或 @文件（如 scenes --json 的输出）")
+    add_job_arguments(export)
+    add_output_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    scan = subparsers.add_parser('scan', help="扫描目录并探测视频信息")
+    scan.add_argument('directory', help="目录路径")
+    scan.add_argument('--no-recursive', action='store_true', help="不包含子目录")
+    scan.add_argument('--workers', type=int, default=MediaProber.DEFAULT_WORKERS, help="探测线程数")
+    scan.add_argument('--no-catalog', action='store_true', help="不读写媒体库（每个文件都重新探测）")
+    scan.add_argument('--count-frames', action='store_true',
+                      help="逐帧计数得到实际帧数并存入媒体库（需完整读取一遍视频，较慢）")
+    scan.add_argument('--json', action='store_true', help="每行输出一个JSON对象")
+    scan.set_defaults(func=cmd_scan)
+
+    listing = subparsers.add_parser('list', help="从媒体库列出或搜索视频")
+    listing.add_argument('directory', nargs='?', default=None, help="只列出该目录下的视频")
+    listing.add_argument('--search', default="", help="路径中包含的文字")
+    listing.add_argument('--min-duration', type=float, default=None, help="最短时长（秒）")
+    listing.add_argument('--max-duration', type=float, default=None, help="最长时长（秒）")
+    listing.add_argument('--min-width', type=int, default=None, help="最小宽度")
+    listing.add_argument('--min-height', type=int, default=None, help="最小高度")
+    listing.add_argument('--sort', default='path', choices=['path', 'duration', 'size', 'height', 'scanned_at'],
+                         help="排序字段")
+    listing.add_argument('--limit', type=int, default=None, help="最多列出条数")
+    listing.add_argument('--json', action='store_true', help="每行输出一个JSON对象")
+    listing.set_defaults(func=cmd_list)
+
+    batch = subparsers.add_parser('batch', help="对目录中的所有视频执行导出（多进程）")
+    batch.add_argument('directory', help="视频所在目录")
+    batch.add_argument('-o', '--output-dir', required=True, help="输出根目录，子目录结构与源目录一致")
+    batch.add_argument('--no-recursive', action='store_true', help="不包含子目录")
+    batch.add_argument('--workers', type=int, default=None, help="进程数（默认CPU核数）")
+    batch.add_argument('--memory-limit', type=int, default=2048, help="同时运行任务的估算内存上限（MB）")
+    add_job_arguments(batch)
+    add_selection_arguments(batch)
+    add_output_arguments(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    watch = subparsers.add_parser('watch', help="监视目录，新视频写入完成后自动导出")
+    watch.add_argument('directory', help="监视的目录")
+    watch.add_argument('-o', '--output-dir', required=True, help="输出根目录，子目录结构与源目录一致")
+    watch.add_argument('--no-recursive', action='store_true', help="不监视子目录")
+    watch.add_argument('--workers', type=int, default=None, help="进程数（默认CPU核数）")
+    watch.add_argument('--memory-limit', type=int, default=2048, help="同时运行任务的估算内存上限（MB）")
+    watch.add_argument('--settle', type=float, default=5.0, help="文件大小保持不变多少秒后开始处理")
+    watch.add_argument('--poll-interval', type=float, default=2.0, help="轮询间隔（秒）")
+    watch.add_argument('--polling', action='store_true', help="强制使用轮询（如网络文件系统上 inotify 收不到事件）")
+    watch.add_argument('--skip-existing', action='store_true', help="不处理启动时已存在的视频")
+    add_job_arguments(watch)
+    add_selection_arguments(watch)
+    add_output_arguments(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    serve = subparsers.add_parser('serve', help="启动本地 HTTP 帧服务（复用已打开的视频句柄）")
+    serve.add_argument('--host', default=FrameServer.DEFAULT_HOST, help="监听地址")
+    serve.add_argument('--port', type=int, default=FrameServer.DEFAULT_PORT, help="监听端口")
+    serve.add_argument('--handles', type=int, default=CapturePool.DEFAULT_MAX_HANDLES,
+                       help="最多同时打开的视频句柄数")
+    serve.add_argument('--root', default=None, help="只允许访问该目录下的视频")
+    serve.add_argument('--verbose', action='store_true', help="输出访问日志")
+    serve.set_defaults(func=cmd_serve)
+
+    sheet = subparsers.add_parser('contact-sheet', help="导出拼版图（附 JSON / WebVTT 索引）")
+    sheet.add_argument('video', help="视频文件路径")
+    sheet.add_argument('-o', '--output', required=True, help="输出图片路径，格式以扩展名为准")
+    sheet.add_argument('--columns', type=int, default=10, help="每页列数")
+    sheet.add_argument('--rows', type=int, default=10, help="每页最大行数，超出时分页")
+    sheet.add_argument('--tile-width', type=int, default=160, help="格子宽度")
+    sampling = sheet.add_mutually_exclusive_group()
+    sampling.add_argument('--count', type=int, default=None, help="均匀采样的帧数（默认一页的格子数）")
+    sampling.add_argument('--interval', type=float, default=None, help="按固定间隔（秒）采样")
+    sheet.add_argument('--quality', type=int, default=None, help="编码质量 1-100")
+    sheet.add_argument('--roi', type=parse_roi, default=None, help="裁剪区域 x,y,w,h")
+    sheet.add_argument('--auto-crop', action='store_true', help="自动检测并去除黑边")
+    sheet.set_defaults(func=cmd_contact_sheet)
+
+    return parser
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数（不含程序名）
+
+    Returns:
+        int: 退出码
+    """
+    args = build_parser().parse_args(argv)
+    if args.perf or args.perf_output:
+        PerfStats.enable()
+    if PerfStats.enabled:
+        PerfStats.dump_at_exit(args.perf_output)
+    return args.func(args)
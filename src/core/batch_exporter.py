@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导出模块
+按导出规格从一个视频中导出多帧，不依赖Qt，可在工作线程或子进程中使用
+"""
+
+import os
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .border_detector import BorderDetector
+from .frame_exporter import FrameExporter
+from .frame_hasher import DuplicateFilter
+from .frame_reader import FrameReader
+from .job_manifest import JobManifest
+from .motion_sampler import MotionSampler
+from .output_cache import OutputCache
+from .scene_detector import SceneDetector
+from .sharpness_scorer import SharpnessScorer
+from ..utils.file_utils import FileUtils
+from ..utils.image_utils import ImageUtils
+
+
+class BatchExporter:
+    """批量导出器类
+
+    导出规格（settings）为字典，支持以下键：
+        outputs:     输出规格列表，格式见 FrameExporter；缺省时按 format/size/quality 生成单一输出
+        format / size / quality: 单一输出时的格式、尺寸和质量
+        roi:         裁剪区域 (x, y, width, height)
+        auto_crop:   为True且未指定 roi 时，自动检测黑边并裁剪
+        mode:        选帧模式，interval（按步长，默认）、scene（每个镜头一帧）、
+                     sharpest（每 frame_step 帧中最清晰的一帧）或 motion（画面变化时导出）
+        frame_step:  interval 模式下每隔多少帧导出一帧；sharpest 模式下的区间长度；
+                     motion 模式下的探测步长，默认1
+        motion_threshold / motion_cooldown: motion 模式的触发阈值和最小触发间隔，见 MotionSampler
+        start_frame / end_frame: 导出范围（end_frame 不含）
+        scene_method / scene_threshold: scene 模式的比较方法和阈值，见 SceneDetector
+        dedup:       为True时跳过与已导出帧近似重复的帧（感知哈希）
+        dedup_threshold / dedup_scope / dedup_method: 汉明距离阈值、比较范围和哈希算法，
+                     见 DuplicateFilter；scope 为 global 时同一导出器处理的所有视频共同去重，
+                     统计信息中附带已导出帧的哈希（frame_hashes），供 BatchJobRunner 跨进程去重
+        resume:      为True时在输出目录维护任务清单（JobManifest），重新运行时跳过已完成的帧
+        output_cache: 为True时使用内容寻址的输出缓存（OutputCache），相同内容直接硬链接或复制
+        output_cache_mb: 输出缓存大小上限（MB）
+    """
+
+    def __init__(self, settings: dict, progress_callback: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            settings: 导出规格
+            progress_callback: 进度回调 (已处理帧数, 计划帧数)
+        """
+        self.settings = settings
+        self.progress_callback = progress_callback
+        self.cancelled = False
+        self.current_stats = None  # 正在导出的视频的统计信息，进度回调中可读取实时数值
+        self.frame_callback = None  # 每导出一帧调用一次 (帧号, 帧)，如批量任务发布预览
+        self.duplicate_filter = None
+        if settings.get('dedup'):
+            self.duplicate_filter = DuplicateFilter(threshold=settings.get('dedup_threshold', 5),
+                                                    scope=settings.get('dedup_scope', 'recent'),
+                                                    method=settings.get('dedup_method', 'dhash'))
+
+    def get_outputs(self) -> list:
+        """获取输出规格列表"""
+        if self.settings.get('outputs'):
+            return self.settings['outputs']
+        return [{
+            'format': self.settings.get('format', 'JPEG'),
+            'size': self.settings.get('size'),
+            'quality': self.settings.get('quality')
+        }]
+
+    def resolve_roi(self, video_path: str):
+        """获取视频的裁剪区域：手动区域优先，其次自动黑边检测"""
+        if self.settings.get('roi'):
+            return tuple(self.settings['roi'])
+        if self.settings.get('auto_crop'):
+            return BorderDetector.detect(video_path)
+        return None
+
+    def cancel(self):
+        """取消导出（在下一帧边界生效）"""
+        self.cancelled = True
+
+    def export_video(self, video_path: str, output_dir: str,
+                     frame_numbers: Optional[Iterable[int]] = None) -> dict:
+        """
+        从视频中导出多帧
+
+        Args:
+            video_path: 视频文件路径
+            output_dir: 输出目录
+            frame_numbers: 要导出的帧号列表，None 表示按 frame_step 和范围导出
+
+        Returns:
+            dict: 导出统计信息
+        """
+        stats = {
+            'video': video_path,
+            'frames_processed': 0,
+            'frames_exported': 0,
+            'frames_failed': 0,  # 编码或写入失败、没有写入任何文件的帧
+            'files_written': 0,
+            'bytes_written': 0,
+            'frames_skipped': 0,
+            'bytes_saved': 0,
+            'frames_resumed': 0,
+            'frames_cached': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'elapsed_seconds': 0.0,
+            'roi': None,
+            'error': None,
+        }
+        if self.duplicate_filter and self.duplicate_filter.scope == 'global':
+            stats['frame_hashes'] = []  # [(帧号, 哈希, [文件路径])]
+        self.current_stats = stats
+        start_time = time.perf_counter()
+
+        manifest = None
+        if self.settings.get('resume'):
+            manifest = JobManifest(JobManifest.manifest_path(output_dir, video_path),
+                                   JobManifest.hash_settings(self.settings))
+            stats['frames_resumed'] = len(manifest.done)
+            if manifest.complete and frame_numbers is None:
+                # 上次已全部完成
+                stats['frames_processed'] = len(manifest.done)
+                return stats
+
+        cache = None
+        fingerprint = None
+        if self.settings.get('output_cache'):
+            fingerprint = FileUtils.get_content_fingerprint(video_path)
+            if fingerprint:
+                cache = OutputCache(max_mb=self.settings.get('output_cache_mb', OutputCache.DEFAULT_MAX_MB))
+
+        with FrameReader(video_path) as reader:
+            if not reader.is_opened():
+                print(f"打开视频失败: {video_path}")
+                stats['error'] = "无法读取视频"
+                if cache:
+                    cache.close()
+                return stats
+
+            roi = self.resolve_roi(video_path)
+            stats['roi'] = roi
+            outputs = self.get_outputs()
+            fps = reader.fps
+
+            def cache_keys(frame_number: int):
+                return [OutputCache.make_key(fingerprint, frame_number, spec, roi) for spec in outputs] if cache else None
+
+            def is_done(frame_number: int) -> bool:
+                """帧是否无需解码：清单中已完成，或所有输出都在缓存中（去重时需要解码比较，不在此恢复）"""
+                if manifest and frame_number in manifest.done:
+                    return True
+                if cache and not self.duplicate_filter:
+                    keys = cache_keys(frame_number)
+                    if all(cache.contains(key) for key in keys):
+                        paths = self.export_frame(video_path, output_dir, frame_number, None, outputs, roi,
+                                                  cache, keys)
+                        if len(paths) == len(outputs):
+                            stats['frames_cached'] += 1
+                            stats['files_written'] += len(paths)
+                            if manifest:
+                                manifest.record(frame_number, frame_number / fps if fps > 0 else 0.0, paths)
+                            return True
+                return False
+
+            frames, planned = self.iter_selected_frames(video_path, reader, frame_numbers, is_done)
+
+            for processed, (frame_number, frame) in enumerate(frames, 1):
+                if self.cancelled:
+                    break
+                stats['frames_processed'] = processed
+                if manifest and frame_number in manifest.done:
+                    # 逐帧顺序处理的模式（sharpest、motion）无法预先过滤，只跳过编码和写入
+                    if self.progress_callback:
+                        self.progress_callback(processed, planned)
+                    continue
+                if frame is None:
+                    # 已处理但无需导出（如运动模式下未触发的探测帧）
+                    if self.progress_callback:
+                        self.progress_callback(processed, planned)
+                    continue
+                if self.duplicate_filter and self.duplicate_filter.is_duplicate(FrameExporter.crop(frame, roi)):
+                    stats['frames_skipped'] += 1
+                    if self.progress_callback:
+                        self.progress_callback(processed, planned)
+                    continue
+                paths = self.export_frame(video_path, output_dir, frame_number, frame, outputs, roi,
+                                          cache, cache_keys(frame_number))
+                if not paths:
+                    stats['frames_failed'] += 1
+                    if self.progress_callback:
+                        self.progress_callback(processed, planned)
+                    continue
+                if manifest:
+                    manifest.record(frame_number, frame_number / fps if fps > 0 else 0.0, paths)
+                stats['frames_exported'] += 1
+                stats['files_written'] += len(paths)
+                stats['bytes_written'] += sum(os.path.getsize(path) for path in paths)
+                if 'frame_hashes' in stats:
+                    stats['frame_hashes'].append((frame_number, self.duplicate_filter.last_hash, paths))
+                if self.frame_callback:
+                    self.frame_callback(frame_number, frame)
+                if self.progress_callback:
+                    self.progress_callback(processed, planned)
+
+        if manifest:
+            # 有导出失败的帧时不标记完成，重新运行时重试这些帧
+            manifest.close(complete=not self.cancelled and frame_numbers is None and not stats['frames_failed'])
+        if cache:
+            stats['cache_hits'], stats['cache_misses'] = cache.hits, cache.misses
+            cache.close()
+
+        if stats['frames_exported']:
+            # 按已导出帧的平均大小估算跳过的重复帧节省的空间
+            average = stats['bytes_written'] / stats['frames_exported']
+            stats['bytes_saved'] = int(average * stats['frames_skipped'])
+        stats['elapsed_seconds'] = time.perf_counter() - start_time
+        return stats
+
+    def get_range(self, total_frames: int) -> Tuple[int, int]:
+        """获取导出范围 (起始帧, 结束帧)，结束帧不含"""
+        start = max(0, self.settings.get('start_frame', 0))
+        end = min(self.settings.get('end_frame') or total_frames, total_frames)
+        return start, end
+
+    def iter_selected_frames(self, video_path: str, reader: FrameReader,
+                             frame_numbers: Optional[Iterable[int]] = None,
+                             skip: Optional[Callable[[int], bool]] = None):
+        """
+        按选帧模式生成待导出的帧
+
+        Args:
+            video_path: 视频文件路径
+            reader: 已打开的帧读取器
+            frame_numbers: 指定的帧号列表，None 表示按选帧模式确定
+            skip: 判断帧是否无需处理的函数，帧号预先确定的模式直接不解码这些帧
+
+        Returns:
+            Tuple[Iterator, int]: ((帧号, BGR帧或None) 迭代器, 计划处理数量)；
+            帧为None表示该位置已处理但无需导出
+        """
+        mode = self.settings.get('mode')
+        if frame_numbers is None and mode == 'sharpest':
+            return self.iter_sharpest_frames(reader)
+
+        if frame_numbers is None and mode == 'motion':
+            start, end = self.get_range(reader.total_frames)
+            sampler = MotionSampler(probe_stride=self.settings.get('frame_step', 1),
+                                    threshold=self.settings.get('motion_threshold', 0.01),
+                                    cooldown=self.settings.get('motion_cooldown', 0))
+            return sampler.iter_probes(reader, start, end), sampler.probe_count(start, end)
+
+        if frame_numbers is None:
+            frame_numbers = self.select_frames(video_path, reader.total_frames)
+        frame_numbers = sorted(set(frame_numbers))
+        if skip:
+            frame_numbers = [n for n in frame_numbers if not skip(n)]
+        return reader.iter_frames(frame_numbers), len(frame_numbers)
+
+    def select_frames(self, video_path: str, total_frames: int) -> list:
+        """
+        根据选帧模式确定要导出的帧号
+
+        Args:
+            video_path: 视频文件路径
+            total_frames: 视频总帧数
+
+        Returns:
+            list: 帧号列表
+        """
+        start, end = self.get_range(total_frames)
+
+        if self.settings.get('mode') == 'scene':
+            detector = SceneDetector(method=self.settings.get('scene_method', 'luma'),
+                                     threshold=self.settings.get('scene_threshold'))
+            cuts = detector.detect(video_path)
+            frames = SceneDetector.representative_frames(cuts, total_frames)
+            return [n for n in frames if start <= n < end]
+
+        return list(range(start, end, max(1, self.settings.get('frame_step', 1))))
+
+    def iter_sharpest_frames(self, reader: FrameReader):
+        """
+        顺序解码一遍，按区间挑选最清晰的一帧
+
+        Args:
+            reader: 已打开的帧读取器
+
+        Returns:
+            Tuple[Iterator, int]: ((帧号, BGR帧) 迭代器, 区间数量)
+        """
+        start, end = self.get_range(reader.total_frames)
+        interval = max(1, self.settings.get('frame_step', 1))
+        planned = max(0, (end - start + interval - 1) // interval)
+
+        def generate():
+            for bucket_start in range(start, end, interval):
+                if self.cancelled:
+                    return
+                window = reader.iter_range(bucket_start, min(bucket_start + interval, end))
+                best = SharpnessScorer.pick_sharpest(window)
+                if best is None:
+                    return
+                yield best[0], best[1]
+
+        return generate(), planned
+
+    def export_frame(self, video_path: str, output_dir: str, frame_number: int,
+                     frame, outputs: list, roi, cache: Optional[OutputCache] = None,
+                     cache_keys: Optional[List[str]] = None) -> list:
+        """
+        导出单帧的所有输出
+
+        Args:
+            cache: 输出缓存，命中的输出直接从缓存恢复，其余正常导出后加入缓存
+            cache_keys: 与 outputs 对应的缓存键
+
+        Returns:
+            list: 写入的文件路径列表（帧为None且缓存未全部命中时可能不完整）
+        """
+        ext = ImageUtils.SUPPORTED_FORMATS.get(outputs[0].get('format', 'JPEG'), ['.jpg'])[0]
+        filename = FileUtils.generate_output_filename(video_path, frame_number, ext[1:])
+        base_path = os.path.join(output_dir, filename)
+        try:
+            if cache is None or cache_keys is None:
+                return FrameExporter.export_frame(frame, outputs, base_path, roi)
+
+            paths = []
+            missing = []
+            for index, (spec, key) in enumerate(zip(outputs, cache_keys)):
+                target = FrameExporter.build_output_path(base_path, spec)
+                if cache.restore(key, target):
+                    paths.append(target)
+                else:
+                    missing.append(index)
+            if missing and frame is not None:
+                written = FrameExporter.export_frame(frame, [outputs[i] for i in missing], base_path, roi)
+                for index, path in zip(missing, written):
+                    cache.put(cache_keys[index], path)
+                paths.extend(written)
+            return paths
+        except Exception as e:
+            print(f"导出帧 {frame_number} 失败: {e}")
+            return []
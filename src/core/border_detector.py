@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+黑边检测模块
+采样若干帧，在缩小的灰度图上用行/列统计计算有效画面区域，结果按视频缓存
+"""
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .frame_reader import FrameReader
+from .memory_budget import MemoryBudget
+from ..utils.file_utils import FileUtils
+
+
+class BorderDetector:
+    """黑边检测器类"""
+
+    # 采样帧数
+    SAMPLE_COUNT = 8
+
+    # 检测用代理图宽度
+    PROXY_WIDTH = 320
+
+    # 灰度值不超过该值视为黑色
+    BLACK_THRESHOLD = 24
+
+    # 行/列中亮像素占比超过该值才视为有效画面
+    ACTIVE_RATIO = 0.02
+
+    # 黑边小于画面尺寸该比例时忽略（视为无黑边）
+    MIN_BORDER_RATIO = 0.01
+
+    # 检测结果缓存的最大条目数
+    MAX_CACHE_ENTRIES = 256
+
+    # 每条检测结果在内存预算中的估算占用（签名元组和裁剪区域）
+    CACHE_ENTRY_BYTES = 256
+
+    # 检测结果缓存（LRU）：文件签名 -> 裁剪区域
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    _consumer = None
+
+    @classmethod
+    def _memory_consumer(cls):
+        """获取检测结果缓存在内存预算中的登记（首次使用时登记）"""
+        with cls._cache_lock:
+            if cls._consumer is None:
+                cls._consumer = MemoryBudget.instance().register(
+                    "黑边检测结果", MemoryBudget.PRIORITY_THUMBNAILS,
+                    lambda: len(cls._cache) * cls.CACHE_ENTRY_BYTES, cls.evict)
+            return cls._consumer
+
+    @classmethod
+    def evict(cls, nbytes: int) -> int:
+        """
+        淘汰最久未使用的检测结果，直到释放至少 nbytes（供内存预算调用）
+
+        Returns:
+            int: 实际释放的字节数
+        """
+        freed = 0
+        with cls._cache_lock:
+            while cls._cache and freed < nbytes:
+                cls._cache.popitem(last=False)
+                freed += cls.CACHE_ENTRY_BYTES
+        return freed
+
+    @classmethod
+    def detect(cls, video_path: str, sample_count: Optional[int] = None) -> Optional[Tuple[int, int, int, int]]:
+        """
+        检测视频的有效画面区域
+
+        Args:
+            video_path: 视频文件路径
+            sample_count: 采样帧数，默认 SAMPLE_COUNT
+
+        Returns:
+            Tuple[int, int, int, int]: 有效区域 (x, y, width, height)，无黑边或检测失败返回None
+        """
+        signature = FileUtils.get_file_signature(video_path)
+        if signature is None:
+            return None
+        with cls._cache_lock:
+            if signature in cls._cache:
+                cls._cache.move_to_end(signature)
+                return cls._cache[signature]
+
+        roi = None
+        try:
+            with FrameReader(video_path) as reader:
+                if reader.is_opened():
+                    indices = FrameReader.sample_indices(reader.total_frames,
+                                                         sample_count or cls.SAMPLE_COUNT)
+                    frames = [frame for _, frame in reader.iter_frames(indices)]
+                    roi = cls.detect_in_frames(frames)
+        except Exception as e:
+            print(f"黑边检测失败: {e}")
+            return None
+
+        # 在锁外申请：预算管理器可能回调本缓存的 evict；额度不足时不缓存
+        if cls._memory_consumer().request(cls.CACHE_ENTRY_BYTES):
+            with cls._cache_lock:
+                cls._cache[signature] = roi
+                while len(cls._cache) > cls.MAX_CACHE_ENTRIES:
+                    cls._cache.popitem(last=False)
+        return roi
+
+    @classmethod
+    def detect_in_frames(cls, frames: List[np.ndarray]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        根据多帧计算有效画面区域
+
+        Args:
+            frames: BGR格式的帧列表（尺寸相同）
+
+        Returns:
+            Tuple[int, int, int, int]: 有效区域 (x, y, width, height)，无黑边返回None
+        """
+        if not frames:
+            return None
+
+        frame_h, frame_w = frames[0].shape[:2]
+        proxy_w = min(cls.PROXY_WIDTH, frame_w)
+        proxy_h = max(1, round(frame_h * proxy_w / frame_w))
+
+        # 各采样帧逐像素取最大值：任意一帧有内容的位置都算有效画面
+        brightest = None
+        for frame in frames:
+            gray = cv2.cvtColor(cv2.resize(frame, (proxy_w, proxy_h), interpolation=cv2.INTER_AREA),
+                                cv2.COLOR_BGR2GRAY)
+            brightest = gray if brightest is None else np.maximum(brightest, gray)
+
+        active = brightest > cls.BLACK_THRESHOLD
+        rows = np.flatnonzero(active.mean(axis=1) > cls.ACTIVE_RATIO)
+        cols = np.flatnonzero(active.mean(axis=0) > cls.ACTIVE_RATIO)
+        if rows.size == 0 or cols.size == 0:
+            # 全黑画面，无法判断
+            return None
+
+        # 边界上的代理像素混合了黑边和画面，有黑边时向内收缩一格
+        first_col = cols[0] + 1 if cols[0] > 0 else 0
+        last_col = cols[-1] - 1 if cols[-1] < proxy_w - 1 else cols[-1]
+        first_row = rows[0] + 1 if rows[0] > 0 else 0
+        last_row = rows[-1] - 1 if rows[-1] < proxy_h - 1 else rows[-1]
+
+        # 映射回原始坐标，边界向内取整，避免残留黑边
+        scale_x, scale_y = frame_w / proxy_w, frame_h / proxy_h
+        x0 = int(np.ceil(first_col * scale_x))
+        x1 = int(np.floor((last_col + 1) * scale_x))
+        y0 = int(np.ceil(first_row * scale_y))
+        y1 = int(np.floor((last_row + 1) * scale_y))
+
+        min_border_x = frame_w * cls.MIN_BORDER_RATIO
+        min_border_y = frame_h * cls.MIN_BORDER_RATIO
+        if x0 <= min_border_x and frame_w - x1 <= min_border_x:
+            x0, x1 = 0, frame_w
+        if y0 <= min_border_y and frame_h - y1 <= min_border_y:
+            y0, y1 = 0, frame_h
+        if (x0, y0, x1, y1) == (0, 0, frame_w, frame_h) or x1 <= x0 or y1 <= y0:
+            return None
+
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    @classmethod
+    def clear_cache(cls):
+        """清空检测结果缓存"""
+        with cls._cache_lock:
+            cls._cache.clear()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频句柄池模块
+复用已打开的 FrameReader（cv2.VideoCapture），避免每次读取都重新打开文件和初始化解码器；
+打开的句柄总数有上限，空闲句柄按最近使用时间淘汰，多线程取用时每个句柄同一时间只借给一个调用方
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .frame_reader import FrameReader
+from .memory_budget import MemoryBudget
+from ..utils.file_utils import FileUtils
+
+
+class CapturePool:
+    """视频句柄池类
+
+    同一文件可以同时借出多个句柄（并发读取同一视频的不同位置）；
+    归还的句柄保留读取位置，再次借出时优先选择位置在目标帧之前且最近的句柄，
+    顺序读取时可以继续 grab() 跳帧而不必 seek
+    """
+
+    # 默认最多同时打开的句柄数（每个句柄占用文件描述符和解码器内存）
+    DEFAULT_MAX_HANDLES = 8
+
+    # 每个句柄估算占用的文件描述符数（视频文件、解码线程的管道等），及为其他文件保留的描述符数
+    FDS_PER_HANDLE = 4
+    RESERVED_FDS = 64
+
+    # 估算每个句柄的解码器内存：解码器内部缓存的参考帧数（YUV420，每像素1.5字节）
+    DECODER_BUFFER_FRAMES = 8
+
+    def __init__(self, max_handles: int = DEFAULT_MAX_HANDLES, name: str = "视频句柄",
+                 budget: Optional[MemoryBudget] = None):
+        """
+        Args:
+            max_handles: 最多同时打开的句柄数（含借出的），不超过文件描述符上限允许的数量
+            name: 在内存诊断中显示的名称
+            budget: 内存预算，None 表示进程共享的实例
+        """
+        fd_limit = self.fd_budget()
+        self.max_handles = max(1, min(max_handles, fd_limit) if fd_limit else max_handles)
+        self.idle = OrderedDict()  # 空闲句柄 -> (路径, 文件签名)，按最近使用排序
+        self.signatures = {}  # 借出的句柄 -> (路径, 文件签名)
+        self.condition = threading.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # 空闲句柄的解码器内存计入内存预算，预算不足时关闭最久未使用的空闲句柄
+        self.consumer = (budget or MemoryBudget.instance()).register(
+            name, MemoryBudget.PRIORITY_HANDLES, self.memory_usage, self.evict)
+
+    @staticmethod
+    def fd_budget() -> Optional[int]:
+        """
+        按进程文件描述符上限估算可同时打开的句柄数
+
+        Returns:
+            int: 句柄数上限，无法获取（如 Windows）或不限制时返回None
+        """
+        try:
+            import resource
+        except ImportError:
+            return None
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit == resource.RLIM_INFINITY:
+            return None
+        return max(1, (soft_limit - CapturePool.RESERVED_FDS) // CapturePool.FDS_PER_HANDLE)
+
+    @property
+    def open_count(self) -> int:
+        """当前打开的句柄数"""
+        with self.condition:
+            return len(self.idle) + len(self.signatures)
+
+    @staticmethod
+    def handle_memory(reader: FrameReader) -> int:
+        """估算一个句柄占用的解码器内存（字节）"""
+        return reader.width * reader.height * 3 // 2 * CapturePool.DECODER_BUFFER_FRAMES
+
+    def memory_usage(self) -> int:
+        """所有打开的句柄估算占用的内存（字节）"""
+        with self.condition:
+            readers = list(self.idle) + list(self.signatures)
+        return sum(self.handle_memory(reader) for reader in readers)
+
+    def evict(self, nbytes: int) -> int:
+        """
+        关闭最久未使用的空闲句柄，直到释放至少 nbytes（供内存预算调用，借出的句柄不受影响）
+
+        Returns:
+            int: 估算释放的字节数
+        """
+        readers, freed = [], 0
+        with self.condition:
+            while self.idle and freed < nbytes:
+                reader, _ = self.idle.popitem(last=False)
+                readers.append(reader)
+                freed += self.handle_memory(reader)
+                self.evictions += 1
+        for reader in readers:
+            reader.release()
+        return freed
+
+    def _pick_idle(self, path: str, signature, frame_number: Optional[int]) -> Optional[FrameReader]:
+        """从空闲句柄中挑选同一文件、读取位置最合适的句柄（需持有锁）"""
+        best, best_distance = None, None
+        for reader, (reader_path, reader_signature) in self.idle.items():
+            if reader_path != path or reader_signature != signature:
+                continue
+            if frame_number is None:
+                return reader
+            distance = frame_number - reader.position
+            # 位置在目标帧之前的句柄可直接跳帧，其余需要 seek，优先级最低
+            distance = distance if distance >= 0 else FrameReader.SEEK_THRESHOLD + 1
+            if best is None or distance < best_distance:
+                best, best_distance = reader, distance
+        return best
+
+    def acquire(self, video_path: str, frame_number: Optional[int] = None,
+                timeout: Optional[float] = None) -> Optional[FrameReader]:
+        """
+        借出一个已打开的句柄
+
+        Args:
+            video_path: 视频文件路径
+            frame_number: 将要读取的帧号，用于挑选读取位置最近的句柄
+            timeout: 句柄数已达上限且全部借出时最长等待秒数，None 表示一直等待
+
+        Returns:
+            FrameReader: 已打开的读取器，文件无法打开或等待超时返回None
+        """
+        path = os.path.abspath(video_path)
+        signature = FileUtils.get_file_signature(path)
+        if signature is None:
+            return None
+
+        evicted = []
+        with self.condition:
+            # 文件已被修改：丢弃该文件的旧句柄
+            for reader, (reader_path, reader_signature) in list(self.idle.items()):
+                if reader_path == path and reader_signature != signature:
+                    del self.idle[reader]
+                    evicted.append(reader)
+
+            while True:
+                reader = self._pick_idle(path, signature, frame_number)
+                if reader is not None:
+                    del self.idle[reader]
+                    self.signatures[reader] = (path, signature)
+                    self.hits += 1
+                    break
+                if len(self.idle) + len(self.signatures) < self.max_handles or self.idle:
+                    if len(self.idle) + len(self.signatures) >= self.max_handles:
+                        # 淘汰最久未使用的空闲句柄
+                        oldest, _ = self.idle.popitem(last=False)
+                        evicted.append(oldest)
+                        self.evictions += 1
+                    # 先占位再在锁外打开文件，打开较慢时不阻塞其他线程
+                    reader = FrameReader()
+                    self.signatures[reader] = (path, signature)
+                    self.misses += 1
+                    break
+                if not self.condition.wait(timeout):
+                    reader = None
+                    break
+
+        for old_reader in evicted:
+            old_reader.release()
+        if reader is not None and not reader.is_opened():
+            if not reader.open(path):
+                self.release(reader, discard=True)
+                return None
+            # 新打开的句柄增加解码器内存，必要时让低优先级的缓存让出空间
+            self.consumer.request(0)
+        return reader
+
+    def release(self, reader: FrameReader, discard: bool = False):
+        """
+        归还句柄
+
+        Args:
+            reader: acquire 借出的读取器
+            discard: 是否直接关闭（如读取出错）
+        """
+        with self.condition:
+            entry = self.signatures.pop(reader, None)
+            if entry is not None and not discard and reader.is_opened():
+                self.idle[reader] = entry
+                reader = None
+            self.condition.notify()
+        if reader is not None:
+            reader.release()
+
+    @contextmanager
+    def checkout(self, video_path: str, frame_number: Optional[int] = None,
+                 timeout: Optional[float] = None) -> Iterator[Optional[FrameReader]]:
+        """
+        以 with 语句借用句柄，结束时自动归还
+
+        Yields:
+            FrameReader: 已打开的读取器，无法打开时为None
+        """
+        reader = self.acquire(video_path, frame_number, timeout)
+        try:
+            yield reader
+        except Exception:
+            if reader is not None:
+                self.release(reader, discard=True)
+                reader = None
+            raise
+        finally:
+            if reader is not None:
+                self.release(reader)
+
+    def clear(self):
+        """关闭所有空闲句柄（借出的句柄归还时仍会保留）"""
+        with self.condition:
+            readers = list(self.idle)
+            self.idle.clear()
+        for reader in readers:
+            reader.release()
+
+    def close(self):
+        """关闭所有空闲句柄并从内存预算注销"""
+        self.clear()
+        self.consumer.unregister()
+
+    def stats(self) -> dict:
+        """
+        获取统计信息
+
+        Returns:
+            dict: open、idle、busy、max_handles、hits、misses、evictions、hit_rate
+        """
+        with self.condition:
+            lookups = self.hits + self.misses
+            return {
+                'open': len(self.idle) + len(self.signatures),
+                'idle': len(self.idle),
+                'busy': len(self.signatures),
+                'max_handles': self.max_handles,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
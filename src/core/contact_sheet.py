@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+拼版导出模块
+把采样帧按网格拼接为一张（或几张）大图，并生成 JSON / WebVTT 索引，
+用于快速浏览和网页播放器的进度条预览
+"""
+
+import json
+import os
+import cv2
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+from .frame_exporter import FrameExporter
+from .frame_reader import FrameReader
+from ..utils.file_utils import FileUtils
+
+
+class ContactSheetExporter:
+    """拼版导出器类
+
+    所有分页共用同一块预分配画布，采样帧直接缩放到画布上对应的格子里；
+    峰值内存约为一页画布加一帧解码图像，与总格子数无关
+    """
+
+    # 单页画布最大边长（WEBP 上限为 16383 像素，其他格式也按此限制）
+    MAX_SHEET_SIDE = 16383
+
+    def __init__(self, columns: int = 10, rows: int = 10, tile_width: int = 160,
+                 format_name: str = 'JPEG', quality: Optional[int] = None,
+                 roi: Optional[Tuple[int, int, int, int]] = None):
+        """
+        Args:
+            columns: 每页列数
+            rows: 每页最大行数
+            tile_width: 格子宽度（高度按视频宽高比计算）
+            format_name: 图片格式名称
+            quality: 编码质量 1-100
+            roi: 可选的裁剪区域 (x, y, width, height)
+        """
+        self.tile_width = max(16, tile_width)
+        self.columns = max(1, min(columns, self.MAX_SHEET_SIDE // self.tile_width))
+        self.rows = max(1, rows)
+        self.format_name = format_name
+        self.quality = quality
+        self.roi = roi
+        self.cancelled = False
+
+    def cancel(self):
+        """取消导出"""
+        self.cancelled = True
+
+    def select_frames(self, reader: FrameReader, count: Optional[int] = None,
+                      interval: Optional[float] = None) -> List[int]:
+        """
+        选择采样帧号
+
+        Args:
+            reader: 已打开的帧读取器
+            count: 采样数量，None 表示一页的格子数
+            interval: 采样间隔（秒），指定后忽略 count
+
+        Returns:
+            List[int]: 升序的帧号列表
+        """
+        if interval:
+            step = max(1, round(interval * reader.fps)) if reader.fps > 0 else 1
+            return list(range(0, reader.total_frames, step))
+        return FrameReader.sample_indices(reader.total_frames, count or self.columns * self.rows, margin=0)
+
+    def export(self, video_path: str, output_path: str, count: Optional[int] = None,
+               interval: Optional[float] = None,
+               progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[dict]:
+        """
+        导出拼版图和索引
+
+        Args:
+            video_path: 视频文件路径
+            output_path: 输出图片路径，分多页时自动追加页码
+            count: 采样数量，None 表示一页的格子数
+            interval: 采样间隔（秒），指定后忽略 count
+            progress_callback: 进度回调 (已完成格子数, 总格子数)
+
+        Returns:
+            dict: 索引信息（同时写入 .json 和 .vtt 文件），失败或取消返回None
+        """
+        with FrameReader(video_path) as reader:
+            if not reader.is_opened() or reader.total_frames <= 0:
+                print(f"无法读取视频: {video_path}")
+                return None
+
+            indices = self.select_frames(reader, count, interval)
+            if not indices:
+                return None
+
+            source_w, source_h = reader.width, reader.height
+            if self.roi:
+                source_w, source_h = self.roi[2], self.roi[3]
+            tile_h = max(1, round(source_h * self.tile_width / max(1, source_w)))
+            rows = max(1, min(self.rows, self.MAX_SHEET_SIDE // tile_h))
+            per_page = self.columns * rows
+            page_count = (len(indices) + per_page - 1) // per_page
+            # 单页时按实际格子数收缩画布
+            page_rows = min(rows, (len(indices) + self.columns - 1) // self.columns)
+            canvas = np.zeros((page_rows * tile_h, self.columns * self.tile_width, 3), dtype=np.uint8)
+
+            sheets = []
+            tiles = []
+            page = -1
+            for position, (frame_number, frame) in enumerate(reader.iter_frames(indices)):
+                if self.cancelled:
+                    return None
+                slot = position % per_page
+                if slot == 0:
+                    if page >= 0:
+                        sheets.append(self._write_page(canvas, output_path, page, page_count))
+                    page += 1
+                    canvas.fill(0)
+
+                x = (slot % self.columns) * self.tile_width
+                y = (slot // self.columns) * tile_h
+                frame = FrameExporter.crop(frame, self.roi)
+                # 直接缩放到画布上的格子里，不产生中间图像
+                cv2.resize(frame, (self.tile_width, tile_h), dst=canvas[y:y + tile_h, x:x + self.tile_width],
+                           interpolation=cv2.INTER_AREA)
+                tiles.append({'sheet': page, 'frame': frame_number,
+                              'time': frame_number / reader.fps if reader.fps > 0 else 0.0,
+                              'x': x, 'y': y, 'w': self.tile_width, 'h': tile_h})
+                if progress_callback:
+                    progress_callback(position + 1, len(indices))
+
+            if not tiles:
+                return None
+            sheets.append(self._write_page(canvas, output_path, page, page_count))
+            duration = reader.total_frames / reader.fps if reader.fps > 0 else 0.0
+
+        index = {
+            'video': video_path,
+            'duration': duration,
+            'columns': self.columns,
+            'tile_width': self.tile_width,
+            'tile_height': tile_h,
+            'sheets': [os.path.basename(path) for path in sheets],
+            'tiles': tiles,
+        }
+        base = os.path.splitext(output_path)[0]
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        with open(f"{base}.vtt", 'w', encoding='utf-8') as f:
+            f.write(self.build_webvtt(index))
+        return index
+
+    def _write_page(self, canvas: np.ndarray, output_path: str, page: int, page_count: int) -> str:
+        """编码并写入一页拼版图"""
+        spec = {'format': self.format_name, 'quality': self.quality}
+        if page_count > 1:
+            spec['suffix'] = f"_{page + 1:03d}"
+        path = FrameExporter.build_output_path(output_path, spec)
+        FileUtils.ensure_directory_exists(path)
+        return FrameExporter._write(path, canvas, self.format_name, self.quality)
+
+    @staticmethod
+    def format_timestamp(seconds: float) -> str:
+        """格式化为 WebVTT 时间戳 HH:MM:SS.mmm"""
+        millis = int(round(seconds * 1000))
+        hours, millis = divmod(millis, 3600000)
+        minutes, millis = divmod(millis, 60000)
+        secs, millis = divmod(millis, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+    @staticmethod
+    def build_webvtt(index: dict) -> str:
+        """
+        根据索引生成 WebVTT 缩略图轨道（每个格子覆盖到下一个格子的时间）
+
+        Args:
+            index: export 返回的索引信息
+
+        Returns:
+            str: WebVTT 文本
+        """
+        lines = ["WEBVTT", ""]
+        tiles = index['tiles']
+        for i, tile in enumerate(tiles):
+            start = 0.0 if i == 0 else tile['time']
+            end = tiles[i + 1]['time'] if i + 1 < len(tiles) else max(index['duration'], tile['time'])
+            if end <= start:
+                continue
+            sheet = index['sheets'][tile['sheet']]
+            lines.append(f"{ContactSheetExporter.format_timestamp(start)} --> "
+                         f"{ContactSheetExporter.format_timestamp(end)}")
+            lines.append(f"{sheet}#xywh={tile['x']},{tile['y']},{tile['w']},{tile['h']}")
+            lines.append("")
+        return "\n".join(lines)
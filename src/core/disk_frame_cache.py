@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+磁盘帧缓存模块
+内存帧缓存之下的第二级缓存：把解码后的帧（可缩小）写入本地磁盘上内存映射文件的固定大小槽位，
+再次访问时是一次 mmap 读取而不是一次解码；每个视频一个缓存文件，按帧号索引，
+文件头记录视频签名，视频被修改后整个文件作废；缓存目录总大小有上限，超出时删除最久未使用的文件
+界面线程通过 put_async 交给后台线程缩小和写入，不在取帧路径上等待磁盘
+"""
+
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .frame_resizer import FrameResizer
+from .memory_budget import MemoryBudget
+from ..utils.cache_utils import CacheUtils
+
+
+class FrameSlotFile:
+    """单个视频的槽位文件（由 DiskFrameCache 管理）
+
+    文件布局: 文件头（魔数、帧尺寸、槽位数、视频签名哈希） | 槽位 -> 帧号索引 | 槽位数据
+    各部分按页对齐，槽位数据直接映射为 (slots, h, w, 3) 数组
+    """
+
+    MAGIC = b"VFEFRM01"
+    HEADER_SIZE = 4096
+    PAGE_SIZE = 4096
+
+    def __init__(self, path: str, signature_hash: str, shape: Tuple[int, int, int], slots: int):
+        """
+        打开或创建槽位文件（签名或帧尺寸不一致时重建）
+
+        Args:
+            path: 文件路径
+            signature_hash: 视频签名的哈希
+            shape: 帧形状 (h, w, 3)
+            slots: 槽位数
+        """
+        self.path = path
+        self.shape = shape
+        self.slots = slots
+        self.slot_bytes = int(np.prod(shape))
+        index_bytes = self._align(8 * slots)
+        self.frames_offset = self.HEADER_SIZE + index_bytes
+        size = self.frames_offset + self.slot_bytes * slots
+
+        header = self._make_header(signature_hash)
+        reuse = False
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, 'rb') as f:
+                reuse = f.read(len(header)) == header
+        if not reuse:
+            # 新建稀疏文件：只有写入过的槽位占用磁盘空间
+            with open(path, 'wb') as f:
+                f.truncate(size)
+                f.write(header)
+
+        self.buffer = np.memmap(path, dtype=np.uint8, mode='r+', shape=(size,))
+        self.index = self.buffer[self.HEADER_SIZE:self.HEADER_SIZE + 8 * slots].view(np.int64)
+        self.frames = self.buffer[self.frames_offset:].reshape((slots,) + shape)
+        if not reuse:
+            self.index[:] = -1
+        # 帧号 -> 槽位，及各槽位最近使用的时刻（只在内存中维护）
+        self.lookup = {int(frame_number): slot for slot, frame_number in enumerate(self.index) if frame_number >= 0}
+        self.free = [slot for slot in range(slots - 1, -1, -1) if self.index[slot] < 0]
+        self.last_used = np.zeros(slots, dtype=np.int64)
+        self.clock = 0
+        os.utime(path)
+
+    @classmethod
+    def _align(cls, size: int) -> int:
+        """向上对齐到页大小"""
+        return (size + cls.PAGE_SIZE - 1) // cls.PAGE_SIZE * cls.PAGE_SIZE
+
+    def _make_header(self, signature_hash: str) -> bytes:
+        """生成文件头"""
+        fields = np.array(list(self.shape) + [self.slots], dtype=np.int64).tobytes()
+        return self.MAGIC + fields + signature_hash.encode('ascii')
+
+    def get(self, frame_number: int) -> Optional[np.ndarray]:
+        """读取一帧（复制出映射区，槽位之后被覆盖也不影响返回值）"""
+        slot = self.lookup.get(frame_number)
+        if slot is None:
+            return None
+        self.clock += 1
+        self.last_used[slot] = self.clock
+        return np.array(self.frames[slot])
+
+    def put(self, frame_number: int, frame: np.ndarray):
+        """写入一帧，槽位已满时覆盖最久未使用的槽位"""
+        if frame_number in self.lookup:
+            return
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = int(np.argmin(self.last_used))
+            del self.lookup[int(self.index[slot])]
+        # 先作废索引再写数据，写入中途退出时不会留下错误的帧
+        self.index[slot] = -1
+        self.frames[slot] = frame
+        self.index[slot] = frame_number
+        self.lookup[frame_number] = slot
+        self.clock += 1
+        self.last_used[slot] = self.clock
+
+    @property
+    def disk_usage(self) -> int:
+        """实际占用的磁盘空间（稀疏文件只计已写入部分）"""
+        return FrameSlotFile.file_disk_usage(self.path)
+
+    @staticmethod
+    def file_disk_usage(path: str) -> int:
+        """文件实际占用的磁盘空间"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0
+        blocks = getattr(stat, 'st_blocks', None)
+        return blocks * 512 if blocks is not None else stat.st_size
+
+    def close(self):
+        """关闭映射（数据由系统写回磁盘）"""
+        self.index = None
+        self.frames = None
+        self.buffer = None
+
+
+class DiskFrameCache:
+    """磁盘帧缓存类（线程安全，接口与 FrameCache 一致：键为 (文件签名, 帧号)）"""
+
+    # 缓存子目录和文件扩展名
+    CACHE_SUBDIR = "frames"
+    FILE_SUFFIX = ".slots"
+
+    # 环境变量：缓存目录总大小上限（MB），0 表示不使用磁盘缓存
+    SIZE_ENV = "VFE_DISK_CACHE_MB"
+    DEFAULT_MAX_MB = 4096
+
+    # 默认缩小到的最大宽度（0 表示保存原始尺寸）
+    DEFAULT_MAX_WIDTH = 1920
+
+    # 同时保持映射的视频数
+    MAX_OPEN_FILES = 4
+
+    # 后台写入队列长度（队列满时丢弃新的写入，不阻塞调用方）
+    WRITE_QUEUE_SIZE = 8
+
+    # 记住的“没有缓存文件”的视频数（避免每次未命中都重新读取文件头）
+    MAX_MISSING = 256
+
+    def __init__(self, max_mb: Optional[int] = None, max_width: int = DEFAULT_MAX_WIDTH,
+                 cache_dir: Optional[str] = None, budget: Optional[MemoryBudget] = None):
+        """
+        Args:
+            max_mb: 缓存目录总大小上限（MB），None 表示读取环境变量或使用默认值
+            max_width: 帧宽度超过该值时等比缩小后保存，0 表示不缩小
+            cache_dir: 缓存目录，None 表示本地缓存目录下的 frames
+            budget: 内存预算，None 表示进程共享的实例
+        """
+        if max_mb is None:
+            max_mb = self.default_max_mb()
+        self.max_bytes = max(0, max_mb) * 1024 * 1024
+        self.max_width = max_width
+        self.cache_dir = cache_dir
+        self.files = OrderedDict()  # 文件签名 -> FrameSlotFile，按最近使用排序
+        self.missing = OrderedDict()  # 没有可用缓存文件的文件签名
+        self.lock = threading.Lock()
+        self.write_queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self.queued_bytes = 0
+        self.queue_lock = threading.Lock()
+        self.writer = None
+        self.dropped_writes = 0
+        # 等待写入的帧计入内存预算，预算不足时最先丢弃（只影响以后的读取速度）
+        self.consumer = (budget or MemoryBudget.instance()).register(
+            "磁盘缓存写入队列", MemoryBudget.PRIORITY_READ_AHEAD, lambda: self.queued_bytes, self.drop_pending)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default_max_mb(cls) -> int:
+        """缓存大小上限：环境变量优先"""
+        value = os.environ.get(cls.SIZE_ENV)
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                print(f"无效的磁盘缓存大小 {cls.SIZE_ENV}={value}，使用默认值")
+        return cls.DEFAULT_MAX_MB
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用"""
+        return self.max_bytes > 0
+
+    def stored_size(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        计算保存尺寸（宽度不超过 max_width，保持宽高比）
+
+        Returns:
+            Tuple[int, int]: (width, height)
+        """
+        if not self.max_width or width <= self.max_width:
+            return width, height
+        return self.max_width, max(1, round(height * self.max_width / width))
+
+    def _directory(self) -> str:
+        """缓存目录"""
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return self.cache_dir
+        return CacheUtils.get_cache_dir(self.CACHE_SUBDIR)
+
+    def _open(self, signature, shape: Optional[Tuple[int, int, int]]) -> Optional[FrameSlotFile]:
+        """打开视频的槽位文件；shape 为 None 时只打开已存在的文件（需持有锁）"""
+        slot_file = self.files.get(signature)
+        if slot_file is not None:
+            self.files.move_to_end(signature)
+            return slot_file
+
+        path_hash = hashlib.sha1(signature[0].encode('utf-8')).hexdigest()
+        path = os.path.join(self._directory(), path_hash + self.FILE_SUFFIX)
+        signature_hash = hashlib.sha1("|".join(str(part) for part in signature).encode('utf-8')).hexdigest()
+        if shape is None:
+            # 只读查询：从文件头取出帧形状，签名不一致说明视频已修改；结果记在内存中，
+            # 同一视频之后的未命中不再读取文件头
+            if signature in self.missing:
+                return None
+            shape = self._read_shape(path, signature_hash)
+            if shape is None:
+                self.missing[signature] = True
+                while len(self.missing) > self.MAX_MISSING:
+                    self.missing.popitem(last=False)
+                return None
+        self.missing.pop(signature, None)
+
+        slot_bytes = int(np.prod(shape))
+        # 单个视频最多占用上限的一半，切换视频时不必清空其他视频的缓存
+        slots = self.max_bytes // 2 // slot_bytes
+        if slots < 1:
+            return None
+        # 视频在打开期间被修改：关闭旧签名的映射，文件随后重建
+        for old_signature, old_file in list(self.files.items()):
+            if old_file.path == path:
+                self.files.pop(old_signature).close()
+        self._make_room(path, slots * slot_bytes)
+        try:
+            slot_file = FrameSlotFile(path, signature_hash, shape, slots)
+        except (OSError, ValueError) as e:
+            print(f"打开磁盘帧缓存失败: {e}")
+            return None
+
+        self.files[signature] = slot_file
+        while len(self.files) > self.MAX_OPEN_FILES:
+            _, old_file = self.files.popitem(last=False)
+            old_file.close()
+        return slot_file
+
+    @staticmethod
+    def _read_shape(path: str, signature_hash: str) -> Optional[Tuple[int, int, int]]:
+        """读取已有文件的帧形状，文件不存在或签名不一致返回None"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(len(FrameSlotFile.MAGIC) + 32 + len(signature_hash))
+        except OSError:
+            return None
+        magic_size = len(FrameSlotFile.MAGIC)
+        if header[:magic_size] != FrameSlotFile.MAGIC or header[magic_size + 32:].decode('ascii', 'replace') != signature_hash:
+            return None
+        h, w, ch, _ = np.frombuffer(header[magic_size:magic_size + 32], dtype=np.int64)
+        return int(h), int(w), int(ch)
+
+    def _make_room(self, path: str, nbytes: int):
+        """删除最久未使用的其他缓存文件，使目录总大小加上 nbytes 不超过上限（需持有锁）"""
+        directory = os.path.dirname(path)
+        entries = []
+        for name in os.listdir(directory):
+            other = os.path.join(directory, name)
+            if name.endswith(self.FILE_SUFFIX) and other != path:
+                try:
+                    entries.append((os.path.getmtime(other), other))
+                except OSError:
+                    continue
+        total = nbytes + sum(FrameSlotFile.file_disk_usage(other) for _, other in entries)
+        open_paths = {slot_file.path: signature for signature, slot_file in self.files.items()}
+        for _, other in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= FrameSlotFile.file_disk_usage(other)
+            if other in open_paths:
+                self.files.pop(open_paths[other]).close()
+            try:
+                os.remove(other)
+            except OSError:
+                pass
+
+    def get(self, signature, frame_number: int) -> Optional[np.ndarray]:
+        """
+        读取缓存的帧
+
+        Args:
+            signature: 视频文件签名（FileUtils.get_file_signature）
+            frame_number: 帧号
+
+        Returns:
+            np.ndarray: BGR 帧（可能是缩小后的尺寸），未缓存返回None
+        """
+        if not self.enabled or signature is None:
+            return None
+        with self.lock:
+            slot_file = self._open(signature, None)
+            frame = slot_file.get(frame_number) if slot_file else None
+            if frame is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return frame
+
+    def put(self, signature, frame_number: int, frame: np.ndarray) -> bool:
+        """
+        缓存一帧（按 max_width 缩小后写入）
+
+        Args:
+            signature: 视频文件签名
+            frame_number: 帧号
+            frame: BGR 帧
+
+        Returns:
+            bool: 是否已写入
+        """
+        if not self.enabled or signature is None or frame is None:
+            return False
+        width, height = self.stored_size(frame.shape[1], frame.shape[0])
+        stored = FrameResizer.resize(frame, (width, height))
+        with self.lock:
+            slot_file = self._open(signature, stored.shape)
+            if slot_file is None or slot_file.shape != stored.shape:
+                return False
+            try:
+                slot_file.put(frame_number, stored)
+            except OSError as e:
+                # 磁盘已满等
+                print(f"写入磁盘帧缓存失败: {e}")
+                return False
+        return True
+
+    def put_async(self, signature, frame_number: int, frame: np.ndarray) -> bool:
+        """
+        在后台线程中缓存一帧（调用方之后不得修改 frame）
+
+        Returns:
+            bool: 是否已加入写入队列（队列已满时丢弃）
+        """
+        if not self.enabled or signature is None or frame is None:
+            return False
+        if self.writer is None:
+            self.writer = threading.Thread(target=self._write_loop, name="disk-frame-cache", daemon=True)
+            self.writer.start()
+        with self.queue_lock:
+            try:
+                self.write_queue.put_nowait((signature, frame_number, frame))
+            except queue.Full:
+                self.dropped_writes += 1
+                return False
+            self.queued_bytes += frame.nbytes
+        return True
+
+    def _write_loop(self):
+        """后台写入线程（收到 None 时退出）"""
+        while True:
+            item = self.write_queue.get()
+            if item is None:
+                return
+            self.put(*item)
+            with self.queue_lock:
+                self.queued_bytes -= item[2].nbytes
+
+    def drop_pending(self, nbytes: int) -> int:
+        """
+        丢弃尚未写入的帧，直到释放至少 nbytes（供内存预算调用，正在写入的帧不受影响）
+
+        Returns:
+            int: 实际释放的字节数
+        """
+        freed = 0
+        with self.queue_lock:
+            while freed < nbytes:
+                try:
+                    item = self.write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # 退出标记放回队列（刚取出一项，不会阻塞）
+                    self.write_queue.put_nowait(None)
+                    break
+                freed += item[2].nbytes
+                self.dropped_writes += 1
+            self.queued_bytes -= freed
+        return freed
+
+    def discard(self, signature):
+        """删除某个视频的缓存文件"""
+        with self.lock:
+            slot_file = self.files.pop(signature, None)
+            if slot_file is not None:
+                slot_file.close()
+                try:
+                    os.remove(slot_file.path)
+                except OSError:
+                    pass
+
+    def close(self):
+        """结束后台写入并关闭所有映射（缓存文件保留，下次打开同一视频时继续使用）"""
+        if self.writer is not None:
+            self.write_queue.put(None)
+            self.writer.join()
+            self.writer = None
+        with self.lock:
+            for slot_file in self.files.values():
+                slot_file.close()
+            self.files.clear()
+
+    def stats(self) -> dict:
+        """
+        获取统计信息
+
+        Returns:
+            dict: open_files、disk_bytes、max_bytes、hits、misses、hit_rate、pending_writes、dropped_writes
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'open_files': len(self.files),
+                'disk_bytes': sum(slot_file.disk_usage for slot_file in self.files.values()),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'pending_writes': self.write_queue.qsize(),
+                'dropped_writes': self.dropped_writes,
+            }
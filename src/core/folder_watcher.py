@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监视目录模块
+长时间运行的无界面入库模式：监视目录中新出现的视频（Linux 上使用 inotify，其他平台退回到
+只重新扫描有变化的目录的轮询），文件大小稳定后按同一导出规格提交给批量任务调度器
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ..utils.file_utils import FileUtils
+from .job_runner import BatchJobRunner
+from .media_catalog import MediaCatalog
+from .media_prober import MediaProber
+
+
+class InotifyWatcher:
+    """基于 inotify 的目录监视器（通过 ctypes 调用 libc，不依赖第三方库）"""
+
+    # inotify 事件掩码（见 <sys/inotify.h>）
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+    # 事件头：int wd, uint32 mask, uint32 cookie, uint32 len
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directory: str, recursive: bool = True):
+        """
+        Args:
+            directory: 监视的目录
+            recursive: 是否监视子目录
+
+        Raises:
+            OSError: 当前平台不支持 inotify
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("当前平台不支持 inotify")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or "libc.so.6", use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self.watches: Dict[int, str] = {}  # 监视描述符 -> 目录
+        self.pending: Set[str] = set()
+        self._add_tree(self.directory)
+
+    def _add_watch(self, directory: str) -> bool:
+        """监视单个目录"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            print(f"监视目录失败: {directory}: {os.strerror(errno)}")
+            return False
+        self.watches[wd] = directory
+        return True
+
+    def _add_tree(self, directory: str):
+        """监视目录（及子目录），并把其中已有的视频加入待处理集合
+
+        先添加监视再扫描，扫描期间新写入的文件最多重复报告一次，不会漏掉
+        """
+        if not self._add_watch(directory):
+            return
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive and self._add_watch(entry.path):
+                                    stack.append(entry.path)
+                            elif FileUtils.is_video_file(entry.name):
+                                self.pending.add(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _rescan(self):
+        """事件队列溢出时重新建立所有监视并全量扫描"""
+        for wd in list(self.watches):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.watches.clear()
+        self._add_tree(self.directory)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        等待目录变化
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            Set[str]: 新出现或写入完成的视频文件路径
+        """
+        if not self.pending:
+            readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+            if readable:
+                self._read_events()
+        changed, self.pending = self.pending, set()
+        return changed
+
+    def _read_events(self):
+        """读取并解析所有已到达的事件"""
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    self._rescan()
+                    return
+                directory = self.watches.get(wd)
+                if mask & self.IN_IGNORED or directory is None:
+                    self.watches.pop(wd, None)
+                    continue
+                if not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        self._add_tree(path)
+                elif FileUtils.is_video_file(name):
+                    self.pending.add(path)
+
+    def close(self):
+        """关闭 inotify 描述符"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """轮询目录监视器
+
+    缓存每个目录的修改时间和内容，每次轮询只对目录本身做一次 stat，
+    只有修改时间变化（有文件新增、删除或改名）的目录才重新读取
+    """
+
+    def __init__(self, directory: str, recursive: bool = True):
+        """
+        Args:
+            directory: 监视的目录
+            recursive: 是否监视子目录
+        """
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        # 目录 -> (修改时间纳秒, 子目录列表, 视频文件名集合)
+        self.directories: Dict[str, Tuple[int, list, Set[str]]] = {}
+        self.first_poll = True
+
+    def _poll(self) -> Set[str]:
+        """检查一次所有目录，返回新出现的视频"""
+        changed = set()
+        seen = set()
+        stack = [self.directory]
+        while stack:
+            current = stack.pop()
+            seen.add(current)
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            cached = self.directories.get(current)
+            if cached and cached[0] == mtime_ns:
+                stack.extend(cached[1])
+                continue
+
+            subdirs, videos = [], set()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    subdirs.append(entry.path)
+                            elif FileUtils.is_video_file(entry.name):
+                                videos.add(entry.name)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            known = cached[2] if cached else set()
+            changed.update(os.path.join(current, name) for name in videos - known)
+            self.directories[current] = (mtime_ns, subdirs, videos)
+            stack.extend(subdirs)
+
+        # 删除已不存在的目录
+        for directory in set(self.directories) - seen:
+            del self.directories[directory]
+        return changed
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        等待目录变化
+
+        Args:
+            timeout: 轮询间隔（秒），首次调用立即返回已有的视频
+
+        Returns:
+            Set[str]: 新出现的视频文件路径
+        """
+        if self.first_poll:
+            self.first_poll = False
+        else:
+            time.sleep(max(0.0, timeout))
+        return self._poll()
+
+    def close(self):
+        """轮询监视器无需释放资源"""
+        pass
+
+
+class WatchFolderService:
+    """监视目录入库服务
+
+    新文件先进入候选集合，大小和修改时间在 settle_seconds 内不再变化后才进入就绪队列；
+    就绪队列中的文件只在调度器的进程数和内存预算允许时提交（背压），
+    其余文件留在队列中等待，不会一次性压入进程池
+    """
+
+    # 有候选文件或运行中的任务时的检查间隔（秒）
+    BUSY_INTERVAL = 0.5
+
+    # 常驻运行时保留的记录上限：汇总信息中最近的任务统计数，已提交文件的签名数
+    # （超出后最早的签名被丢弃，该文件再次出现时由任务清单跳过已完成的帧）
+    JOB_HISTORY = 100
+    MAX_PROCESSED = 10000
+
+    def __init__(self, directory: str, output_root: str, settings: dict, workers: Optional[int] = None,
+                 memory_limit_mb: int = 2048, settle_seconds: float = 5.0, poll_interval: float = 2.0,
+                 recursive: bool = True, process_existing: bool = True, use_polling: bool = False,
+                 callback: Optional[Callable[[str, dict], None]] = None):
+        """
+        Args:
+            directory: 监视的目录
+            output_root: 输出根目录，子目录结构与源目录一致
+            settings: 导出规格，见 BatchExporter（自动启用 resume，重启后跳过已完成的视频）
+            workers: 进程数，None 表示 CPU 核数
+            memory_limit_mb: 同时运行任务的估算内存总上限（MB）
+            settle_seconds: 文件大小保持不变多久后视为写入完成
+            poll_interval: 轮询间隔（秒），inotify 模式下为最长空闲等待时间
+            recursive: 是否监视子目录
+            process_existing: 是否处理启动时目录中已有的视频
+            use_polling: 强制使用轮询
+            callback: 事件回调 (事件名, 数据)，事件名为 queued、started、finished
+        """
+        self.directory = os.path.abspath(directory)
+        self.output_root = output_root
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.recursive = recursive
+        self.process_existing = process_existing
+        self.use_polling = use_polling
+        self.callback = callback
+        self.runner = BatchJobRunner(dict(settings, resume=True), workers=workers, memory_limit_mb=memory_limit_mb,
+                                     history=self.JOB_HISTORY)
+        self.candidates: Dict[str, Tuple[int, int, float]] = {}  # 路径 -> (大小, 修改时间, 开始稳定的时间)
+        self.ready = deque()  # 等待提交的任务
+        self.processed: Dict[str, Tuple[int, int]] = OrderedDict()  # 已提交的文件 -> (大小, 修改时间)，按提交顺序
+        self.stopped = False
+
+    def _create_watcher(self):
+        """创建监视器，inotify 不可用时退回轮询"""
+        if not self.use_polling:
+            try:
+                return InotifyWatcher(self.directory, self.recursive)
+            except OSError as e:
+                print(f"inotify 不可用，改用轮询: {e}")
+        return PollingWatcher(self.directory, self.recursive)
+
+    def _notify(self, event: str, data: dict):
+        """调用事件回调"""
+        if self.callback:
+            self.callback(event, data)
+
+    def stop(self):
+        """请求停止（可在信号处理函数中调用），运行中的任务会在下一帧边界停止"""
+        self.stopped = True
+        self.runner.cancel()
+
+    def _mark_processed(self, path: str, signature: Tuple[int, int]):
+        """记录已提交的文件，超出上限时丢弃最早的记录"""
+        self.processed[path] = signature
+        self.processed.move_to_end(path)
+        while len(self.processed) > self.MAX_PROCESSED:
+            self.processed.popitem(last=False)
+
+    def _check_candidates(self, catalog: MediaCatalog):
+        """检查候选文件，大小稳定的探测一次分辨率后进入就绪队列"""
+        now = time.monotonic()
+        for path, (size, mtime_ns, since) in list(self.candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.candidates[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self.candidates[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            if stat.st_size == 0 or now - since < self.settle_seconds:
+                continue
+
+            del self.candidates[path]
+            if self.processed.get(path) == (size, mtime_ns):
+                continue
+            # 无论能否读取都记录，避免无法解码的文件被反复探测
+            self._mark_processed(path, (size, mtime_ns))
+            info = MediaProber.probe(path, catalog)
+            if not info or info.get('error'):
+                print(f"跳过无法读取的视频: {path}")
+                continue
+            catalog.put(info)
+            self.ready.append(self.runner.make_job(path, self.directory, self.output_root, size,
+                                                   info['width'], info['height']))
+            self._notify('queued', {'video': path, 'size': size, 'queued': len(self.ready)})
+        catalog.save()
+
+    def _dispatch(self):
+        """在进程数和内存预算允许时按到达顺序提交就绪队列中的任务"""
+        while self.ready and self.runner.can_submit(self.ready[0]):
+            job = self.ready.popleft()
+            self.runner.submit(job)
+            self._notify('started', {'video': job['video'], 'running': len(self.runner.running),
+                                     'queued': len(self.ready)})
+
+    def run(self) -> dict:
+        """
+        运行直到调用 stop
+
+        Returns:
+            dict: 汇总信息，见 BatchJobRunner.run
+        """
+        watcher = self._create_watcher()
+        catalog = MediaCatalog()
+        self.runner.start()
+        first = True
+        try:
+            while not self.stopped:
+                busy = self.candidates or self.ready or self.runner.running
+                changed = watcher.wait(self.BUSY_INTERVAL if busy else self.poll_interval)
+                if first and not self.process_existing:
+                    for path in changed:
+                        signature = FileUtils.get_file_signature(path)
+                        if signature:
+                            self._mark_processed(path, signature[1:])
+                    changed = set()
+                first = False
+
+                for path in changed:
+                    if path not in self.candidates:
+                        self.candidates[path] = (-1, -1, time.monotonic())
+                self._check_candidates(catalog)
+                self._dispatch()
+                for stats in self.runner.collect(timeout=0):
+                    self._notify('finished', stats)
+        finally:
+            watcher.close()
+            catalog.close()
+        return self.runner.shutdown()
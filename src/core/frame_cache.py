@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解码帧缓存模块
+在内存中保留最近浏览过的解码帧，来回拖动和切换视频时不必重新 seek 和解码；
+占用计入 MemoryBudget，总预算不足时由预算管理器按最近使用时间淘汰
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from .memory_budget import MemoryBudget
+
+
+class FrameCache:
+    """解码帧缓存类（线程安全的 LRU，键为 (文件签名, 帧号)，文件修改后旧帧自然失效）"""
+
+    # 单个缓存最多保存的帧数（另受内存预算限制）
+    DEFAULT_MAX_FRAMES = 120
+
+    def __init__(self, name: str = "解码帧缓存", max_frames: int = DEFAULT_MAX_FRAMES,
+                 priority: int = MemoryBudget.PRIORITY_FRAME_CACHE,
+                 budget: Optional[MemoryBudget] = None):
+        """
+        Args:
+            name: 在内存诊断中显示的名称
+            max_frames: 最多保存的帧数
+            priority: 淘汰优先级（MemoryBudget.PRIORITY_*）
+            budget: 内存预算，None 表示进程共享的实例
+        """
+        self.max_frames = max(1, max_frames)
+        self.frames = OrderedDict()  # (文件签名, 帧号) -> 帧，按最近使用排序
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.consumer = (budget or MemoryBudget.instance()).register(
+            name, priority, lambda: self.nbytes, self.evict)
+
+    def get(self, signature, frame_number: int) -> Optional[np.ndarray]:
+        """
+        取出缓存的帧（返回的数组只读，需要修改时先 copy）
+
+        Args:
+            signature: 视频文件签名（FileUtils.get_file_signature）
+            frame_number: 帧号
+
+        Returns:
+            np.ndarray: BGR 帧，未缓存返回None
+        """
+        key = (signature, frame_number)
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, signature, frame_number: int, frame: np.ndarray) -> bool:
+        """
+        缓存一帧（先向内存预算申请额度，不足时放弃）
+
+        Args:
+            signature: 视频文件签名
+            frame_number: 帧号
+            frame: BGR 帧（缓存保存引用并设为只读，调用方之后不应再修改）
+
+        Returns:
+            bool: 是否已缓存
+        """
+        if signature is None or frame is None:
+            return False
+        key = (signature, frame_number)
+        with self.lock:
+            if key in self.frames:
+                self.frames.move_to_end(key)
+                return True
+            # 帧数达到上限时先淘汰最旧的帧，再申请额度
+            while len(self.frames) >= self.max_frames:
+                self._pop_oldest()
+        # 在锁外申请：预算管理器可能回调本缓存的 evict
+        if not self.consumer.request(frame.nbytes):
+            return False
+        frame.flags.writeable = False
+        with self.lock:
+            if key not in self.frames:
+                self.frames[key] = frame
+                self.nbytes += frame.nbytes
+        return True
+
+    def _pop_oldest(self) -> int:
+        """淘汰最久未使用的帧，返回释放的字节数（需持有锁）"""
+        _, frame = self.frames.popitem(last=False)
+        self.nbytes -= frame.nbytes
+        return frame.nbytes
+
+    def evict(self, nbytes: int) -> int:
+        """
+        按最近使用时间淘汰，直到释放至少 nbytes（供内存预算调用）
+
+        Returns:
+            int: 实际释放的字节数
+        """
+        freed = 0
+        with self.lock:
+            while self.frames and freed < nbytes:
+                freed += self._pop_oldest()
+        return freed
+
+    def discard(self, signature):
+        """丢弃某个视频的所有缓存帧"""
+        with self.lock:
+            for key in [key for key in self.frames if key[0] == signature]:
+                self.nbytes -= self.frames.pop(key).nbytes
+
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.frames.clear()
+            self.nbytes = 0
+
+    def close(self):
+        """清空并从内存预算注销"""
+        self.clear()
+        self.consumer.unregister()
+
+    def stats(self) -> dict:
+        """
+        获取统计信息
+
+        Returns:
+            dict: frames、bytes、hits、misses、hit_rate
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'frames': len(self.frames),
+                'bytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
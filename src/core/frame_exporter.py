@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帧导出模块
+一次解码、多尺寸多格式输出：按尺寸从大到小级联缩放，并行编码写盘
+"""
+
+import os
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .frame_resizer import FrameResizer
+from .memory_budget import MemoryBudget
+from .perf_stats import PerfStats
+from ..utils.file_utils import FileUtils
+from ..utils.image_utils import ImageUtils
+
+
+class FrameExporter:
+    """帧导出器类
+
+    输出规格（output spec）为字典，支持以下键：
+        format:  图片格式名称（JPEG、PNG、BMP、TIFF、WEBP），默认JPEG
+        size:    输出尺寸 (width, height)，None 表示原始尺寸
+        width / height: 只指定一边时按原始宽高比计算另一边
+        quality: 编码质量 1-100，None 使用默认值
+        suffix:  追加到文件名（扩展名之前）的后缀
+        path:    完整输出路径，指定后忽略 suffix
+    """
+
+    # 默认编码质量
+    DEFAULT_QUALITY = 95
+
+    # PNG 压缩级别（无损，quality 不适用；3 与 OpenCV 默认值相同，兼顾速度和大小）
+    PNG_COMPRESSION = 3
+
+    # 编码线程池（延迟创建，所有导出共享）
+    _executor = None
+
+    # 编码队列中的帧占用（计入内存预算，不可淘汰）
+    _queued_bytes = 0
+    _queue_lock = threading.Lock()
+    _consumer = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """获取共享的编码线程池"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2),
+                                               thread_name_prefix="frame-encoder")
+            cls._consumer = MemoryBudget.instance().register(
+                "导出编码队列", MemoryBudget.PRIORITY_EXPORT, lambda: cls._queued_bytes)
+        return cls._executor
+
+    @classmethod
+    def _reserve(cls, nbytes: int):
+        """登记进入编码队列的帧（先让缓存腾出额度；额度不足时仍然编码，导出不丢帧）"""
+        cls._consumer.request(nbytes)
+        with cls._queue_lock:
+            cls._queued_bytes += nbytes
+
+    @classmethod
+    def _release(cls, nbytes: int):
+        """注销编码完成的帧"""
+        with cls._queue_lock:
+            cls._queued_bytes -= nbytes
+
+    @staticmethod
+    def resolve_size(frame_size: Tuple[int, int], spec: dict) -> Tuple[int, int]:
+        """
+        根据输出规格计算目标尺寸
+
+        Args:
+            frame_size: 帧尺寸 (width, height)
+            spec: 输出规格
+
+        Returns:
+            Tuple[int, int]: 目标尺寸 (width, height)
+        """
+        if spec.get('size'):
+            return tuple(spec['size'])
+        if spec.get('width') or spec.get('height'):
+            return ImageUtils.calculate_aspect_ratio_size(
+                frame_size, target_width=spec.get('width'), target_height=spec.get('height'))
+        return frame_size
+
+    @staticmethod
+    def get_encode_params(format_name: str, quality: Optional[int] = None) -> List[int]:
+        """
+        获取OpenCV编码参数
+
+        Args:
+            format_name: 图片格式名称
+            quality: 编码质量 1-100
+
+        Returns:
+            List[int]: cv2.imencode 参数列表
+        """
+        quality = FrameExporter.DEFAULT_QUALITY if quality is None else quality
+        if format_name == 'JPEG':
+            return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        if format_name == 'WEBP':
+            return [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+        if format_name == 'PNG':
+            return [cv2.IMWRITE_PNG_COMPRESSION, FrameExporter.PNG_COMPRESSION]
+        return []
+
+    @staticmethod
+    def encode(frame: np.ndarray, format_name: str = 'JPEG',
+               quality: Optional[int] = None) -> Optional[bytes]:
+        """
+        将BGR帧编码为图片字节
+
+        Args:
+            frame: BGR格式的帧数据
+            format_name: 图片格式名称
+            quality: 编码质量 1-100
+
+        Returns:
+            bytes: 编码后的图片数据，失败返回None
+        """
+        buffer = FrameExporter.encode_buffer(frame, format_name, quality)
+        return buffer.tobytes() if buffer is not None else None
+
+    @staticmethod
+    def encode_buffer(frame: np.ndarray, format_name: str = 'JPEG',
+                      quality: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        将BGR帧编码为图片，返回编码器输出的缓冲区（不复制，可直接写入文件或套接字）
+
+        Args:
+            frame: BGR格式的帧数据
+            format_name: 图片格式名称
+            quality: 编码质量 1-100
+
+        Returns:
+            np.ndarray: 一维 uint8 编码数据，失败返回None
+        """
+        ext = ImageUtils.SUPPORTED_FORMATS.get(format_name, ['.jpg'])[0]
+        with PerfStats.measure('encode'):
+            ret, buffer = cv2.imencode(ext, frame, FrameExporter.get_encode_params(format_name, quality))
+        return buffer if ret else None
+
+    @staticmethod
+    def build_output_path(output_path: str, spec: dict) -> str:
+        """
+        根据基础路径和输出规格生成输出文件路径
+
+        Args:
+            output_path: 基础输出路径（扩展名会被替换）
+            spec: 输出规格
+
+        Returns:
+            str: 输出文件路径
+        """
+        if spec.get('path'):
+            return spec['path']
+        format_name = spec.get('format', 'JPEG')
+        base = os.path.splitext(output_path)[0]
+        ext = ImageUtils.SUPPORTED_FORMATS.get(format_name, ['.jpg'])[0]
+        if ImageUtils.get_format_from_extension(output_path) == format_name:
+            # 保留用户选择的扩展名写法（如 .jpeg、.tif）
+            ext = os.path.splitext(output_path)[1] or ext
+        return f"{base}{spec.get('suffix', '')}{ext}"
+
+    @staticmethod
+    def _write(path: str, frame: np.ndarray, format_name: str, quality: Optional[int]) -> str:
+        """编码并写入文件（在线程池中执行）"""
+        data = FrameExporter.encode(frame, format_name, quality)
+        if data is None:
+            raise ValueError(f"编码失败: {path}")
+        # 目标可能是输出缓存的硬链接，先删除再写，避免改写缓存中的文件
+        if os.path.lexists(path):
+            os.remove(path)
+        # 通过Python写文件，避免cv2.imwrite不支持非ASCII路径
+        with PerfStats.measure('write'), open(path, 'wb') as f:
+            f.write(data)
+        PerfStats.count('bytes_written', len(data))
+        return path
+
+    @staticmethod
+    def crop(frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        """
+        按感兴趣区域裁剪帧（numpy切片，不复制数据）
+
+        Args:
+            frame: BGR格式的帧数据
+            roi: 裁剪区域 (x, y, width, height)，None 表示不裁剪
+
+        Returns:
+            np.ndarray: 裁剪后的帧视图，区域无效时返回原帧
+        """
+        if not roi:
+            return frame
+        frame_h, frame_w = frame.shape[:2]
+        x, y, w, h = roi
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(frame_w, int(x + w)), min(frame_h, int(y + h))
+        if x1 <= x0 or y1 <= y0:
+            return frame
+        return frame[y0:y1, x0:x1]
+
+    @staticmethod
+    def iter_cascade(frame: np.ndarray, sizes) -> Iterator[Tuple[Tuple[int, int], np.ndarray]]:
+        """
+        按尺寸从大到小级联缩放，每个尺寸只计算一次
+
+        Args:
+            frame: BGR格式的帧数据
+            sizes: 目标尺寸集合
+
+        Yields:
+            Tuple[Tuple[int, int], np.ndarray]: (尺寸, 缩放结果)
+        """
+        frame_size = (frame.shape[1], frame.shape[0])
+        rendered = {frame_size: frame}
+        for size in sorted(set(sizes), key=lambda s: s[0] * s[1], reverse=True):
+            if size not in rendered:
+                # 选择已生成结果中不小于目标的最小一个作为源，复用上一级的缩放结果
+                candidates = [s for s in rendered if s[0] >= size[0] and s[1] >= size[1]]
+                source = min(candidates, key=lambda s: s[0] * s[1]) if candidates else frame_size
+                rendered[size] = FrameResizer.resize(rendered[source], size)
+            yield size, rendered[size]
+
+    @staticmethod
+    def export_frame(frame: np.ndarray, outputs: List[dict], output_path: str,
+                     roi: Optional[Tuple[int, int, int, int]] = None) -> List[str]:
+        """
+        将一帧按多个输出规格导出
+
+        Args:
+            frame: BGR格式的帧数据
+            outputs: 输出规格列表
+            output_path: 基础输出路径
+            roi: 可选的裁剪区域 (x, y, width, height)，在缩放和编码之前应用
+
+        Returns:
+            List[str]: 写入的文件路径列表（与 outputs 顺序一致）
+        """
+        frame = FrameExporter.crop(frame, roi)
+        frame_size = (frame.shape[1], frame.shape[0])
+        executor = FrameExporter._get_executor()
+
+        # 按目标尺寸分组，同一尺寸的多种格式共享一次缩放
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for index, spec in enumerate(outputs):
+            groups.setdefault(FrameExporter.resolve_size(frame_size, spec), []).append(index)
+
+        # 每得到一个尺寸就立即提交编码，缩放与编码流水线并行
+        futures = [None] * len(outputs)
+        queued = 0
+        try:
+            for size, resized in FrameExporter.iter_cascade(frame, groups.keys()):
+                FrameExporter._reserve(resized.nbytes)
+                queued += resized.nbytes
+                for index in groups[size]:
+                    spec = outputs[index]
+                    path = FrameExporter.build_output_path(output_path, spec)
+                    FileUtils.ensure_directory_exists(path)
+                    futures[index] = executor.submit(FrameExporter._write, path, resized,
+                                                     spec.get('format', 'JPEG'), spec.get('quality'))
+
+            return [future.result() for future in futures]
+        finally:
+            # 等待所有编码结束后再注销（提交中途出错时也等待已提交的编码）
+            for future in futures:
+                if future is not None:
+                    future.exception()
+            FrameExporter._release(queued)
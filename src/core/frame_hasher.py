@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感知哈希模块
+在缩小的灰度图上计算64位感知哈希，并用BK树按汉明距离查找近似重复帧
+"""
+
+import collections
+import cv2
+import numpy as np
+from typing import Deque, Optional
+
+
+class FrameHasher:
+    """帧感知哈希工具类"""
+
+    # 支持的哈希算法
+    METHODS = ['dhash', 'phash']
+
+    @staticmethod
+    def _to_gray(frame: np.ndarray, size) -> np.ndarray:
+        """缩小并转为灰度（先缩小再转换，避免对全尺寸帧做颜色转换）"""
+        stride = max(1, frame.shape[1] // (size[0] * 8))
+        small = cv2.resize(frame[::stride, ::stride], size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    @staticmethod
+    def _pack_bits(bits: np.ndarray) -> int:
+        """将64个布尔值打包为整数"""
+        return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+    @staticmethod
+    def dhash(frame: np.ndarray) -> int:
+        """
+        计算差值哈希：比较 9×8 灰度图水平相邻像素
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            int: 64位哈希值
+        """
+        gray = FrameHasher._to_gray(frame, (9, 8)).astype(np.int16)
+        return FrameHasher._pack_bits(gray[:, 1:] > gray[:, :-1])
+
+    @staticmethod
+    def phash(frame: np.ndarray) -> int:
+        """
+        计算DCT感知哈希：32×32 灰度图DCT后取低频 8×8 与中位数比较
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            int: 64位哈希值
+        """
+        gray = FrameHasher._to_gray(frame, (32, 32)).astype(np.float32)
+        low = cv2.dct(gray)[:8, :8]
+        # 直流分量不参与中位数计算
+        median = np.median(low.ravel()[1:])
+        return FrameHasher._pack_bits(low > median)
+
+    @staticmethod
+    def compute(frame: np.ndarray, method: str = 'dhash') -> int:
+        """
+        按指定算法计算哈希
+
+        Args:
+            frame: BGR格式的帧数据
+            method: dhash 或 phash
+
+        Returns:
+            int: 64位哈希值
+        """
+        if method == 'phash':
+            return FrameHasher.phash(frame)
+        return FrameHasher.dhash(frame)
+
+    @staticmethod
+    def hamming(a: int, b: int) -> int:
+        """计算两个哈希值的汉明距离"""
+        return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK树：按汉明距离索引哈希值，支持在半径内快速查找"""
+
+    def __init__(self):
+        self.root = None  # 节点结构: [哈希值, {距离: 子节点}]
+        self.size = 0
+
+    def add(self, value: int):
+        """
+        添加哈希值
+
+        Args:
+            value: 64位哈希值
+        """
+        if self.root is None:
+            self.root = [value, {}]
+            self.size = 1
+            return
+
+        node = self.root
+        while True:
+            distance = FrameHasher.hamming(value, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [value, {}]
+                self.size += 1
+                return
+            node = child
+
+    def find_within(self, value: int, radius: int) -> Optional[int]:
+        """
+        查找与给定哈希距离不超过 radius 的任意一个哈希
+
+        Args:
+            value: 64位哈希值
+            radius: 汉明距离阈值
+
+        Returns:
+            int: 找到的哈希值，没有则返回None
+        """
+        if self.root is None:
+            return None
+
+        candidates = [self.root]
+        while candidates:
+            node = candidates.pop()
+            distance = FrameHasher.hamming(value, node[0])
+            if distance <= radius:
+                return node[0]
+            # 三角不等式：只有距离在 [d-r, d+r] 范围内的子树可能包含结果
+            for child_distance, child in node[1].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    candidates.append(child)
+        return None
+
+    def __len__(self):
+        return self.size
+
+
+class DuplicateFilter:
+    """近似重复帧过滤器
+
+    scope 为 recent 时只与最近 window 个保留帧比较；
+    为 global 时用BK树与所有已保留帧比较（同一实例可跨多个视频复用；多进程批量任务中
+    由 BatchJobRunner 在主进程用 check_hash 合并各子进程导出帧的哈希）
+    """
+
+    def __init__(self, threshold: int = 5, scope: str = 'recent', window: int = 8,
+                 method: str = 'dhash'):
+        self.threshold = threshold
+        self.scope = scope
+        self.method = method if method in FrameHasher.METHODS else 'dhash'
+        self.recent: Deque[int] = collections.deque(maxlen=max(1, window))
+        self.tree = BKTree()
+        self.skipped = 0
+        self.last_hash = None  # 最近一次判断的帧的哈希
+
+    def is_duplicate(self, frame: np.ndarray) -> bool:
+        """
+        判断帧是否与已保留的帧近似重复；不重复时记录该帧的哈希
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            bool: 重复返回True
+        """
+        return self.check_hash(FrameHasher.compute(frame, self.method))
+
+    def check_hash(self, value: int) -> bool:
+        """
+        按已计算的哈希判断是否重复；不重复时记录该哈希
+
+        Args:
+            value: FrameHasher.compute 的结果（算法须与 method 一致）
+
+        Returns:
+            bool: 重复返回True
+        """
+        self.last_hash = value
+        if self.scope == 'global':
+            duplicate = self.tree.find_within(value, self.threshold) is not None
+        else:
+            duplicate = any(FrameHasher.hamming(value, kept) <= self.threshold for kept in self.recent)
+
+        if duplicate:
+            self.skipped += 1
+            return True
+
+        self.recent.append(value)
+        if self.scope == 'global':
+            self.tree.add(value)
+        return False
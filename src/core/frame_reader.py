@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+顺序帧读取模块
+按帧号列表或步长稀疏读取视频帧：近距离用 grab() 跳帧，远距离才 seek
+不依赖Qt，可在工作线程或子进程中使用
+"""
+
+import cv2
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .perf_stats import PerfStats
+
+
+class FrameReader:
+    """顺序帧读取器类"""
+
+    # 与目标帧距离超过该值时使用 seek，否则逐帧 grab() 跳过
+    SEEK_THRESHOLD = 48
+
+    def __init__(self, video_path: Optional[str] = None):
+        self.cap = None
+        self.video_path = None
+        self.total_frames = 0
+        self.fps = 0
+        self.width = 0
+        self.height = 0
+        self.position = 0  # 下一次 read 将得到的帧号
+
+        if video_path:
+            self.open(video_path)
+
+    def open(self, video_path: str) -> bool:
+        """
+        打开视频文件
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            bool: 打开成功返回True
+        """
+        self.release()
+        with PerfStats.measure('open'):
+            self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+
+        self.video_path = video_path
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.position = 0
+        return True
+
+    def is_opened(self) -> bool:
+        """是否已打开视频"""
+        return self.cap is not None
+
+    def _move_to(self, frame_number: int) -> bool:
+        """移动读取位置到指定帧（不解码目标帧）"""
+        distance = frame_number - self.position
+        if distance < 0 or distance > FrameReader.SEEK_THRESHOLD:
+            with PerfStats.measure('seek'):
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self.position = frame_number
+            return True
+
+        # 近距离向前跳帧：grab() 只解复用和解码，不做颜色转换
+        for _ in range(distance):
+            with PerfStats.measure('decode'):
+                grabbed = self.cap.grab()
+            if not grabbed:
+                return False
+            self.position += 1
+        PerfStats.count('frames_skipped', distance)
+        return True
+
+    def read_at(self, frame_number: int) -> Optional[np.ndarray]:
+        """
+        读取指定帧
+
+        Args:
+            frame_number: 帧号
+
+        Returns:
+            np.ndarray: BGR格式的帧数据，失败返回None
+        """
+        if not self.cap or frame_number < 0:
+            return None
+        if not self._move_to(frame_number):
+            return None
+
+        # 与 read() 相同，分开 grab 和 retrieve 以便分别统计解码和颜色转换的耗时
+        with PerfStats.measure('decode'):
+            grabbed = self.cap.grab()
+        if not grabbed:
+            return None
+        self.position = frame_number + 1
+        with PerfStats.measure('convert'):
+            ret, frame = self.cap.retrieve()
+        PerfStats.count('frames_decoded')
+        return frame if ret else None
+
+    def grab_at(self, frame_number: int) -> bool:
+        """
+        解码指定帧但不取回数据，之后可调用 retrieve() 取回
+
+        Args:
+            frame_number: 帧号
+
+        Returns:
+            bool: 成功返回True
+        """
+        if not self.cap or frame_number < 0:
+            return False
+        if not self._move_to(frame_number):
+            return False
+        with PerfStats.measure('decode'):
+            grabbed = self.cap.grab()
+        if not grabbed:
+            return False
+        self.position = frame_number + 1
+        return True
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        """取回最近一次 grab 的帧"""
+        with PerfStats.measure('convert'):
+            ret, frame = self.cap.retrieve()
+        PerfStats.count('frames_decoded')
+        return frame if ret else None
+
+    def iter_frames(self, frame_numbers: Iterable[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        按帧号顺序读取多个帧
+
+        Args:
+            frame_numbers: 帧号列表（会按升序去重）
+
+        Yields:
+            Tuple[int, np.ndarray]: (帧号, BGR帧)
+        """
+        for frame_number in sorted(set(frame_numbers)):
+            frame = self.read_at(frame_number)
+            if frame is not None:
+                yield frame_number, frame
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None,
+                   step: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        按步长顺序读取一段帧
+
+        Args:
+            start: 起始帧号
+            end: 结束帧号（不含），None 表示到视频末尾
+            step: 步长
+
+        Yields:
+            Tuple[int, np.ndarray]: (帧号, BGR帧)
+        """
+        end = self.total_frames if end is None else min(end, self.total_frames)
+        for frame_number in range(max(0, start), end, max(1, step)):
+            frame = self.read_at(frame_number)
+            if frame is None:
+                break
+            yield frame_number, frame
+
+    @staticmethod
+    def sample_indices(total_frames: int, count: int, margin: float = 0.05) -> List[int]:
+        """
+        在视频中均匀选取采样帧号（避开片头片尾）
+
+        Args:
+            total_frames: 总帧数
+            count: 采样数量
+            margin: 片头片尾各跳过的比例
+
+        Returns:
+            List[int]: 升序的帧号列表
+        """
+        if total_frames <= 0 or count <= 0:
+            return []
+        start = int(total_frames * margin)
+        end = max(start + 1, int(total_frames * (1 - margin)))
+        indices = np.linspace(start, end - 1, num=min(count, end - start))
+        return sorted({int(i) for i in indices})
+
+    def release(self):
+        """释放视频资源"""
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self.position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
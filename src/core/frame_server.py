@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地帧服务模块
+常驻进程提供 HTTP 取帧接口，其他工具不必每次启动 Python 和重新打开视频：
+视频句柄由 CapturePool 复用，编码结果直接写入套接字
+
+接口（均为 GET，path 为视频文件路径）:
+    /frame?path=...&frame=N 或 &time=秒      单帧图片
+    /range?path=...&start=&end=&step=        一段帧，multipart/mixed 分块流式返回
+    /thumbnails?path=...&count=&width=       缩略图雪碧图（横向拼接）
+    /info?path=...                           媒体信息（JSON）
+    /stats                                   句柄池统计（JSON）
+    /metrics                                 热路径耗时统计（Prometheus 文本格式，需启用 PerfStats）
+图片接口可附加 format（JPEG、PNG、WEBP 等）、quality、width、height 参数
+"""
+
+import json
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .capture_pool import CapturePool
+from .frame_exporter import FrameExporter
+from .frame_resizer import FrameResizer
+from .media_catalog import MediaCatalog
+from .media_prober import MediaProber
+from .perf_stats import PerfStats
+from .thumbnail_strip import ThumbnailStripBuilder
+from ..utils.file_utils import FileUtils
+
+
+class FrameRequestError(Exception):
+    """请求错误（携带 HTTP 状态码）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FrameRequestHandler(BaseHTTPRequestHandler):
+    """帧服务请求处理类（每个连接一个线程，支持 keep-alive）"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "VideoFrameExtractor"
+
+    # 图片格式对应的 MIME 类型
+    CONTENT_TYPES = {
+        'JPEG': 'image/jpeg',
+        'PNG': 'image/png',
+        'BMP': 'image/bmp',
+        'TIFF': 'image/tiff',
+        'WEBP': 'image/webp',
+    }
+
+    # multipart 分隔符
+    BOUNDARY = "vfe-frame"
+
+    def log_message(self, format, *args):
+        """只在服务器开启日志时输出访问日志"""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        """分发 GET 请求"""
+        url = urlparse(self.path)
+        routes = {
+            '/frame': self.handle_frame,
+            '/range': self.handle_range,
+            '/thumbnails': self.handle_thumbnails,
+            '/info': self.handle_info,
+            '/stats': self.handle_stats,
+            '/metrics': self.handle_metrics,
+        }
+        handler = routes.get(url.path)
+        if handler is None:
+            self.send_error(404, explain="未知接口")
+            return
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            handler(params)
+        except FrameRequestError as e:
+            # 状态行只能是 latin-1，说明文字放在响应正文中
+            self.send_error(e.status, explain=str(e))
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端提前断开
+            self.close_connection = True
+        except Exception as e:
+            # 解码、编码等意外错误：回复 500 而不是不回复就断开连接；出错时响应可能已开始，关闭连接
+            print(f"帧服务处理 {url.path} 出错: {e}")
+            self.close_connection = True
+            try:
+                self.send_error(500, explain=str(e))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    # ---- 参数解析 ----
+
+    def _video_path(self, params: dict) -> str:
+        """取出视频路径并检查访问范围"""
+        path = params.get('path')
+        if not path:
+            raise FrameRequestError(400, "缺少 path 参数")
+        path = os.path.realpath(path)
+        root = self.server.root
+        if root and os.path.commonpath([root, path]) != root:
+            raise FrameRequestError(403, "路径不在允许的目录中")
+        if not os.path.isfile(path):
+            raise FrameRequestError(404, "文件不存在")
+        if not FileUtils.is_video_file(path):
+            raise FrameRequestError(415, "不支持的视频格式")
+        return path
+
+    @staticmethod
+    def _int(params: dict, key: str, default: Optional[int] = None) -> Optional[int]:
+        """解析整数参数"""
+        if key not in params:
+            return default
+        try:
+            return int(params[key])
+        except ValueError:
+            raise FrameRequestError(400, f"参数 {key} 不是整数")
+
+    def _image_spec(self, params: dict) -> dict:
+        """解析图片输出参数"""
+        format_name = params.get('format', 'JPEG').upper()
+        if format_name == 'JPG':
+            format_name = 'JPEG'
+        if format_name not in self.CONTENT_TYPES:
+            raise FrameRequestError(400, f"不支持的格式: {format_name}")
+        spec = {
+            'format': format_name,
+            'quality': self._int(params, 'quality'),
+            'width': self._int(params, 'width'),
+            'height': self._int(params, 'height'),
+        }
+        for key in ('width', 'height'):
+            if spec[key] is not None and not 0 < spec[key] <= self.server.MAX_OUTPUT_SIDE:
+                raise FrameRequestError(400, f"参数 {key} 应在 1-{self.server.MAX_OUTPUT_SIDE} 之间")
+        return spec
+
+    def _encode(self, frame, spec: dict):
+        """按规格缩放并编码，返回编码器缓冲区"""
+        size = FrameExporter.resolve_size((frame.shape[1], frame.shape[0]), spec)
+        frame = FrameResizer.resize(frame, size)
+        buffer = FrameExporter.encode_buffer(frame, spec['format'], spec['quality'])
+        if buffer is None:
+            raise FrameRequestError(500, "编码失败")
+        return buffer
+
+    def _send_body(self, body, content_type: str, headers: Optional[dict] = None):
+        """发送完整响应（body 可以是 bytes 或编码器缓冲区）"""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data):
+        """发送 JSON 响应"""
+        self._send_body(json.dumps(data, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8")
+
+    def _write_chunk(self, data):
+        """写入一个 chunked 编码的数据块"""
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii'))
+        self.wfile.write(data)
+        self.wfile.write(b"\r\n")
+
+    # ---- 接口 ----
+
+    def handle_frame(self, params: dict):
+        """单帧"""
+        path = self._video_path(params)
+        spec = self._image_spec(params)
+        frame_number = self._int(params, 'frame')
+        time_text = params.get('time')
+        if frame_number is None and time_text is None:
+            raise FrameRequestError(400, "缺少 frame 或 time 参数")
+        if frame_number is None:
+            try:
+                seconds = float(time_text)
+            except ValueError:
+                raise FrameRequestError(400, "参数 time 不是数字")
+            # inf、nan 无法换算为帧号
+            if not math.isfinite(seconds):
+                raise FrameRequestError(400, "参数 time 不是有限数值")
+
+        with self.server.pool.checkout(path, frame_number) as reader:
+            if reader is None:
+                raise FrameRequestError(500, "无法读取视频")
+            fps, total_frames = reader.fps, reader.total_frames
+            if frame_number is None:
+                try:
+                    frame_number = int(seconds * fps) if fps > 0 else 0
+                except OverflowError:
+                    frame_number = -1
+            # 参数错误时不在借用期间抛出异常，句柄可以正常归还复用
+            valid = 0 <= frame_number < max(1, total_frames)
+            frame = reader.read_at(frame_number) if valid else None
+        if not valid:
+            raise FrameRequestError(416, f"帧号或时间超出范围 0-{total_frames - 1}")
+        if frame is None:
+            raise FrameRequestError(500, f"读取第 {frame_number} 帧失败")
+
+        buffer = self._encode(frame, spec)
+        self._send_body(buffer, self.CONTENT_TYPES[spec['format']], {
+            'X-Frame-Number': frame_number,
+            'X-Frame-Time': f"{frame_number / fps:.3f}" if fps > 0 else "0",
+        })
+
+    def handle_range(self, params: dict):
+        """一段帧：每帧一个 multipart 部分，边解码边以 chunked 编码发送"""
+        path = self._video_path(params)
+        spec = self._image_spec(params)
+        start = max(0, self._int(params, 'start', 0))
+        step = max(1, self._int(params, 'step', 1))
+        end = self._int(params, 'end')
+        if end is None:
+            end = start + step * self.server.max_range_frames
+        if (end - start + step - 1) // step > self.server.max_range_frames:
+            raise FrameRequestError(400, f"一次最多返回 {self.server.max_range_frames} 帧")
+
+        with self.server.pool.checkout(path, start) as reader:
+            if reader is None:
+                raise FrameRequestError(500, "无法读取视频")
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/mixed; boundary={self.BOUNDARY}")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            content_type = self.CONTENT_TYPES[spec['format']]
+            try:
+                for frame_number, frame in reader.iter_range(start, end, step):
+                    buffer = self._encode(frame, spec)
+                    header = (f"--{self.BOUNDARY}\r\nContent-Type: {content_type}\r\n"
+                              f"Content-Length: {len(buffer)}\r\nX-Frame-Number: {frame_number}\r\n\r\n")
+                    self._write_chunk(header.encode('ascii'))
+                    self._write_chunk(buffer)
+                    self._write_chunk(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                # 状态行已发送，不能再回复错误：结束 chunked 流但不写结束分隔符，
+                # 客户端据此判断内容不完整，然后关闭连接
+                print(f"帧服务发送 {path} 第 {start}-{end} 帧时出错: {e}")
+                self.wfile.write(b"0\r\n\r\n")
+                self.close_connection = True
+                return
+            self._write_chunk(f"--{self.BOUNDARY}--\r\n".encode('ascii'))
+            self.wfile.write(b"0\r\n\r\n")
+
+    def handle_thumbnails(self, params: dict):
+        """缩略图雪碧图（使用缩略图条缓存）"""
+        path = self._video_path(params)
+        spec = self._image_spec(params)
+        # 数量和宽度超出上限时截断，雪碧图总宽度过大时减少数量
+        thumb_width = min(self._int(params, 'width', ThumbnailStripBuilder.DEFAULT_THUMB_WIDTH),
+                          self.server.MAX_THUMBNAIL_WIDTH)
+        count = min(self._int(params, 'count', ThumbnailStripBuilder.DEFAULT_COUNT),
+                    self.server.MAX_THUMBNAIL_COUNT, self.server.MAX_SPRITE_WIDTH // max(16, thumb_width))
+        builder = ThumbnailStripBuilder(count=count, thumb_width=thumb_width)
+        # 缓存未命中时使用句柄池中已打开的句柄
+        strip = builder.build(path, pool=self.server.pool)
+        if strip is None:
+            raise FrameRequestError(500, "无法读取视频")
+        buffer = FrameExporter.encode_buffer(strip.sprite(), spec['format'], spec['quality'])
+        if buffer is None:
+            raise FrameRequestError(500, "编码失败")
+        width, height = strip.thumb_size
+        self._send_body(buffer, self.CONTENT_TYPES[spec['format']], {
+            'X-Thumbnail-Size': f"{width}x{height}",
+            'X-Thumbnail-Frames': ",".join(str(int(i)) for i in strip.indices),
+        })
+
+    def handle_info(self, params: dict):
+        """媒体信息"""
+        info = MediaProber.probe(self._video_path(params), self.server.catalog)
+        if info is None:
+            raise FrameRequestError(404, "文件不存在")
+        self._send_json(info)
+
+    def handle_stats(self, params: dict):
+        """句柄池统计"""
+        self._send_json(self.server.pool.stats())
+
+    def handle_metrics(self, params: dict):
+        """热路径耗时统计（Prometheus 文本格式）"""
+        self._send_body(PerfStats.to_prometheus().encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8")
+
+
+class FrameServer(ThreadingHTTPServer):
+    """本地帧服务类"""
+
+    daemon_threads = True
+
+    # 默认监听地址（只接受本机连接）
+    DEFAULT_HOST = "127.0.0.1"
+    DEFAULT_PORT = 8765
+
+    # /range 一次最多返回的帧数
+    MAX_RANGE_FRAMES = 1000
+
+    # 输出图片的最大边长
+    MAX_OUTPUT_SIDE = 8192
+
+    # /thumbnails 的缩略图数量和宽度上限，雪碧图总宽度不超过 JPEG 的尺寸上限
+    MAX_THUMBNAIL_COUNT = 500
+    MAX_THUMBNAIL_WIDTH = 640
+    MAX_SPRITE_WIDTH = 65500
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_handles: int = CapturePool.DEFAULT_MAX_HANDLES, root: Optional[str] = None,
+                 verbose: bool = False):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+            max_handles: 最多同时打开的视频句柄数
+            root: 只允许访问该目录下的文件，None 表示不限制
+            verbose: 是否输出访问日志
+        """
+        super().__init__((host, port), FrameRequestHandler)
+        self.pool = CapturePool(max_handles)
+        self.catalog = MediaCatalog()
+        self.root = os.path.realpath(root) if root else None
+        self.verbose = verbose
+        self.max_range_frames = self.MAX_RANGE_FRAMES
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """服务地址"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台线程中运行（用于嵌入其他程序或基准测试）"""
+        self.thread = threading.Thread(target=self.serve_forever, name="frame-server", daemon=True)
+        self.thread.start()
+
+    def server_close(self):
+        """关闭监听、所有空闲句柄和媒体库"""
+        super().server_close()
+        self.pool.close()
+        self.catalog.close()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务清单模块
+批量导出时以追加方式记录每个已完成的帧（帧号、时间戳、导出规格哈希、文件校验和），
+中断后重新运行可按清单跳过已完成的帧；清单写入按批合并，避免每帧一次 fsync
+"""
+
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import List, Optional, Set
+
+from ..utils.file_utils import FileUtils
+
+
+class JobManifest:
+    """任务清单类
+
+    清单为 JSON Lines 文件，每行一条记录：
+        {"frame": 帧号, "time": 视频时间(秒), "settings": 规格哈希, "paths": [文件名],
+         "checksums": [CRC32], "written_at": 写入时间}
+    视频全部处理完成时追加 {"done": true, "settings": 规格哈希}
+    导出后又被删除的帧（如跨视频去重）追加 {"frame": 帧号, "settings": 规格哈希, "paths": [], "removed": 原因}，
+    该帧仍算已完成，重新运行时不再导出
+    """
+
+    # 缓冲多少条记录后写入一次
+    FLUSH_RECORDS = 64
+
+    # 距上次写入超过多少秒时写入
+    FLUSH_SECONDS = 2.0
+
+    def __init__(self, path: str, settings_hash: str):
+        """
+        Args:
+            path: 清单文件路径
+            settings_hash: 当前导出规格的哈希，只有相同规格的记录才算已完成
+        """
+        self.path = path
+        self.settings_hash = settings_hash
+        self.done: Set[int] = set()  # 已完成的帧号，按帧 O(1) 查询
+        self.complete = False
+        self.buffer: List[str] = []
+        self.last_flush = time.monotonic()
+        self.file = None
+        self.load()
+
+    @staticmethod
+    def manifest_path(output_dir: str, video_path: str) -> str:
+        """获取视频在输出目录中的清单文件路径"""
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        return os.path.join(output_dir, f".{video_name}.manifest.jsonl")
+
+    @staticmethod
+    def hash_settings(settings: dict) -> str:
+        """
+        计算导出规格的哈希（不含 resume 等不影响输出的键）
+
+        Args:
+            settings: 导出规格
+
+        Returns:
+            str: 16位十六进制哈希
+        """
+        relevant = {key: value for key, value in settings.items() if key not in ('resume', 'output_cache', 'output_cache_mb')}
+        text = json.dumps(relevant, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def checksum(path: str) -> Optional[str]:
+        """计算文件的 CRC32 校验和"""
+        try:
+            with open(path, 'rb') as f:
+                return f"{zlib.crc32(f.read()) & 0xFFFFFFFF:08x}"
+        except OSError:
+            return None
+
+    def load(self):
+        """读取已有清单，建立已完成帧的索引（忽略中断时写了一半的最后一行）"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('settings') != self.settings_hash:
+                    continue
+                if record.get('done'):
+                    self.complete = True
+                elif 'frame' in record:
+                    self.done.add(int(record['frame']))
+
+    def is_done(self, frame_number: int) -> bool:
+        """帧是否已完成"""
+        return frame_number in self.done
+
+    def record(self, frame_number: int, timestamp: float, paths: List[str]):
+        """
+        记录一个已完成的帧
+
+        Args:
+            frame_number: 帧号
+            timestamp: 视频时间（秒）
+            paths: 写入的文件路径
+        """
+        self.done.add(frame_number)
+        self._append({
+            'frame': frame_number,
+            'time': round(timestamp, 3),
+            'settings': self.settings_hash,
+            'paths': [os.path.basename(path) for path in paths],
+            'checksums': [self.checksum(path) for path in paths],
+            'written_at': round(time.time(), 3),
+        })
+
+    def record_removed(self, frame_number: int, reason: str):
+        """
+        记录一个帧的输出文件已被删除（帧仍算已完成）
+
+        Args:
+            frame_number: 帧号
+            reason: 删除原因，如 duplicate
+        """
+        self.done.add(frame_number)
+        self._append({
+            'frame': frame_number,
+            'settings': self.settings_hash,
+            'paths': [],
+            'checksums': [],
+            'removed': reason,
+            'written_at': round(time.time(), 3),
+        })
+
+    def _append(self, record: dict):
+        """追加记录到缓冲区，达到数量或时间阈值时写入"""
+        self.buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+        if len(self.buffer) >= self.FLUSH_RECORDS or time.monotonic() - self.last_flush >= self.FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区一次性写入文件并 fsync"""
+        if not self.buffer:
+            return
+        if self.file is None:
+            FileUtils.ensure_directory_exists(self.path)
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write("".join(self.buffer))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self, complete: bool = False):
+        """
+        写入剩余记录并关闭
+
+        Args:
+            complete: 视频是否已全部处理完成
+        """
+        if complete and not self.complete:
+            self.complete = True
+            self.buffer.append(json.dumps({'done': True, 'settings': self.settings_hash}) + "\n")
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量任务调度模块
+把同一导出规格应用到目录中的每个视频：多进程并行，按文件大小从大到小调度以避免长尾，
+并按估算内存限制同时运行的任务数；可选地把子进程刚导出的帧经共享内存帧环发布为预览
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .batch_exporter import BatchExporter
+from .frame_hasher import DuplicateFilter
+from .frame_resizer import FrameResizer
+from .job_manifest import JobManifest
+from .media_catalog import MediaCatalog
+from .media_prober import MediaProber
+from .shared_frame_ring import SharedFrameRing
+
+# 子进程共享的取消事件和预览描述符队列（由进程池初始化函数设置）
+_cancel_event = None
+_preview_queue = None
+
+
+def _init_worker(cancel_event, preview_queue=None):
+    """子进程初始化：保存取消事件和预览队列，忽略 Ctrl+C（由主进程通过取消事件统一停止）"""
+    global _cancel_event, _preview_queue
+    _cancel_event = cancel_event
+    _preview_queue = preview_queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class _PreviewPublisher:
+    """子进程中的预览发布器：按间隔把导出的帧缩小后写入本任务的帧环，经队列只发送描述符"""
+
+    def __init__(self, lane: int, spec: tuple, video_path: str):
+        self.lane = lane
+        self.video_path = video_path
+        self.ring = SharedFrameRing.attach(spec)
+        self.last_time = 0.0
+
+    def publish(self, frame_number: int, frame: np.ndarray):
+        """发布一帧（距上次发布不足 PREVIEW_INTERVAL 时跳过）"""
+        now = time.monotonic()
+        if now - self.last_time < BatchJobRunner.PREVIEW_INTERVAL:
+            return
+        self.last_time = now
+        height, width = frame.shape[:2]
+        scale = min(BatchJobRunner.PREVIEW_WIDTH / width, BatchJobRunner.PREVIEW_HEIGHT / height, 1.0)
+        preview = FrameResizer.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))))
+        descriptor = self.ring.write(np.ascontiguousarray(preview))
+        if descriptor is not None:
+            _preview_queue.put((self.lane, self.video_path, frame_number, descriptor))
+
+    def close(self):
+        """断开帧环"""
+        self.ring.close()
+
+
+def _run_job(settings: dict, video_path: str, output_dir: str, preview: Optional[tuple] = None) -> dict:
+    """
+    在子进程中导出单个视频
+
+    Args:
+        preview: (通道号, 帧环 spec)，为 None 时不发布预览
+
+    Returns:
+        dict: BatchExporter.export_video 的统计信息，附加 source_bytes 和 error
+    """
+    exporter = BatchExporter(settings)
+
+    def check_cancel(processed: int, planned: int):
+        if _cancel_event is not None and _cancel_event.is_set():
+            exporter.cancel()
+
+    exporter.progress_callback = check_cancel
+    publisher = None
+    try:
+        if preview is not None and _preview_queue is not None:
+            publisher = _PreviewPublisher(preview[0], preview[1], video_path)
+            exporter.frame_callback = publisher.publish
+        stats = exporter.export_video(video_path, output_dir)
+    except Exception as e:
+        stats = _failed_stats(video_path, str(e))
+    finally:
+        if publisher:
+            publisher.close()
+    stats['source_bytes'] = os.path.getsize(video_path) if os.path.exists(video_path) else 0
+    return stats
+
+
+def _failed_stats(video_path: str, error: str) -> dict:
+    """失败任务的统计信息"""
+    return {'video': video_path, 'frames_processed': 0, 'frames_exported': 0, 'frames_failed': 0, 'frames_cached': 0,
+            'files_written': 0, 'bytes_written': 0, 'source_bytes': 0, 'elapsed_seconds': 0.0, 'error': error}
+
+
+class BatchJobRunner:
+    """批量任务调度器类"""
+
+    # 单个任务的基础内存估算（解码器、进程本身等，字节）
+    BASE_JOB_MEMORY = 96 * 1024 * 1024
+
+    # 单个任务同时驻留的解码帧数估算（解码缓冲、缩放、编码队列）
+    FRAME_BUFFERS = 12
+
+    # 预览帧的最大尺寸和发布间隔（秒）
+    PREVIEW_WIDTH = 320
+    PREVIEW_HEIGHT = 180
+    PREVIEW_INTERVAL = 0.5
+
+    # 每个预览帧环的槽位数（写入方按间隔发布，读取方只取最新一帧）
+    PREVIEW_SLOTS = 2
+
+    def __init__(self, settings: dict, workers: Optional[int] = None, memory_limit_mb: int = 2048,
+                 progress_callback: Optional[Callable[[int, int, dict], None]] = None,
+                 history: Optional[int] = None,
+                 preview_callback: Optional[Callable[[str, int, np.ndarray], None]] = None):
+        """
+        Args:
+            settings: 导出规格，见 BatchExporter
+            workers: 进程数，None 表示 CPU 核数
+            memory_limit_mb: 同时运行任务的估算内存总上限（MB）
+            progress_callback: 每完成一个文件调用一次 (已完成数, 总数, 该文件统计)
+            history: 汇总信息中保留的最近任务统计和失败文件数，None 表示全部保留（常驻服务应设置上限）
+            preview_callback: 设置后子进程按间隔发布刚导出的帧，run 中调用 (视频路径, 帧号, 预览帧)；
+                              帧经共享内存帧环传递（每个运行中的任务一个环），管道中只有描述符
+        """
+        self.history = history
+        self.preview_callback = preview_callback
+        self.preview_queue = None
+        self.preview_rings = []
+        self.free_lanes = []  # 空闲的预览帧环编号
+        self.lanes = {}  # future -> 预览帧环编号
+        self.settings = settings
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.memory_limit = max(1, memory_limit_mb) * 1024 * 1024
+        self.progress_callback = progress_callback
+        self.cancel_event = None
+        self.cancelled = False
+        self.pool = None
+        self.max_workers = self.workers
+        self.pool_futures = set()  # 当前进程池中提交的任务（重建前的旧池任务不在其中）
+        self.retried = set()  # 因进程池崩溃重试过的视频
+        self.retry_queue = []  # 等待单独重试的任务
+        self.isolated = None  # 正在单独运行的重试任务
+        self.running = {}
+        self.in_flight_memory = 0
+        self.start_time = 0.0
+        self.summary = {}
+        # 全局去重：各子进程只能在单个视频内去重，跨视频的比较在主进程合并
+        self.duplicate_filter = None
+        if settings.get('dedup') and settings.get('dedup_scope') == 'global':
+            self.duplicate_filter = DuplicateFilter(threshold=settings.get('dedup_threshold', 5), scope='global',
+                                                    method=settings.get('dedup_method', 'dhash'))
+
+    def cancel(self):
+        """取消调度：不再提交新任务，正在运行的任务在下一帧边界停止"""
+        self.cancelled = True
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+
+    @staticmethod
+    def estimate_memory(width: int, height: int) -> int:
+        """
+        估算导出一个视频时的内存占用
+
+        Args:
+            width: 视频宽度，未知时按1080p估算
+            height: 视频高度
+
+        Returns:
+            int: 估算字节数
+        """
+        if width <= 0 or height <= 0:
+            width, height = 1920, 1080
+        return BatchJobRunner.BASE_JOB_MEMORY + width * height * 3 * BatchJobRunner.FRAME_BUFFERS
+
+    def make_job(self, video_path: str, directory: str, output_root: str, size: int,
+                 width: int = 0, height: int = 0) -> dict:
+        """
+        生成单个任务
+
+        Args:
+            video_path: 视频文件路径
+            directory: 源根目录（用于计算输出子目录）
+            output_root: 输出根目录
+            size: 文件大小
+            width / height: 视频分辨率，未知时为0
+
+        Returns:
+            dict: 任务，包含 video、output_dir、size、memory
+        """
+        relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(video_path)), os.path.abspath(directory))
+        return {
+            'video': video_path,
+            'output_dir': os.path.normpath(os.path.join(output_root, relative_dir)),
+            'size': size,
+            'memory': self.estimate_memory(width, height),
+        }
+
+    def plan_jobs(self, directory: str, output_root: str, recursive: bool = True) -> List[dict]:
+        """
+        生成任务列表（按文件大小从大到小排序）
+
+        Args:
+            directory: 视频所在目录
+            output_root: 输出根目录，子目录结构与源目录一致
+            recursive: 是否包含子目录
+
+        Returns:
+            List[dict]: 任务列表，每项包含 video、output_dir、size、memory
+        """
+        jobs = []
+        directory = os.path.abspath(directory)
+        # 扫描与分辨率探测并行，探测结果存入媒体库，重复处理同一目录时不再打开视频
+        catalog = MediaCatalog()
+        for info in MediaProber(catalog).scan(directory, recursive):
+            jobs.append(self.make_job(info['path'], directory, output_root, info['size'],
+                                      info['width'], info['height']))
+        catalog.close()
+        jobs.sort(key=lambda job: job['size'], reverse=True)
+        return jobs
+
+    def start(self, max_workers: Optional[int] = None):
+        """
+        启动进程池（run 会自动调用；持续提交任务时手动调用，配合 submit / collect / shutdown）
+
+        Args:
+            max_workers: 进程数上限，None 表示 self.workers
+        """
+        # 使用 spawn 启动子进程，避免在带Qt线程的界面进程中 fork
+        context = multiprocessing.get_context('spawn')
+        self.cancel_event = context.Event()
+        if self.cancelled:
+            self.cancel_event.set()
+        self.max_workers = max_workers or self.workers
+        if self.preview_callback:
+            # 运行中的任务不超过 workers 个，每个任务独占一个帧环（帧环只允许一个写入进程）
+            self.preview_queue = context.Queue()
+            self.preview_rings = [SharedFrameRing.for_frame(self.PREVIEW_WIDTH, self.PREVIEW_HEIGHT,
+                                                            slots=self.PREVIEW_SLOTS)
+                                  for _ in range(self.workers)]
+            self.free_lanes = list(range(self.workers))
+            self.lanes = {}
+        self.pool = self._create_pool()
+        self.pool_futures = set()
+        self.retried = set()
+        self.retry_queue = []
+        self.isolated = None
+        self.running = {}
+        self.in_flight_memory = 0
+        self.start_time = time.perf_counter()
+        self.summary = {
+            'jobs': deque(maxlen=self.history) if self.history else [],
+            'failed': deque(maxlen=self.history) if self.history else [],
+            'jobs_completed': 0,
+            'jobs_failed': 0,
+            'frames_exported': 0,
+            'frames_failed': 0,
+            'frames_cached': 0,
+            'files_written': 0,
+            'bytes_written': 0,
+            'source_bytes': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'elapsed_seconds': 0.0,
+        }
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        """创建进程池（子进程异常退出后用于重建）"""
+        context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                   initializer=_init_worker, initargs=(self.cancel_event, self.preview_queue))
+
+    def can_submit(self, job: dict) -> bool:
+        """进程和内存预算是否允许再提交该任务；没有运行中的任务时总是允许，避免单个大任务永远无法启动"""
+        if self.cancelled or self.isolated is not None or len(self.running) >= self.workers:
+            return False
+        return self.in_flight_memory == 0 or self.in_flight_memory + job['memory'] <= self.memory_limit
+
+    def submit(self, job: dict):
+        """提交一个任务到进程池"""
+        lane = self.free_lanes.pop() if self.free_lanes else None
+        preview = (lane, self.preview_rings[lane].spec()) if lane is not None else None
+        future = self.pool.submit(_run_job, self.settings, job['video'], job['output_dir'], preview)
+        self.running[future] = job
+        if lane is not None:
+            self.lanes[future] = lane
+        self.pool_futures.add(future)
+        self.in_flight_memory += job['memory']
+
+    def collect(self, timeout: Optional[float] = None) -> List[dict]:
+        """
+        等待并取回已完成的任务
+
+        Args:
+            timeout: 最长等待秒数，None 表示等到至少一个任务完成
+
+        Returns:
+            List[dict]: 已完成任务的统计信息
+        """
+        if not self.running:
+            return []
+        done, _ = wait(self.running, timeout=timeout, return_when=FIRST_COMPLETED)
+        finished = []
+        pool_broken = False
+        for future in done:
+            job = self.running.pop(future)
+            self.in_flight_memory -= job['memory']
+            if future in self.lanes:
+                self.free_lanes.append(self.lanes.pop(future))
+            in_current_pool = future in self.pool_futures
+            self.pool_futures.discard(future)
+            if future is self.isolated:
+                self.isolated = None
+            try:
+                stats = future.result()
+            except CancelledError:
+                stats = _failed_stats(job['video'], "已取消")
+            except BrokenProcessPool as e:
+                # 子进程崩溃（解码器段错误、被系统 OOM 终止等），池中所有运行中的任务都会以此结束；
+                # 无法区分是哪个任务导致的，每个任务单独重试一次，再次失败才记为失败
+                pool_broken = pool_broken or in_current_pool
+                if job['video'] not in self.retried and not self.cancelled:
+                    self.retried.add(job['video'])
+                    self.retry_queue.append(job)
+                    continue
+                stats = _failed_stats(job['video'], f"子进程异常退出: {e}")
+            except Exception as e:
+                stats = _failed_stats(job['video'], str(e))
+            self.retried.discard(job['video'])
+            self._dedup_across_jobs(stats, job['output_dir'])
+            self._add_stats(self.summary, stats)
+            finished.append(stats)
+        if pool_broken:
+            print("批量任务子进程异常退出，重建进程池")
+            self.pool.shutdown(wait=False)
+            self.pool = self._create_pool()
+            self.pool_futures = set()
+        if self.retry_queue and not self.running:
+            if self.cancelled:
+                for job in self.retry_queue:
+                    stats = _failed_stats(job['video'], "已取消")
+                    self._add_stats(self.summary, stats)
+                    finished.append(stats)
+                self.retry_queue = []
+            else:
+                # 重试任务单独运行，其间不提交其他任务，再次崩溃时不会牵连其他视频
+                self.submit(self.retry_queue.pop(0))
+                self.isolated = next(iter(self.running))
+        return finished
+
+    def shutdown(self, cancel_futures: bool = False) -> dict:
+        """
+        等待运行中的任务结束并关闭进程池
+
+        Args:
+            cancel_futures: 是否先取消（如 Ctrl+C）：撤回尚未开始的任务，正在运行的任务在下一帧边界停止
+
+        Returns:
+            dict: 汇总信息，见 run
+        """
+        if cancel_futures:
+            self.cancel()
+            for future in self.running:
+                future.cancel()
+        while self.running:
+            self.collect()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+        self._close_previews()
+        summary = self.summary
+        summary['elapsed_seconds'] = time.perf_counter() - self.start_time
+        elapsed = max(summary['elapsed_seconds'], 1e-9)
+        summary['frames_per_second'] = summary['frames_exported'] / elapsed
+        summary['source_mb_per_second'] = summary['source_bytes'] / 1024 / 1024 / elapsed
+        summary['output_mb_per_second'] = summary['bytes_written'] / 1024 / 1024 / elapsed
+        lookups = summary['cache_hits'] + summary['cache_misses']
+        summary['cache_hit_rate'] = summary['cache_hits'] / lookups if lookups else 0.0
+        return summary
+
+    def run(self, jobs: List[dict]) -> dict:
+        """
+        执行任务列表
+
+        Args:
+            jobs: plan_jobs 生成的任务列表（按大小从大到小）
+
+        Returns:
+            dict: 汇总信息，包括每个文件的统计（jobs）、失败列表、总帧数、总字节数和吞吐量
+        """
+        pending = list(jobs)
+        self.start(max_workers=min(self.workers, max(1, len(jobs))))
+        while pending or self.running:
+            # 依次提交预算允许的最大任务
+            while pending and not self.cancelled:
+                job = next((job for job in pending if self.can_submit(job)), None)
+                if job is None:
+                    break
+                pending.remove(job)
+                self.submit(job)
+
+            if not self.running:
+                break
+            # 有预览时按发布间隔醒来取回预览帧
+            for stats in self.collect(timeout=self.PREVIEW_INTERVAL if self.preview_callback else None):
+                if self.progress_callback:
+                    self.progress_callback(self.summary['jobs_completed'], len(jobs), stats)
+            if self.preview_callback:
+                for video, frame_number, frame in self.poll_previews():
+                    self.preview_callback(video, frame_number, frame)
+        return self.shutdown()
+
+    def poll_previews(self) -> List[tuple]:
+        """
+        取回子进程发布的预览帧（不等待）
+
+        Returns:
+            List[tuple]: [(视频路径, 帧号, 预览帧)]，每个帧环只取最新一帧，已被覆盖的帧跳过
+        """
+        if self.preview_queue is None:
+            return []
+        latest = {}
+        while True:
+            try:
+                lane, video, frame_number, descriptor = self.preview_queue.get_nowait()
+            except queue.Empty:
+                break
+            latest[lane] = (video, frame_number, descriptor)
+        previews = []
+        for lane, (video, frame_number, descriptor) in latest.items():
+            frame = self.preview_rings[lane].read(descriptor)
+            if frame is not None:
+                previews.append((video, frame_number, frame))
+        return previews
+
+    def _close_previews(self):
+        """删除预览帧环并关闭队列（进程池关闭后调用）"""
+        for ring in self.preview_rings:
+            ring.close()
+        self.preview_rings = []
+        self.free_lanes = []
+        self.lanes = {}
+        if self.preview_queue is not None:
+            self.preview_queue.close()
+            self.preview_queue = None
+
+    def _dedup_across_jobs(self, stats: dict, output_dir: str):
+        """
+        全局去重：与之前完成的视频已导出的帧比较，删除近似重复帧的所有输出文件
+
+        启用任务清单时在清单中记录这些帧已删除，重新运行时不会再导出，也不会当作文件仍存在
+        """
+        frame_hashes = stats.pop('frame_hashes', None)
+        if not frame_hashes or self.duplicate_filter is None:
+            return
+        manifest = None
+        for frame_number, value, paths in frame_hashes:
+            if not self.duplicate_filter.check_hash(value):
+                continue
+            removed_bytes = 0
+            for path in paths:
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    removed_bytes += size
+                except OSError as e:
+                    print(f"删除重复帧失败: {e}")
+            if self.settings.get('resume'):
+                if manifest is None:
+                    manifest = JobManifest(JobManifest.manifest_path(output_dir, stats['video']),
+                                           JobManifest.hash_settings(self.settings))
+                manifest.record_removed(frame_number, 'duplicate')
+            stats['frames_exported'] -= 1
+            stats['files_written'] -= len(paths)
+            stats['bytes_written'] -= removed_bytes
+            stats['frames_skipped'] = stats.get('frames_skipped', 0) + 1
+            stats['bytes_saved'] = stats.get('bytes_saved', 0) + removed_bytes
+        if manifest:
+            manifest.close()
+
+    @staticmethod
+    def _add_stats(summary: dict, stats: dict):
+        """把单个文件的统计合并到汇总信息"""
+        elapsed = max(stats.get('elapsed_seconds', 0.0), 1e-9)
+        stats['frames_per_second'] = stats['frames_exported'] / elapsed
+        stats['source_mb_per_second'] = stats['source_bytes'] / 1024 / 1024 / elapsed
+        summary['jobs'].append(stats)
+        summary['jobs_completed'] += 1
+        if stats.get('error'):
+            summary['failed'].append(stats['video'])
+            summary['jobs_failed'] += 1
+        for key in ('frames_exported', 'frames_failed', 'frames_cached', 'files_written', 'bytes_written', 'source_bytes',
+                    'cache_hits', 'cache_misses'):
+            summary[key] += stats.get(key, 0)
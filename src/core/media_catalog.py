@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+媒体库模块
+用本地 SQLite 数据库保存每个视频的探测信息（时长、帧数、帧率、分辨率、编码、索引和缩略图状态），
+按路径和内容指纹建立索引，供界面文件选择和命令行快速列出、按时长/分辨率搜索
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from ..utils.cache_utils import CacheUtils
+
+
+class MediaCatalog:
+    """媒体库类
+
+    同时作为 MediaProber 的探测缓存：get 按 (路径, 大小, 修改时间) 命中，
+    find_by_fingerprint 用于识别移动或改名后的同一文件
+    """
+
+    # 数据库文件名
+    DB_FILENAME = "catalog.sqlite3"
+
+    # 每写入多少条提交一次事务
+    COMMIT_EVERY = 500
+
+    # 表字段（与探测结果字典的键一致）
+    COLUMNS = ('path', 'size', 'mtime_ns', 'fingerprint', 'width', 'height', 'fps', 'frame_count',
+               'real_frame_count', 'duration', 'codec', 'has_index', 'thumbnail_path', 'error', 'scanned_at')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            fingerprint TEXT,
+            width INTEGER DEFAULT 0,
+            height INTEGER DEFAULT 0,
+            fps REAL DEFAULT 0,
+            frame_count INTEGER DEFAULT 0,
+            real_frame_count INTEGER,
+            duration REAL DEFAULT 0,
+            codec TEXT DEFAULT '',
+            has_index INTEGER DEFAULT 0,
+            thumbnail_path TEXT,
+            error TEXT,
+            scanned_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_media_fingerprint ON media (fingerprint);
+        CREATE INDEX IF NOT EXISTS idx_media_duration ON media (duration);
+        CREATE INDEX IF NOT EXISTS idx_media_resolution ON media (height, width);
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: 数据库文件路径，None 表示使用默认缓存目录
+        """
+        self.db_path = db_path or os.path.join(CacheUtils.get_cache_dir(), self.DB_FILENAME)
+        # 探测线程和界面线程共用一个连接，由锁保证串行访问
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.pending_writes = 0
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(self.SCHEMA)
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[dict]:
+        """
+        按路径查询，文件大小或修改时间变化时视为未命中
+
+        Returns:
+            dict: 媒体信息，未命中返回None
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM media WHERE path = ?",
+                                          (os.path.abspath(path),)).fetchone()
+        if row and row['size'] == size and row['mtime_ns'] == mtime_ns:
+            return dict(row)
+        return None
+
+    def find_by_fingerprint(self, fingerprint: str, size: int) -> Optional[dict]:
+        """
+        按内容指纹查询（用于识别移动或改名的文件）
+
+        Returns:
+            dict: 媒体信息，未找到返回None
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT * FROM media WHERE fingerprint = ? AND size = ? AND error IS NULL LIMIT 1",
+                (fingerprint, size)).fetchone()
+        return dict(row) if row else None
+
+    def put(self, info: dict):
+        """写入或更新一条媒体信息（批量提交）"""
+        record = {column: info.get(column) for column in self.COLUMNS}
+        record['scanned_at'] = record['scanned_at'] or time.time()
+        record['has_index'] = int(bool(record['has_index']))
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        with self.lock:
+            self.connection.execute(f"INSERT OR REPLACE INTO media ({', '.join(self.COLUMNS)}) "
+                                    f"VALUES ({placeholders})", [record[c] for c in self.COLUMNS])
+            self.pending_writes += 1
+            if self.pending_writes >= self.COMMIT_EVERY:
+                self.connection.commit()
+                self.pending_writes = 0
+
+    def update(self, path: str, **fields):
+        """
+        更新已有记录的部分字段（如 real_frame_count、has_index、thumbnail_path）
+
+        Args:
+            path: 文件路径
+            **fields: 要更新的字段
+        """
+        fields = {key: value for key, value in fields.items() if key in self.COLUMNS and key != 'path'}
+        if not fields:
+            return
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self.lock:
+            self.connection.execute(f"UPDATE media SET {assignments} WHERE path = ?",
+                                    [*fields.values(), os.path.abspath(path)])
+            self.connection.commit()
+
+    def save(self):
+        """提交未提交的写入"""
+        with self.lock:
+            self.connection.commit()
+            self.pending_writes = 0
+
+    def remove_missing(self, directory: Optional[str] = None) -> int:
+        """
+        删除文件已不存在的记录
+
+        Args:
+            directory: 只检查该目录下的记录，None 表示全部
+
+        Returns:
+            int: 删除的记录数
+        """
+        with self.lock:
+            if directory:
+                prefix = os.path.join(os.path.abspath(directory), '')
+                rows = self.connection.execute("SELECT path FROM media WHERE substr(path, 1, ?) = ?",
+                                               (len(prefix), prefix)).fetchall()
+            else:
+                rows = self.connection.execute("SELECT path FROM media").fetchall()
+        missing = [(row['path'],) for row in rows if not os.path.exists(row['path'])]
+        if missing:
+            with self.lock:
+                self.connection.executemany("DELETE FROM media WHERE path = ?", missing)
+                self.connection.commit()
+        return len(missing)
+
+    def search(self, text: str = "", directory: Optional[str] = None,
+               min_duration: Optional[float] = None, max_duration: Optional[float] = None,
+               min_width: Optional[int] = None, min_height: Optional[int] = None,
+               order_by: str = 'path', limit: Optional[int] = None) -> List[dict]:
+        """
+        搜索媒体库
+
+        Args:
+            text: 路径中包含的文字（不区分大小写）
+            directory: 只返回该目录（含子目录）下的文件
+            min_duration / max_duration: 时长范围（秒）
+            min_width / min_height: 最小分辨率
+            order_by: 排序字段，path、duration、size、height 或 scanned_at
+            limit: 最多返回条数
+
+        Returns:
+            List[dict]: 媒体信息列表
+        """
+        conditions = ["error IS NULL"]
+        params = []
+        if text:
+            conditions.append("path LIKE ? ESCAPE '\\'")
+            escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if directory:
+            prefix = os.path.join(os.path.abspath(directory), '')
+            conditions.append("substr(path, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            conditions.append("duration <= ?")
+            params.append(max_duration)
+        if min_width:
+            conditions.append("width >= ?")
+            params.append(min_width)
+        if min_height:
+            conditions.append("height >= ?")
+            params.append(min_height)
+
+        if order_by not in ('path', 'duration', 'size', 'height', 'scanned_at'):
+            order_by = 'path'
+        descending = " DESC" if order_by in ('duration', 'size', 'height', 'scanned_at') else ""
+        sql = f"SELECT * FROM media WHERE {' AND '.join(conditions)} ORDER BY {order_by}{descending}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+
+    def count(self) -> int:
+        """获取记录总数"""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+
+    def close(self):
+        """提交并关闭数据库"""
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
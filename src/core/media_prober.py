@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+媒体信息探测模块
+多线程读取视频的分辨率、帧率、帧数等信息，结果写入媒体库并按 (路径, 大小, 修改时间) 命中，
+重新扫描时只探测新增或变化的文件
+"""
+
+import os
+import cv2
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .media_catalog import MediaCatalog
+from .thumbnail_strip import ThumbnailStrip, ThumbnailStripBuilder
+from ..utils.file_utils import FileUtils
+
+
+class MediaProber:
+    """媒体信息探测器类"""
+
+    # 默认探测线程数（打开视频主要耗在文件IO和容器解析，线程可以并行）
+    DEFAULT_WORKERS = 8
+
+    def __init__(self, catalog: Optional[MediaCatalog] = None, workers: int = DEFAULT_WORKERS,
+                 count_frames: bool = False):
+        """
+        Args:
+            catalog: 媒体库（同时作为探测缓存），None 表示不缓存
+            workers: 探测线程数
+            count_frames: 是否逐帧计数得到实际帧数（需要完整解复用和解码一遍，较慢）
+        """
+        self.catalog = catalog
+        self.workers = max(1, workers)
+        self.count_frames = count_frames
+
+    @staticmethod
+    def count_frames_exact(cap: cv2.VideoCapture) -> int:
+        """
+        从当前位置逐帧 grab() 到文件末尾，统计实际可解码的帧数（容器头中的帧数可能不准确）
+
+        Args:
+            cap: 已打开且位于开头的视频
+
+        Returns:
+            int: 帧数
+        """
+        count = 0
+        while cap.grab():
+            count += 1
+        return count
+
+    @staticmethod
+    def probe(video_path: str, catalog: Optional[MediaCatalog] = None,
+              count_frames: bool = False) -> Optional[dict]:
+        """
+        探测单个视频的信息
+
+        Args:
+            video_path: 视频文件路径
+            catalog: 媒体库，内容指纹相同的文件（移动或改名）直接复用已有信息
+            count_frames: 是否逐帧计数得到 real_frame_count
+
+        Returns:
+            dict: 包含 path、size、mtime_ns、fingerprint、width、height、fps、frame_count、
+                  real_frame_count（未计数时为None）、duration、codec、has_index（已有缩略图条）、
+                  thumbnail_path，文件不存在返回None；无法打开时只有文件信息且 error 非空
+        """
+        signature = FileUtils.get_file_signature(video_path)
+        if signature is None:
+            return None
+        path, size, mtime_ns = signature
+        fingerprint = FileUtils.get_content_fingerprint(path)
+        info = {'path': path, 'size': size, 'mtime_ns': mtime_ns, 'fingerprint': fingerprint,
+                'width': 0, 'height': 0, 'fps': 0.0, 'frame_count': 0, 'real_frame_count': None,
+                'duration': 0.0, 'codec': '', 'has_index': False, 'thumbnail_path': None, 'error': None}
+
+        # 缩略图条缓存按文件签名区分，移动过的文件需要重新生成
+        thumbnail_path = ThumbnailStrip.cache_path(path, ThumbnailStripBuilder.DEFAULT_COUNT,
+                                                   ThumbnailStripBuilder.DEFAULT_THUMB_WIDTH)
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            info['thumbnail_path'] = thumbnail_path
+            info['has_index'] = True
+
+        known = catalog.find_by_fingerprint(fingerprint, size) if catalog and fingerprint else None
+        if known is not None and (known['real_frame_count'] is not None or not count_frames):
+            for key in ('width', 'height', 'fps', 'frame_count', 'real_frame_count', 'duration', 'codec'):
+                info[key] = known[key]
+            return info
+
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                info['error'] = "无法打开视频"
+                return info
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            info.update({
+                'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fps': fps,
+                'frame_count': frame_count,
+                'duration': frame_count / fps if fps > 0 else 0.0,
+                'codec': "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00 '),
+            })
+            if count_frames:
+                real_frame_count = MediaProber.count_frames_exact(cap)
+                info['real_frame_count'] = real_frame_count
+                if fps > 0:
+                    info['duration'] = real_frame_count / fps
+        finally:
+            cap.release()
+        return info
+
+    def probe_many(self, entries: Iterable[Tuple[str, int, int]]) -> Iterator[dict]:
+        """
+        并行探测多个视频，结果按完成顺序返回；缓存命中的文件立即返回，不再打开
+
+        Args:
+            entries: (文件路径, 文件大小, 修改时间纳秒) 序列，如 FileUtils.scan_video_files 的输出
+
+        Yields:
+            dict: 探测结果，字段见 probe
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="media-prober") as executor:
+                futures = []
+                for path, size, mtime_ns in entries:
+                    cached = self.catalog.get(path, size, mtime_ns) if self.catalog else None
+                    if cached is not None and (cached['real_frame_count'] is not None or not self.count_frames):
+                        yield cached
+                        continue
+                    futures.append(executor.submit(MediaProber.probe, path, self.catalog, self.count_frames))
+                    # 扫描与探测并行；排队过多时先取回结果，限制未完成任务数
+                    if len(futures) >= self.workers * 4:
+                        yield from self._drain(futures, wait_all=False)
+                yield from self._drain(futures, wait_all=True)
+        finally:
+            if self.catalog:
+                self.catalog.save()
+
+    def _drain(self, futures: list, wait_all: bool) -> Iterator[dict]:
+        """取出已完成的探测结果（wait_all 为True时等待全部完成，否则至少等待一个）"""
+        if wait_all:
+            completed = as_completed(list(futures))
+        else:
+            completed, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in completed:
+            futures.remove(future)
+            info = future.result()
+            if info is None:
+                continue
+            if self.catalog:
+                # 无法打开的文件也记录下来，文件不变时不再重复尝试
+                self.catalog.put(info)
+            yield info
+
+    def scan(self, directory: str, recursive: bool = True) -> Iterator[dict]:
+        """
+        扫描目录并探测其中的视频（有媒体库时同时填充媒体库）
+
+        Args:
+            directory: 目录路径
+            recursive: 是否包含子目录
+
+        Yields:
+            dict: 探测结果，字段见 probe
+        """
+        yield from self.probe_many(FileUtils.scan_video_files(directory, recursive))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存预算模块
+进程内所有缓存和队列（解码帧缓存、磁盘缓存写入队列、视频句柄、缩略图条、黑边检测结果、导出编码队列等）
+登记到同一个内存账本，分配前申请额度，超出总预算时按优先级淘汰：待写入磁盘缓存的帧最先，缩略图条最后
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional
+
+
+class MemoryConsumer:
+    """内存使用方（由 MemoryBudget.register 创建）"""
+
+    def __init__(self, budget: 'MemoryBudget', name: str, priority: int,
+                 usage: Callable[[], int], evict: Optional[Callable[[int], int]]):
+        """
+        Args:
+            budget: 所属内存预算
+            name: 显示名称
+            priority: 淘汰优先级，数值越小越先淘汰
+            usage: 返回当前占用字节数的函数（应为 O(1)）
+            evict: 释放至少指定字节数并返回实际释放字节数的函数，None 表示不可淘汰（只计入用量）
+        """
+        self.budget = budget
+        self.name = name
+        self.priority = priority
+        self.usage = usage
+        self.evict = evict
+        self.evicted_bytes = 0
+        self.evictions = 0
+
+    def request(self, nbytes: int) -> bool:
+        """申请额度，见 MemoryBudget.request"""
+        return self.budget.request(nbytes, self)
+
+    def unregister(self):
+        """注销"""
+        self.budget.unregister(self)
+
+
+class MemoryBudget:
+    """内存预算类（通常使用 MemoryBudget.instance() 获取进程内共享的实例）"""
+
+    # 淘汰优先级（数值越小越先淘汰）
+    PRIORITY_READ_AHEAD = 0      # 推测性的帧（等待写入磁盘缓存的帧，丢弃只影响以后的速度）
+    PRIORITY_FRAME_CACHE = 10    # 已浏览过的解码帧
+    PRIORITY_HANDLES = 20        # 空闲的视频句柄（解码器缓冲）
+    PRIORITY_THUMBNAILS = 30     # 进度条缩略图条、黑边检测结果
+    PRIORITY_EXPORT = 40         # 导出编码队列中的帧（不可淘汰，申请额度时可挤掉所有缓存）
+
+    # 通过环境变量设置预算（MB）
+    BUDGET_ENV = "VFE_MEMORY_BUDGET_MB"
+
+    # 默认预算占物理内存的比例，及无法获取物理内存时的默认值（MB）
+    DEFAULT_RATIO = 0.25
+    FALLBACK_BUDGET_MB = 2048
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, budget_mb: Optional[int] = None):
+        """
+        Args:
+            budget_mb: 总预算（MB），None 表示读取环境变量或按物理内存估算
+        """
+        self.budget_bytes = (budget_mb or self.default_budget_mb()) * 1024 * 1024
+        self.consumers: List[MemoryConsumer] = []
+        # 淘汰回调可能再次查询用量，使用可重入锁
+        self.lock = threading.RLock()
+
+    @classmethod
+    def instance(cls) -> 'MemoryBudget':
+        """获取进程内共享的实例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = MemoryBudget()
+            return cls._instance
+
+    @classmethod
+    def default_budget_mb(cls) -> int:
+        """默认预算：环境变量优先，否则为物理内存的四分之一"""
+        value = os.environ.get(cls.BUDGET_ENV)
+        if value:
+            try:
+                return max(64, int(value))
+            except ValueError:
+                print(f"无效的内存预算 {cls.BUDGET_ENV}={value}，使用默认值")
+        try:
+            physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (AttributeError, ValueError, OSError):
+            return cls.FALLBACK_BUDGET_MB
+        return max(256, int(physical * cls.DEFAULT_RATIO / 1024 / 1024))
+
+    def set_budget(self, budget_mb: int):
+        """调整总预算，超出时立即淘汰"""
+        with self.lock:
+            self.budget_bytes = max(1, budget_mb) * 1024 * 1024
+            self._reclaim(0, None)
+
+    def register(self, name: str, priority: int, usage: Callable[[], int],
+                 evict: Optional[Callable[[int], int]] = None) -> MemoryConsumer:
+        """
+        登记一个内存使用方
+
+        Args:
+            name: 显示名称
+            priority: 淘汰优先级（PRIORITY_*），数值越小越先淘汰
+            usage: 返回当前占用字节数的函数
+            evict: 释放内存的函数 (需要释放的字节数) -> 实际释放的字节数，None 表示不可淘汰
+
+        Returns:
+            MemoryConsumer: 使用方句柄，用于申请额度和注销
+        """
+        consumer = MemoryConsumer(self, name, priority, usage, evict)
+        with self.lock:
+            self.consumers.append(consumer)
+        return consumer
+
+    def unregister(self, consumer: MemoryConsumer):
+        """注销使用方"""
+        with self.lock:
+            if consumer in self.consumers:
+                self.consumers.remove(consumer)
+
+    def used_bytes(self) -> int:
+        """所有使用方的总占用"""
+        with self.lock:
+            return sum(consumer.usage() for consumer in self.consumers)
+
+    def request(self, nbytes: int, requester: Optional[MemoryConsumer] = None) -> bool:
+        """
+        申请额度：总占用加上 nbytes 超出预算时，按优先级从低到高淘汰
+
+        只淘汰优先级不高于申请方的使用方（包括申请方自己较旧的数据），
+        例如待写入磁盘缓存的帧不会挤掉缩略图条，而缩略图条可以挤掉它们
+
+        Args:
+            nbytes: 将要新增的字节数
+            requester: 申请方，None 表示可淘汰所有使用方
+
+        Returns:
+            bool: 淘汰后是否有足够额度（不足时调用方应放弃缓存）
+        """
+        with self.lock:
+            return self._reclaim(nbytes, requester)
+
+    def _reclaim(self, nbytes: int, requester: Optional[MemoryConsumer]) -> bool:
+        """淘汰直到能容纳 nbytes（需持有锁）"""
+        excess = self.used_bytes() + nbytes - self.budget_bytes
+        if excess <= 0:
+            return True
+        limit = requester.priority if requester else None
+        candidates = [consumer for consumer in self.consumers
+                      if consumer.evict and (limit is None or consumer.priority <= limit)]
+        # 优先级低的先淘汰；同优先级时占用大的先淘汰
+        candidates.sort(key=lambda consumer: (consumer.priority, -consumer.usage()))
+        for consumer in candidates:
+            if excess <= 0:
+                break
+            freed = consumer.evict(excess) if consumer.usage() > 0 else 0
+            if freed > 0:
+                consumer.evicted_bytes += freed
+                consumer.evictions += 1
+                excess -= freed
+        return excess <= 0
+
+    def snapshot(self) -> dict:
+        """
+        获取各使用方的当前占用（用于诊断界面）
+
+        Returns:
+            dict: budget_bytes、used_bytes 和 consumers 列表
+                  （每项包含 name、priority、bytes、evictable、evictions、evicted_bytes）
+        """
+        with self.lock:
+            consumers = [{
+                'name': consumer.name,
+                'priority': consumer.priority,
+                'bytes': consumer.usage(),
+                'evictable': consumer.evict is not None,
+                'evictions': consumer.evictions,
+                'evicted_bytes': consumer.evicted_bytes,
+            } for consumer in self.consumers]
+        consumers.sort(key=lambda item: (item['priority'], item['name']))
+        return {
+            'budget_bytes': self.budget_bytes,
+            'used_bytes': sum(item['bytes'] for item in consumers),
+            'consumers': consumers,
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运动触发采样模块
+按探测步长用 grab() 跳帧，只在探测帧的小尺寸灰度图上做帧差；
+画面变化超过阈值时才把该帧交给导出流程，导出开销与画面活动量而非时长成正比
+"""
+
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from .frame_reader import FrameReader
+
+
+class MotionSampler:
+    """运动触发采样器类"""
+
+    # 帧差用代理图宽度
+    PROXY_WIDTH = 160
+
+    # 单个像素灰度变化超过该值才算“变化像素”
+    PIXEL_THRESHOLD = 25
+
+    def __init__(self, probe_stride: int = 5, threshold: float = 0.01, cooldown: int = 0):
+        """
+        Args:
+            probe_stride: 探测步长（帧），中间帧只 grab 不取回
+            threshold: 触发阈值，变化像素占比（0-1）
+            cooldown: 触发后至少间隔多少帧才能再次触发
+        """
+        self.probe_stride = max(1, probe_stride)
+        self.threshold = threshold
+        self.cooldown = max(0, cooldown)
+
+    def make_proxy(self, frame: np.ndarray) -> np.ndarray:
+        """
+        生成帧差用的小尺寸模糊灰度图
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            np.ndarray: 灰度代理图
+        """
+        frame_h, frame_w = frame.shape[:2]
+        stride = max(1, frame_w // (MotionSampler.PROXY_WIDTH * 2))
+        proxy_h = max(1, round(frame_h * MotionSampler.PROXY_WIDTH / frame_w))
+        small = cv2.resize(frame[::stride, ::stride], (MotionSampler.PROXY_WIDTH, proxy_h),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # 轻度模糊，抑制噪点和压缩伪影引起的误触发
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def motion_ratio(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """
+        计算两张代理图之间变化像素的占比
+
+        Returns:
+            float: 变化像素占比（0-1）
+        """
+        return float(np.count_nonzero(cv2.absdiff(previous, current) > MotionSampler.PIXEL_THRESHOLD)) / current.size
+
+    def probe_count(self, start: int, end: int) -> int:
+        """计算区间内的探测次数"""
+        return max(0, (end - start + self.probe_stride - 1) // self.probe_stride)
+
+    def iter_probes(self, reader: FrameReader, start: int = 0,
+                    end: Optional[int] = None) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """
+        逐个探测帧检测运动
+
+        Args:
+            reader: 已打开的帧读取器
+            start: 起始帧号
+            end: 结束帧号（不含），None 表示到视频末尾
+
+        Yields:
+            Tuple[int, Optional[np.ndarray]]: (探测帧号, 触发时为BGR帧，否则为None)
+        """
+        end = reader.total_frames if end is None else min(end, reader.total_frames)
+        previous = None
+        last_trigger = None
+
+        for frame_number in range(max(0, start), end, self.probe_stride):
+            # 跳过的中间帧只 grab，不取回、不做颜色转换
+            if not reader.grab_at(frame_number):
+                return
+            frame = reader.retrieve()
+            if frame is None:
+                return
+
+            proxy = self.make_proxy(frame)
+            triggered = previous is None or self.motion_ratio(previous, proxy) > self.threshold
+            previous = proxy
+
+            if triggered and (last_trigger is None or frame_number - last_trigger >= self.cooldown):
+                last_trigger = frame_number
+                yield frame_number, frame
+            else:
+                yield frame_number, None
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出缓存模块
+按 (视频内容指纹, 帧号, 裁剪/尺寸/格式/质量) 对导出的图片做内容寻址缓存；
+重新导出相同内容时直接硬链接（不支持时复制）缓存文件，不再解码和编码。
+缓存总大小有上限，超出时按最近使用时间淘汰
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from typing import Optional
+
+from ..utils.cache_utils import CacheUtils
+
+
+class OutputCache:
+    """输出缓存类（索引保存在 SQLite，多进程可共用）"""
+
+    # 缓存子目录和索引文件名
+    CACHE_SUBDIR = "outputs"
+    INDEX_FILENAME = "index.sqlite3"
+
+    # 默认缓存上限（MB）
+    DEFAULT_MAX_MB = 2048
+
+    # 淘汰后保留的比例，避免每次写入都触发淘汰
+    EVICT_TARGET_RATIO = 0.9
+
+    # 每写入多少个文件检查一次总大小
+    CHECK_EVERY = 50
+
+    def __init__(self, directory: Optional[str] = None, max_mb: int = DEFAULT_MAX_MB):
+        """
+        Args:
+            directory: 缓存目录，None 表示使用默认缓存目录
+            max_mb: 缓存总大小上限（MB）
+        """
+        self.directory = directory or CacheUtils.get_cache_dir(self.CACHE_SUBDIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max(1, max_mb) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.puts_since_check = 0
+        # 自动提交：批量导出的多个进程共用索引，不长时间持有写锁
+        self.connection = sqlite3.connect(os.path.join(self.directory, self.INDEX_FILENAME), timeout=30,
+                                          isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)")
+
+    @staticmethod
+    def make_key(video_fingerprint: str, frame_number: int, spec: dict, roi) -> str:
+        """
+        生成缓存键
+
+        Args:
+            video_fingerprint: 视频内容指纹
+            frame_number: 帧号
+            spec: 输出规格（只取影响像素和编码的键）
+            roi: 实际使用的裁剪区域
+
+        Returns:
+            str: 缓存键
+        """
+        relevant = {key: spec.get(key) for key in ('format', 'size', 'width', 'height', 'quality')}
+        text = json.dumps([video_fingerprint, frame_number, relevant, roi], sort_keys=True, default=str)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _blob_path(self, key: str, ext: str) -> str:
+        """缓存文件路径（按键的前两位分子目录）"""
+        return os.path.join(self.directory, key[:2], f"{key}{ext}")
+
+    @staticmethod
+    def _link_or_copy(source: str, target: str):
+        """硬链接文件，跨设备或不支持时复制；目标已存在时先删除"""
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+    def contains(self, key: str) -> bool:
+        """缓存中是否有该键（不计入命中率）"""
+        row = self.connection.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+        return bool(row) and os.path.exists(row[0])
+
+    def restore(self, key: str, target: str) -> bool:
+        """
+        把缓存的文件放到目标路径
+
+        Args:
+            key: 缓存键
+            target: 目标路径
+
+        Returns:
+            bool: 是否命中
+        """
+        row = self.connection.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+        if row and os.path.exists(row[0]):
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+                self._link_or_copy(row[0], target)
+            except OSError as e:
+                print(f"恢复缓存文件失败: {e}")
+            else:
+                self.connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.hits += 1
+                return True
+        elif row:
+            # 缓存文件已被外部删除
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self.misses += 1
+        return False
+
+    def put(self, key: str, source: str):
+        """
+        把新导出的文件加入缓存
+
+        Args:
+            key: 缓存键
+            source: 已导出的文件路径
+        """
+        blob_path = self._blob_path(key, os.path.splitext(source)[1])
+        try:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._link_or_copy(source, blob_path)
+            size = os.path.getsize(blob_path)
+        except OSError as e:
+            print(f"写入输出缓存失败: {e}")
+            return
+        self.connection.execute("INSERT OR REPLACE INTO entries (key, path, size, last_access) VALUES (?, ?, ?, ?)",
+                                (key, blob_path, size, time.time()))
+        self.puts_since_check += 1
+        if self.puts_since_check >= self.CHECK_EVERY:
+            self.evict()
+
+    def total_bytes(self) -> int:
+        """缓存总大小（字节）"""
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        超出上限时按最近使用时间淘汰
+
+        Returns:
+            int: 淘汰的文件数
+        """
+        self.puts_since_check = 0
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        target = int(self.max_bytes * self.EVICT_TARGET_RATIO)
+        removed = []
+        for key, path, size in self.connection.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_access").fetchall():
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            removed.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", removed)
+        return len(removed)
+
+    def hit_rate(self) -> float:
+        """命中率（0-1）"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """执行淘汰检查并关闭索引"""
+        self.evict()
+        self.connection.close()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能统计模块
+在热路径（打开、定位、解码、颜色转换、缩放、编码、写入、界面显示转换）上记录耗时直方图和计数，
+用于找出时间花在哪里；默认关闭，关闭时每次计时只多一次属性判断
+
+启用方式: 环境变量 VFE_PERF=1、命令行 --perf，或调用 PerfStats.enable()
+退出时输出: 环境变量 VFE_PERF_OUTPUT 或命令行 --perf-output 指定文件（.prom/.txt 为 Prometheus 文本格式，
+其余为 JSON），未指定时把摘要打印到标准错误；其他模块的统计（如 TaskScheduler 的各类别排队延迟）
+通过 register_source 登记后一起输出
+"""
+
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, List, Optional
+
+
+class PerfMetric:
+    """单项耗时统计（直方图，单位秒）"""
+
+    # 直方图上界（秒），与 Prometheus 的 le 标签一致
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)  # 最后一个为超出所有上界
+
+    def add(self, seconds: float):
+        """记录一次耗时（调用方持有锁）"""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """按直方图估算分位数（取所在桶的上界，秒）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """转换为字典（毫秒）"""
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': self.min * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'last_ms': self.last * 1000,
+            'p50_ms': self.quantile(0.5) * 1000,
+            'p95_ms': self.quantile(0.95) * 1000,
+            'buckets': {str(bound): count for bound, count in zip(self.BUCKETS, self.buckets)},
+            'overflow': self.buckets[-1],
+        }
+
+
+class _Timer:
+    """计时上下文（启用时由 PerfStats.measure 返回）"""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        PerfStats.record(self.name, time.perf_counter() - self.start)
+
+
+class PerfStats:
+    """性能统计类（进程内全局，均为类方法）"""
+
+    # 环境变量
+    ENABLE_ENV = "VFE_PERF"
+    OUTPUT_ENV = "VFE_PERF_OUTPUT"
+
+    # 热路径阶段名称（输出时按此顺序排列）
+    STAGES = ('open', 'seek', 'decode', 'convert', 'resize', 'encode', 'write', 'display')
+
+    enabled = os.environ.get(ENABLE_ENV, "").lower() not in ("", "0", "false", "no")
+
+    _metrics = {}  # 名称 -> PerfMetric
+    _counters = {}  # 名称 -> 累计值
+    _sources = {}  # 名称 -> (快照函数, 摘要函数, Prometheus 函数)
+    _lock = threading.Lock()
+    _null = nullcontext()
+    _started = time.monotonic()
+    _exit_output = None
+    _exit_registered = False
+
+    @classmethod
+    def enable(cls, enabled: bool = True):
+        """启用或关闭统计（已记录的数据保留）"""
+        cls.enabled = enabled
+
+    @classmethod
+    def measure(cls, name: str):
+        """
+        计时上下文：with PerfStats.measure('decode'): ...
+
+        Args:
+            name: 阶段名称
+
+        Returns:
+            上下文管理器，关闭时为不计时的空上下文
+        """
+        if not cls.enabled:
+            return cls._null
+        return _Timer(name)
+
+    @classmethod
+    def record(cls, name: str, seconds: float):
+        """记录一次耗时（秒）"""
+        with cls._lock:
+            metric = cls._metrics.get(name)
+            if metric is None:
+                metric = cls._metrics[name] = PerfMetric()
+            metric.add(seconds)
+
+    @classmethod
+    def count(cls, name: str, value: int = 1):
+        """累加计数（如写入字节数）"""
+        if not cls.enabled:
+            return
+        with cls._lock:
+            cls._counters[name] = cls._counters.get(name, 0) + value
+
+    @classmethod
+    def register_source(cls, name: str, snapshot: Callable[[], dict], summary_lines: Callable[[], List[str]],
+                        prometheus_lines: Optional[Callable[[str], List[str]]] = None):
+        """
+        登记其他模块的统计，随快照、摘要和 Prometheus 输出一起输出（同名时替换）
+
+        Args:
+            name: 名称（快照中的键）
+            snapshot: 返回统计字典的函数
+            summary_lines: 返回摘要行的函数
+            prometheus_lines: 接收指标名前缀、返回 Prometheus 文本行的函数
+        """
+        with cls._lock:
+            cls._sources[name] = (snapshot, summary_lines, prometheus_lines)
+
+    @classmethod
+    def reset(cls):
+        """清空已记录的数据"""
+        with cls._lock:
+            cls._metrics.clear()
+            cls._counters.clear()
+            cls._started = time.monotonic()
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """
+        获取当前统计
+
+        Returns:
+            dict: uptime_seconds、timers（名称 -> 耗时统计，毫秒）、counters（名称 -> 累计值），
+                  以及 register_source 登记的各项统计（名称 -> 统计字典）
+        """
+        timers = cls._timers()
+        with cls._lock:
+            snapshot = {
+                'uptime_seconds': time.monotonic() - cls._started,
+                'timers': timers,
+                'counters': dict(sorted(cls._counters.items())),
+            }
+            sources = list(cls._sources.items())
+        # 登记的统计函数有自己的锁，在锁外调用
+        for name, (source_snapshot, _, _) in sources:
+            snapshot[name] = source_snapshot()
+        return snapshot
+
+    @classmethod
+    def to_json(cls) -> str:
+        """JSON 格式"""
+        return json.dumps(cls.snapshot(), ensure_ascii=False, indent=2)
+
+    @classmethod
+    def to_prometheus(cls, prefix: str = "vfe") -> str:
+        """
+        Prometheus 文本格式（每个阶段一个 histogram，计数为 counter）
+
+        Args:
+            prefix: 指标名前缀
+        """
+        lines = [f"# HELP {prefix}_stage_seconds 热路径各阶段耗时",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        with cls._lock:
+            metrics = list(cls._metrics.items())
+            counters = list(cls._counters.items())
+            for name, metric in metrics:
+                cumulative = 0
+                for bound, count in zip(PerfMetric.BUCKETS, metric.buckets):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {metric.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {metric.total:.9f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {metric.count}')
+        for name, value in counters:
+            metric_name = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric_name} counter")
+            lines.append(f"{metric_name} {value}")
+        for _, _, source_prometheus in cls._source_list():
+            if source_prometheus:
+                lines.extend(source_prometheus(prefix))
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def summary_lines(cls, stages: Optional[tuple] = None) -> list:
+        """
+        简短摘要（每个阶段一行，用于叠加显示和终端输出）
+
+        Args:
+            stages: 只列出这些阶段，None 表示全部（同时列出登记的统计）
+        """
+        lines = []
+        for name, metric in cls._timers().items():
+            if stages and name not in stages:
+                continue
+            lines.append(f"{name:<8} {metric['last_ms']:7.2f} ms  平均 {metric['mean_ms']:7.2f}  "
+                         f"p95 {metric['p95_ms']:7.2f}  ×{metric['count']}")
+        if not stages:
+            for _, source_lines, _ in cls._source_list():
+                lines.extend(source_lines())
+        return lines
+
+    @classmethod
+    def _timers(cls) -> dict:
+        """各阶段耗时统计（毫秒），按 STAGES 顺序排列"""
+        with cls._lock:
+            names = sorted(cls._metrics, key=lambda name: (
+                cls.STAGES.index(name) if name in cls.STAGES else len(cls.STAGES), name))
+            return {name: cls._metrics[name].to_dict() for name in names}
+
+    @classmethod
+    def _source_list(cls) -> list:
+        """登记的统计函数列表（在锁外调用）"""
+        with cls._lock:
+            return list(cls._sources.values())
+
+    @classmethod
+    def dump(cls, output: Optional[str] = None) -> bool:
+        """
+        输出统计：写入文件（.prom/.txt 为 Prometheus 格式，其余为 JSON），未指定时打印摘要到标准错误
+
+        Returns:
+            bool: 成功返回True
+        """
+        if not output:
+            print("性能统计:", file=sys.stderr)
+            for line in cls.summary_lines():
+                print(f"  {line}", file=sys.stderr)
+            return True
+        text = cls.to_prometheus() if output.lower().endswith(('.prom', '.txt')) else cls.to_json()
+        try:
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(text)
+            return True
+        except OSError as e:
+            print(f"写入性能统计失败: {e}", file=sys.stderr)
+            return False
+
+    @classmethod
+    def dump_at_exit(cls, output: Optional[str] = None):
+        """
+        启用统计时，在进程退出时输出（命令行和帧服务模式调用）
+
+        Args:
+            output: 输出文件，None 表示使用环境变量 VFE_PERF_OUTPUT
+        """
+        cls._exit_output = output or os.environ.get(cls.OUTPUT_ENV)
+        if not cls._exit_registered:
+            cls._exit_registered = True
+            atexit.register(cls._dump_on_exit)
+
+    @classmethod
+    def _dump_on_exit(cls):
+        """退出时回调"""
+        if cls.enabled and (cls._metrics or any(source_lines() for _, source_lines, _ in cls._source_list())):
+            cls.dump(cls._exit_output)
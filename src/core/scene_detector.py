@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+镜头切换检测模块
+解码线程生成小尺寸代理图，主线程用向量化的亮度差或HSV直方图差判断镜头切换
+"""
+
+import queue
+import threading
+import cv2
+import numpy as np
+from typing import Callable, List, Optional
+
+from .frame_reader import FrameReader
+from ..utils.file_utils import FileUtils
+
+
+class SceneDetector:
+    """镜头切换检测器类"""
+
+    # 代理图尺寸
+    PROXY_SIZE = (64, 36)
+
+    # 默认切换阈值（亮度差为 0-1 的平均绝对差；直方图为 0-1 的巴氏距离）
+    DEFAULT_THRESHOLDS = {
+        'luma': 0.12,
+        'hsv': 0.15,
+    }
+
+    # 解码线程与检测线程之间的队列长度
+    QUEUE_SIZE = 64
+
+    # 检测结果缓存：(文件签名, 参数) -> 镜头起始帧列表
+    _cache = {}
+
+    def __init__(self, method: str = 'luma', threshold: Optional[float] = None,
+                 min_scene_len: int = 15, frame_step: int = 1):
+        """
+        Args:
+            method: 比较方法，luma（亮度差）或 hsv（HSV直方图）
+            threshold: 切换阈值，None 使用默认值
+            min_scene_len: 最短镜头长度（帧）
+            frame_step: 检测步长，大于1时用 grab() 跳过中间帧
+        """
+        self.method = method if method in SceneDetector.DEFAULT_THRESHOLDS else 'luma'
+        self.threshold = threshold if threshold is not None else SceneDetector.DEFAULT_THRESHOLDS[self.method]
+        self.min_scene_len = max(1, min_scene_len)
+        self.frame_step = max(1, frame_step)
+        self.cancelled = False
+
+    def cancel(self):
+        """取消检测"""
+        self.cancelled = True
+
+    def make_proxy(self, frame: np.ndarray) -> np.ndarray:
+        """
+        生成用于比较的代理特征
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            np.ndarray: luma 方法为 float32 灰度小图，hsv 方法为归一化直方图
+        """
+        # 先按整数步长抽取像素（numpy视图，不复制），再区域插值到代理尺寸
+        stride = max(1, frame.shape[1] // (SceneDetector.PROXY_SIZE[0] * 4))
+        small = cv2.resize(frame[::stride, ::stride], SceneDetector.PROXY_SIZE,
+                           interpolation=cv2.INTER_AREA)
+        if self.method == 'hsv':
+            hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+            hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+            return cv2.normalize(hist, hist).flatten()
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    def score(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """
+        计算相邻代理特征的差异分数（0-1）
+        """
+        if self.method == 'hsv':
+            return float(cv2.compareHist(previous, current, cv2.HISTCMP_BHATTACHARYYA))
+        return float(np.mean(np.abs(current - previous))) / 255.0
+
+    def detect(self, video_path: str,
+               progress_callback: Optional[Callable[[int, int], None]] = None) -> List[int]:
+        """
+        检测视频中的镜头切换点
+
+        Args:
+            video_path: 视频文件路径
+            progress_callback: 进度回调 (当前帧号, 总帧数)
+
+        Returns:
+            List[int]: 各镜头的起始帧号（第一个总是0），失败返回空列表
+        """
+        signature = FileUtils.get_file_signature(video_path)
+        cache_key = (signature, self.method, self.threshold, self.min_scene_len, self.frame_step)
+        if signature and cache_key in SceneDetector._cache:
+            return list(SceneDetector._cache[cache_key])
+
+        reader = FrameReader(video_path)
+        if not reader.is_opened():
+            return []
+
+        proxies = queue.Queue(maxsize=SceneDetector.QUEUE_SIZE)
+        stop_event = threading.Event()
+        decoder = threading.Thread(target=self._decode_loop, args=(reader, proxies, stop_event),
+                                   name="scene-decoder", daemon=True)
+        decoder.start()
+
+        cuts = [0]
+        previous = None
+        try:
+            while True:
+                item = proxies.get()
+                if item is None:
+                    break
+                frame_number, proxy = item
+                if self.cancelled:
+                    break
+                if previous is not None and frame_number - cuts[-1] >= self.min_scene_len:
+                    if self.score(previous, proxy) > self.threshold:
+                        cuts.append(frame_number)
+                previous = proxy
+                if progress_callback:
+                    progress_callback(frame_number, reader.total_frames)
+        finally:
+            stop_event.set()
+            # 清空队列，让解码线程尽快退出
+            while decoder.is_alive():
+                try:
+                    proxies.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader.release()
+
+        if not self.cancelled and signature:
+            SceneDetector._cache[cache_key] = list(cuts)
+        return cuts
+
+    def _decode_loop(self, reader: FrameReader, proxies: queue.Queue, stop_event: threading.Event):
+        """解码线程：顺序读取帧并生成代理特征"""
+        try:
+            for frame_number, frame in reader.iter_range(step=self.frame_step):
+                if stop_event.is_set():
+                    break
+                proxies.put((frame_number, self.make_proxy(frame)))
+        except Exception as e:
+            print(f"镜头检测解码失败: {e}")
+        finally:
+            proxies.put(None)
+
+    @staticmethod
+    def representative_frames(cuts: List[int], total_frames: int) -> List[int]:
+        """
+        根据镜头起始帧计算每个镜头的代表帧（镜头中间帧）
+
+        Args:
+            cuts: 镜头起始帧号列表
+            total_frames: 视频总帧数
+
+        Returns:
+            List[int]: 代表帧号列表
+        """
+        bounds = list(cuts) + [total_frames]
+        return [(start + end - 1) // 2 for start, end in zip(bounds, bounds[1:]) if end > start]
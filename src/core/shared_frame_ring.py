@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享内存帧环模块
+在进程之间传递解码帧：帧数据写入 multiprocessing.shared_memory 中的固定大小槽位，
+管道中只传递很小的描述符 (槽位, 序号, 形状, 类型)，避免把整帧 pickle 后经管道复制两次
+
+每个环只有一个写入进程，按顺序循环使用槽位；每个槽位有序号（写入中为奇数，写完为偶数），
+读取方据此发现槽位在读取前或读取过程中已被覆盖
+"""
+
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .memory_budget import MemoryBudget
+
+# 3.13 起 SharedMemory 支持 track 参数；之前的版本连接时总会登记到 resource_tracker
+_HAS_TRACK = sys.version_info >= (3, 13)
+
+
+class SharedFrameRing:
+    """共享内存帧环类
+
+    创建方（通常是界面或调度进程）用 create 创建并负责 unlink，
+    写入进程用 spec() 得到的参数 attach；写入方应保证未读取的帧不超过槽位数（如一问一答，
+    或读取方确认后再写），否则较旧的帧被覆盖，读取时返回None
+    """
+
+    # 默认槽位数
+    DEFAULT_SLOTS = 4
+
+    # 每个槽位头部的 int64 字段：序号、数据字节数
+    HEADER_FIELDS = 2
+
+    def __init__(self, memory: shared_memory.SharedMemory, slots: int, slot_bytes: int, owner: bool):
+        """请使用 create 或 attach 创建"""
+        self.memory = memory
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+        header_bytes = slots * self.HEADER_FIELDS * 8
+        self.header = np.ndarray((slots, self.HEADER_FIELDS), dtype=np.int64, buffer=memory.buf)
+        self.data = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=memory.buf, offset=header_bytes)
+        # 写入方已写入的帧数和下一次使用的槽位：从现有序号继续，新的写入进程不会与旧描述符重号
+        self.sequence = (int(self.header[:, 0].max()) + 1) // 2
+        self.cursor = self.sequence % slots
+        self.consumer = None
+        if owner:
+            # 共享内存不可淘汰，只计入内存预算以便在诊断中显示
+            self.consumer = MemoryBudget.instance().register(
+                f"共享帧环 {memory.name}", MemoryBudget.PRIORITY_HANDLES, lambda: memory.size)
+
+    @classmethod
+    def create(cls, slot_bytes: int, slots: int = DEFAULT_SLOTS) -> 'SharedFrameRing':
+        """
+        创建帧环
+
+        Args:
+            slot_bytes: 每个槽位的字节数（如 3840 * 2160 * 3）
+            slots: 槽位数
+
+        Returns:
+            SharedFrameRing: 创建方的帧环
+        """
+        slots = max(1, slots)
+        size = slots * cls.HEADER_FIELDS * 8 + slots * slot_bytes
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        # 新建的共享内存内容为零
+        return cls(memory, slots, slot_bytes, owner=True)
+
+    @classmethod
+    def for_frame(cls, width: int, height: int, channels: int = 3,
+                  slots: int = DEFAULT_SLOTS) -> 'SharedFrameRing':
+        """按帧尺寸创建帧环"""
+        return cls.create(width * height * channels, slots)
+
+    def spec(self) -> Tuple[str, int, int]:
+        """
+        获取连接参数（可经管道或进程参数传给写入进程）
+
+        Returns:
+            Tuple[str, int, int]: (共享内存名称, 槽位数, 每槽字节数)
+        """
+        return self.memory.name, self.slots, self.slot_bytes
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int, int]) -> 'SharedFrameRing':
+        """
+        在其他进程中连接已创建的帧环
+
+        Args:
+            spec: 创建方 spec() 的返回值
+
+        Returns:
+            SharedFrameRing: 帧环（不负责 unlink）
+        """
+        name, slots, slot_bytes = spec
+        # 不登记到 resource_tracker，连接方退出时不会删除创建方的共享内存
+        if _HAS_TRACK:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            memory = shared_memory.SharedMemory(name=name)
+            if sys.platform != 'win32':
+                resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, slots, slot_bytes, owner=False)
+
+    def write(self, frame: np.ndarray) -> Optional[tuple]:
+        """
+        写入一帧（只能由一个进程写入）
+
+        Args:
+            frame: 帧数据（任意形状的 numpy 数组）
+
+        Returns:
+            tuple: 描述符 (槽位, 序号, 形状, 类型)，帧大于槽位时返回None
+        """
+        if frame.nbytes > self.slot_bytes:
+            return None
+        slot = self.cursor
+        self.cursor = (self.cursor + 1) % self.slots
+        self.sequence += 1
+        sequence = self.sequence * 2
+
+        # 序号置为奇数表示写入中，写完后置为偶数
+        self.header[slot, 0] = sequence - 1
+        target = self.data[slot, :frame.nbytes].view(frame.dtype).reshape(frame.shape)
+        np.copyto(target, frame, casting='no')
+        self.header[slot, 1] = frame.nbytes
+        self.header[slot, 0] = sequence
+        return slot, sequence, frame.shape, frame.dtype.str
+
+    def view(self, descriptor: tuple) -> Optional[np.ndarray]:
+        """
+        不复制地访问描述符对应的帧（之后须用 is_valid 确认期间未被覆盖）
+
+        Returns:
+            np.ndarray: 指向共享内存的数组，槽位已被覆盖返回None
+        """
+        slot, sequence, shape, dtype = descriptor
+        if self.header[slot, 0] != sequence:
+            return None
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return self.data[slot, :nbytes].view(dtype).reshape(shape)
+
+    def is_valid(self, descriptor: tuple) -> bool:
+        """描述符对应的槽位是否仍是该帧"""
+        slot, sequence = descriptor[0], descriptor[1]
+        return self.header[slot, 0] == sequence
+
+    def read(self, descriptor: tuple) -> Optional[np.ndarray]:
+        """
+        复制出描述符对应的帧
+
+        Returns:
+            np.ndarray: 帧数据，槽位在读取前或读取过程中被覆盖返回None
+        """
+        frame = self.view(descriptor)
+        if frame is None:
+            return None
+        frame = frame.copy()
+        return frame if self.is_valid(descriptor) else None
+
+    def close(self):
+        """断开连接；创建方同时删除共享内存"""
+        self.header = None
+        self.data = None
+        try:
+            self.memory.close()
+        except BufferError:
+            # 调用方仍持有 view 返回的数组，映射在数组释放后解除
+            pass
+        if self.owner:
+            self.consumer.unregister()
+            if not _HAS_TRACK and sys.platform != 'win32':
+                # 同一 tracker 下连接方的注销也删除了创建方的登记，重新登记后 unlink 的注销才能配对
+                resource_tracker.register(self.memory._name, 'shared_memory')
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+清晰度评分模块
+在缩小的灰度图上计算拉普拉斯方差，用于在一段帧中挑选最清晰的一帧
+"""
+
+import cv2
+import numpy as np
+from typing import Iterable, Optional, Tuple
+
+
+class SharpnessScorer:
+    """清晰度评分工具类"""
+
+    # 评分用代理图宽度
+    PROXY_WIDTH = 480
+
+    @staticmethod
+    def score(frame: np.ndarray) -> float:
+        """
+        计算帧的清晰度（拉普拉斯方差，越大越清晰）
+
+        Args:
+            frame: BGR格式的帧数据
+
+        Returns:
+            float: 清晰度分数
+        """
+        frame_h, frame_w = frame.shape[:2]
+        if frame_w > SharpnessScorer.PROXY_WIDTH:
+            proxy_h = max(1, round(frame_h * SharpnessScorer.PROXY_WIDTH / frame_w))
+            frame = cv2.resize(frame, (SharpnessScorer.PROXY_WIDTH, proxy_h), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+    @staticmethod
+    def pick_sharpest(frames: Iterable[Tuple[int, np.ndarray]]) -> Optional[Tuple[int, np.ndarray, float]]:
+        """
+        从一组帧中挑选最清晰的一帧
+
+        Args:
+            frames: (帧号, BGR帧) 序列
+
+        Returns:
+            Tuple[int, np.ndarray, float]: (帧号, 帧数据, 分数)，序列为空返回None
+        """
+        best = None
+        for frame_number, frame in frames:
+            value = SharpnessScorer.score(frame)
+            if best is None or value > best[2]:
+                best = (frame_number, frame, value)
+        return best
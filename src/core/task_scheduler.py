@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务调度模块
+按优先级类别调度进程内的解码工作：交互跳转 > 播放预读 > 索引/缩略图生成 > 批量导出
+
+两种用法:
+    submit(priority, fn, ...)       提交到调度器的线程池，按优先级排队，记录排队延迟
+    with active(priority): ...      在调用方线程中执行（如界面线程上的跳转），执行期间计为该类别活跃
+低优先级的长任务在每帧边界调用 yield_point(priority)：有更高优先级的工作正在进行时在此等待，
+把 CPU 和解码器让给交互操作；线程池中保留一个线程给交互和播放类任务，后台长任务占满其余线程时
+交互任务仍可立即开始
+
+统计信息随 PerfStats 一起输出（--perf、界面性能叠加显示）
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from .perf_stats import PerfStats
+
+
+class TaskScheduler:
+    """任务调度器类（通常使用 TaskScheduler.instance() 获取进程内共享的实例）"""
+
+    # 优先级类别（数值越小越优先）
+    PRIORITY_INTERACTIVE = 0  # 用户点击进度条、逐帧跳转等
+    PRIORITY_PLAYBACK = 1     # 播放时读取下一帧
+    PRIORITY_INDEX = 2        # 镜头检测、缩略图条生成
+    PRIORITY_BATCH = 3        # 批量导出、拼版图
+
+    # 类别名称（统计信息的键）
+    CLASS_NAMES = ('interactive', 'playback', 'index', 'batch')
+
+    # 高优先级工作结束后，低优先级任务继续等待的时间（秒）：拖动进度条时跳转成串到来，
+    # 两次跳转之间不让后台任务抢回解码器；播放每帧都会读取，不设等待，否则后台任务完全停止
+    GRACE_SECONDS = (0.25, 0.0, 0.0, 0.0)
+
+    # 每类保留的延迟样本数
+    SAMPLE_SIZE = 1000
+
+    # 默认工作线程数（其中一个保留给交互和播放类任务）
+    DEFAULT_WORKERS = 4
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        """
+        Args:
+            workers: submit 使用的工作线程数（至少2个：后台任务最多占用 workers - 1 个）
+        """
+        classes = len(self.CLASS_NAMES)
+        self.workers = max(2, workers)
+        self.background_running = 0  # 线程池中正在运行的后台类（索引、批量）任务数
+        self.condition = threading.Condition()
+        self.queue = []  # (优先级, 序号, 提交时间, Future, 函数, 参数)
+        self.counter = itertools.count()
+        self.threads = []
+        self.shutting_down = False
+
+        self.active_count = [0] * classes
+        self.last_active_end = [0.0] * classes
+        self.queue_latency = [deque(maxlen=self.SAMPLE_SIZE) for _ in range(classes)]
+        self.run_time = [deque(maxlen=self.SAMPLE_SIZE) for _ in range(classes)]
+        self.completed = [0] * classes
+        self.yields = [0] * classes
+        self.yield_seconds = [0.0] * classes
+
+    @classmethod
+    def instance(cls) -> 'TaskScheduler':
+        """获取进程内共享的实例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = TaskScheduler()
+                PerfStats.register_source('scheduler', cls._instance.stats, cls._instance.summary_lines,
+                                          cls._instance.prometheus_lines)
+            return cls._instance
+
+    # ---- 线程池 ----
+
+    def submit(self, priority: int, fn: Callable, *args, **kwargs) -> Future:
+        """
+        提交任务，按优先级（同级按提交顺序）由线程池执行
+
+        Args:
+            priority: 优先级类别（PRIORITY_*）
+            fn: 任务函数，长任务应在帧边界调用 yield_point
+
+        Returns:
+            Future: 任务结果
+        """
+        future = Future()
+        with self.condition:
+            if self.shutting_down:
+                raise RuntimeError("调度器已关闭")
+            heappush(self.queue, (priority, next(self.counter), time.monotonic(), future, fn, args, kwargs))
+            if len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._worker_loop, name=f"task-scheduler-{len(self.threads)}",
+                                          daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify_all()
+        return future
+
+    def _runnable(self) -> bool:
+        """队首任务能否开始（需持有锁）：后台类任务不占用保留给交互和播放的线程"""
+        if not self.queue:
+            return False
+        return self.queue[0][0] < self.PRIORITY_INDEX or self.background_running < self.workers - 1
+
+    def _worker_loop(self):
+        """工作线程：取出优先级最高的任务执行"""
+        while True:
+            with self.condition:
+                while not self._runnable():
+                    if self.shutting_down and not self.queue:
+                        return
+                    self.condition.wait()
+                priority, _, submitted, future, fn, args, kwargs = heappop(self.queue)
+                if not future.cancelled():
+                    self.queue_latency[priority].append(time.monotonic() - submitted)
+                background = priority >= self.PRIORITY_INDEX
+                if background:
+                    self.background_running += 1
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                with self.active(priority):
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                if background:
+                    with self.condition:
+                        self.background_running -= 1
+                        self.condition.notify_all()
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池（已排队的任务仍会执行）"""
+        with self.condition:
+            self.shutting_down = True
+            self.condition.notify_all()
+            threads = list(self.threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    # ---- 协作式让出 ----
+
+    @contextmanager
+    def active(self, priority: int) -> Iterator[None]:
+        """
+        在调用方线程中执行一段该类别的工作（期间更低优先级的任务在 yield_point 等待）
+
+        Args:
+            priority: 优先级类别
+        """
+        start = time.monotonic()
+        with self.condition:
+            self.active_count[priority] += 1
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            with self.condition:
+                self.active_count[priority] -= 1
+                self.last_active_end[priority] = end
+                self.run_time[priority].append(end - start)
+                self.completed[priority] += 1
+                self.condition.notify_all()
+
+    def _busy_until(self, priority: int, now: float) -> Optional[float]:
+        """
+        更高优先级的工作何时结束（需持有锁）
+
+        Returns:
+            float: 正在进行时返回 now，处于等待期时返回等待期结束时间，空闲返回None
+        """
+        busy_until = None
+        for higher in range(priority):
+            if self.active_count[higher] > 0:
+                return now
+            grace_end = self.last_active_end[higher] + self.GRACE_SECONDS[higher]
+            if grace_end > now:
+                busy_until = max(busy_until or 0.0, grace_end)
+        return busy_until
+
+    def yield_point(self, priority: int, cancelled: Optional[Callable[[], bool]] = None) -> float:
+        """
+        帧边界让出：有更高优先级的工作时等待其结束
+
+        Args:
+            priority: 调用方任务的优先级类别
+            cancelled: 返回是否已取消的函数，取消后立即返回
+
+        Returns:
+            float: 等待的秒数
+        """
+        if priority <= self.PRIORITY_INTERACTIVE:
+            return 0.0
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                busy_until = self._busy_until(priority, now)
+                if busy_until is None or (cancelled and cancelled()):
+                    break
+                # 正在进行时等待通知（定期醒来检查取消），等待期内等到期满
+                self.condition.wait(0.1 if busy_until <= now else busy_until - now)
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self.yields[priority] += 1
+                self.yield_seconds[priority] += waited
+        return waited
+
+    # ---- 统计 ----
+
+    @staticmethod
+    def _summary(samples) -> dict:
+        """延迟样本的统计（毫秒）"""
+        if not samples:
+            return {'count': 0, 'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        values = np.array(samples) * 1000
+        return {
+            'count': len(values),
+            'mean_ms': float(values.mean()),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max()),
+        }
+
+    def stats(self) -> dict:
+        """
+        获取各类别的统计信息
+
+        Returns:
+            dict: 类别名称 -> queued（排队数）、active（进行中）、completed（已完成）、
+                  queue_latency（submit 的排队延迟）、run_time（每次工作的耗时）、
+                  yields（让出次数）、yield_seconds（让出等待总秒数）
+        """
+        with self.condition:
+            queued = [0] * len(self.CLASS_NAMES)
+            for item in self.queue:
+                queued[item[0]] += 1
+            return {
+                name: {
+                    'queued': queued[priority],
+                    'active': self.active_count[priority],
+                    'completed': self.completed[priority],
+                    'queue_latency': self._summary(self.queue_latency[priority]),
+                    'run_time': self._summary(self.run_time[priority]),
+                    'yields': self.yields[priority],
+                    'yield_seconds': self.yield_seconds[priority],
+                }
+                for priority, name in enumerate(self.CLASS_NAMES)
+            }
+
+    def summary_lines(self) -> List[str]:
+        """
+        简短摘要（有过活动的类别每类一行，随 PerfStats.summary_lines 输出）
+
+        Returns:
+            List[str]: 排队数、进行中、完成数、排队延迟和运行耗时的 p95、让出次数
+        """
+        lines = []
+        for name, item in self.stats().items():
+            if not (item['queued'] or item['active'] or item['completed']):
+                continue
+            lines.append(f"{name:<11} 排队 {item['queued']:2d}  进行 {item['active']:2d}  完成 {item['completed']:5d}  "
+                         f"排队p95 {item['queue_latency']['p95_ms']:7.2f} ms  运行p95 {item['run_time']['p95_ms']:8.2f} ms  "
+                         f"让出 {item['yields']}")
+        return lines
+
+    def prometheus_lines(self, prefix: str) -> List[str]:
+        """
+        Prometheus 文本格式的各类别统计（随 PerfStats.to_prometheus 输出）
+
+        Args:
+            prefix: 指标名前缀
+        """
+        stats = self.stats()
+        lines = []
+        for metric, kind, key in (('queued', 'gauge', 'queued'), ('active', 'gauge', 'active'),
+                                  ('completed_total', 'counter', 'completed'),
+                                  ('yields_total', 'counter', 'yields'),
+                                  ('yield_seconds_total', 'counter', 'yield_seconds')):
+            lines.append(f"# TYPE {prefix}_scheduler_{metric} {kind}")
+            for name, item in stats.items():
+                lines.append(f'{prefix}_scheduler_{metric}{{class="{name}"}} {item[key]}')
+        for metric in ('queue_latency', 'run_time'):
+            lines.append(f"# TYPE {prefix}_scheduler_{metric}_p95_ms gauge")
+            for name, item in stats.items():
+                lines.append(f'{prefix}_scheduler_{metric}_p95_ms{{class="{name}"}} {item[metric]["p95_ms"]:.3f}')
+        return lines
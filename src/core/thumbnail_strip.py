@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩略图条模块
+按固定间隔生成小尺寸缩略图，打包为一个连续数组并缓存到本地，供进度条悬停预览
+"""
+
+import os
+import cv2
+import numpy as np
+from typing import Callable, Optional
+
+from .frame_reader import FrameReader
+from ..utils.cache_utils import CacheUtils
+
+
+class ThumbnailStrip:
+    """缩略图条类
+
+    frames 为形状 (N, h, w, 3) 的 BGR uint8 连续数组，indices 为对应的帧号
+    """
+
+    # 缓存子目录
+    CACHE_SUBDIR = "thumbnails"
+
+    # 缓存目录总大小上限（MB），可用环境变量设置；超出时删除最久未使用的缩略图条
+    CACHE_MAX_MB_ENV = "VFE_THUMBNAIL_CACHE_MB"
+    DEFAULT_CACHE_MAX_MB = 512
+
+    def __init__(self, frames: np.ndarray, indices: np.ndarray, total_frames: int):
+        self.frames = frames
+        self.indices = indices
+        self.total_frames = total_frames
+
+    @property
+    def count(self) -> int:
+        """缩略图数量"""
+        return len(self.indices)
+
+    @property
+    def thumb_size(self):
+        """单张缩略图尺寸 (width, height)"""
+        return (self.frames.shape[2], self.frames.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        """占用内存字节数"""
+        return self.frames.nbytes + self.indices.nbytes
+
+    def nearest_index(self, frame_number: int) -> int:
+        """
+        查找与帧号最接近的缩略图下标
+
+        Args:
+            frame_number: 帧号
+
+        Returns:
+            int: 缩略图下标
+        """
+        position = int(np.searchsorted(self.indices, frame_number))
+        if position <= 0:
+            return 0
+        if position >= self.count:
+            return self.count - 1
+        before, after = self.indices[position - 1], self.indices[position]
+        return position - 1 if frame_number - before <= after - frame_number else position
+
+    def sprite(self) -> np.ndarray:
+        """
+        将所有缩略图横向拼接为一张雪碧图
+
+        Returns:
+            np.ndarray: 形状 (h, N*w, 3) 的 BGR 连续数组
+        """
+        count, h, w, ch = self.frames.shape
+        return np.ascontiguousarray(self.frames.transpose(1, 0, 2, 3).reshape(h, count * w, ch))
+
+    @staticmethod
+    def cache_path(video_path: str, count: int, thumb_width: int) -> Optional[str]:
+        """获取缓存文件路径"""
+        return CacheUtils.get_video_cache_path(video_path, ThumbnailStrip.CACHE_SUBDIR,
+                                               f"_{count}x{thumb_width}.npz")
+
+    def save(self, path: str):
+        """保存到缓存文件（先写临时文件再替换，避免半成品）"""
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, frames=self.frames, indices=self.indices,
+                 total_frames=np.array(self.total_frames))
+        os.replace(temp_path, path)
+        try:
+            max_mb = int(os.environ.get(ThumbnailStrip.CACHE_MAX_MB_ENV, ThumbnailStrip.DEFAULT_CACHE_MAX_MB))
+        except ValueError:
+            max_mb = ThumbnailStrip.DEFAULT_CACHE_MAX_MB
+        CacheUtils.trim_cache_dir(os.path.dirname(path), max(0, max_mb) * 1024 * 1024, keep=path)
+
+    @staticmethod
+    def load(path: str) -> Optional['ThumbnailStrip']:
+        """从缓存文件加载，失败返回None"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                strip = ThumbnailStrip(data['frames'], data['indices'], int(data['total_frames']))
+            # 更新修改时间，清理缓存时按最近使用排序
+            os.utime(path)
+            return strip
+        except Exception as e:
+            print(f"读取缩略图缓存失败: {e}")
+            return None
+
+
+class ThumbnailStripBuilder:
+    """缩略图条生成器类"""
+
+    # 默认缩略图数量和宽度
+    DEFAULT_COUNT = 120
+    DEFAULT_THUMB_WIDTH = 160
+
+    def __init__(self, count: int = DEFAULT_COUNT, thumb_width: int = DEFAULT_THUMB_WIDTH):
+        self.count = max(1, count)
+        self.thumb_width = max(16, thumb_width)
+        self.cancelled = False
+
+    def cancel(self):
+        """取消生成"""
+        self.cancelled = True
+
+    def build(self, video_path: str,
+              progress_callback: Optional[Callable[[int, int], None]] = None,
+              pool=None) -> Optional[ThumbnailStrip]:
+        """
+        生成缩略图条，优先使用缓存
+
+        Args:
+            video_path: 视频文件路径
+            progress_callback: 进度回调 (已生成数量, 计划数量)
+            pool: CapturePool，缓存未命中时从中借用已打开的句柄（如帧服务），None 时自行打开视频
+
+        Returns:
+            ThumbnailStrip: 缩略图条，失败或取消返回None
+        """
+        cache_path = ThumbnailStrip.cache_path(video_path, self.count, self.thumb_width)
+        strip = ThumbnailStrip.load(cache_path)
+        if strip is not None:
+            return strip
+
+        if pool is not None:
+            with pool.checkout(video_path, 0) as reader:
+                strip = self._decode(reader, progress_callback) if reader is not None else None
+        else:
+            with FrameReader(video_path) as reader:
+                strip = self._decode(reader, progress_callback)
+        if strip is None:
+            return None
+
+        if cache_path:
+            try:
+                strip.save(cache_path)
+            except OSError as e:
+                print(f"保存缩略图缓存失败: {e}")
+        return strip
+
+    def _decode(self, reader: FrameReader,
+                progress_callback: Optional[Callable[[int, int], None]]) -> Optional[ThumbnailStrip]:
+        """从读取器解码采样帧并缩放，失败或取消返回None"""
+        if not reader.is_opened() or reader.total_frames <= 0:
+            return None
+
+        thumb_h = max(1, round(reader.height * self.thumb_width / max(1, reader.width)))
+        indices = FrameReader.sample_indices(reader.total_frames, self.count, margin=0)
+        # 预分配连续数组，缩放结果直接写入对应槽位
+        frames = np.zeros((len(indices), thumb_h, self.thumb_width, 3), dtype=np.uint8)
+        filled = []
+
+        for slot, (frame_number, frame) in enumerate(reader.iter_frames(indices)):
+            if self.cancelled:
+                return None
+            cv2.resize(frame, (self.thumb_width, thumb_h), dst=frames[slot],
+                       interpolation=cv2.INTER_AREA)
+            filled.append(frame_number)
+            if progress_callback:
+                progress_callback(slot + 1, len(indices))
+
+        if not filled:
+            return None
+        return ThumbnailStrip(frames[:len(filled)], np.array(filled, dtype=np.int64), reader.total_frames)
@@ -5,33 +5,84 @@
 负责视频文件的读取、帧提取、格式转换等核心功能
 """
 
+import os
 import cv2
 import numpy as np
-from PIL import Image
-from typing import Optional, Tuple
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from PySide6.QtCore import QObject, Signal
 from PySide6.QtGui import QPixmap, QImage
 
+from .capture_pool import CapturePool
+from .disk_frame_cache import DiskFrameCache
+from .frame_cache import FrameCache
+from .frame_exporter import FrameExporter
+from .frame_reader import FrameReader
+from .perf_stats import PerfStats
+from .sharpness_scorer import SharpnessScorer
+from .task_scheduler import TaskScheduler
+from ..utils.file_utils import FileUtils
+from ..utils.image_utils import ImageUtils
+
 
 class VideoProcessor(QObject):
-    """视频处理器类"""
+    """视频处理器类
+
+    打开过的视频保留在句柄池中：切换文件时当前句柄归还而不关闭，
+    切回时复用已打开的句柄，并恢复离开时的位置；浏览过的帧保存在解码帧缓存中，
+    来回跳转和切回视频时不必重新解码（句柄和缓存都受全局内存预算约束）；
+    内存中放不下的帧由磁盘帧缓存保存（可能是缩小后的画面，导出时重新解码原始尺寸）
+    """
+    
+    # 最多同时保持打开的视频数
+    MAX_OPEN_VIDEOS = 6
     
     # 信号定义
     frame_changed = Signal(QPixmap)  # 帧变化信号
     position_changed = Signal(int)   # 位置变化信号
     duration_changed = Signal(int)   # 时长变化信号
     
-    def __init__(self):
+    def __init__(self, max_open_videos: int = MAX_OPEN_VIDEOS):
         super().__init__()
-        self.cap = None
+        self.pool = CapturePool(max_open_videos)
+        self.frame_cache = FrameCache()
+        self.disk_cache = DiskFrameCache()
+        self.reader: Optional[FrameReader] = None
+        self.video_path = None
+        self.signature = None  # 当前视频的文件签名（帧缓存的键）
+        self.sessions = OrderedDict()  # 路径 -> (文件签名, 帧号)，切回时恢复
         self.current_frame = None
         self.total_frames = 0
         self.fps = 0
         self.current_position = 0
+    
+    @property
+    def cap(self) -> Optional[cv2.VideoCapture]:
+        """当前视频的 cv2.VideoCapture"""
+        return self.reader.cap if self.reader else None
+    
+    def _check_in(self):
+        """把当前视频的句柄归还句柄池，并记住位置（画面保留在帧缓存中）"""
+        if not self.reader:
+            return
+        signature = FileUtils.get_file_signature(self.video_path)
+        if signature and self.current_frame is not None:
+            if self._is_full_resolution(self.reader, self.current_frame):
+                self.frame_cache.put(signature, self.current_position, self.current_frame)
+            self.sessions[self.video_path] = (signature, self.current_position)
+            self.sessions.move_to_end(self.video_path)
+            while len(self.sessions) > self.pool.max_handles:
+                self.sessions.popitem(last=False)
+        self.pool.release(self.reader)
+        self.reader = None
+        self.video_path = None
+        self.signature = None
+        self.current_frame = None
+        self.current_position = 0
         
     def load_video(self, video_path: str) -> bool:
         """
-        加载视频文件
+        加载视频文件（在当前线程中打开，界面中使用 open_video + attach_video 在后台打开）
         
         Args:
             video_path: 视频文件路径
@@ -39,48 +90,96 @@ class VideoProcessor(QObject):
         Returns:
             bool: 加载成功返回True，失败返回False
         """
-        try:
-            if self.cap:
-                self.cap.release()
-                
-            self.cap = cv2.VideoCapture(video_path)
-            if not self.cap.isOpened():
-                return False
-                
-            # 获取视频信息
-            self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-            
-            # 发送时长信号（毫秒）
-            duration_ms = int((self.total_frames / self.fps) * 1000) if self.fps > 0 else 0
-            self.duration_changed.emit(duration_ms)
+        with TaskScheduler.instance().active(TaskScheduler.PRIORITY_INTERACTIVE):
+            opened = self.open_video(video_path)
+        return self.attach_video(opened) if opened else False
+    
+    def open_video(self, video_path: str) -> Optional[dict]:
+        """
+        打开视频并解码首帧，不访问Qt对象，可在工作线程中调用（界面中以交互优先级提交到 TaskScheduler）
+        
+        打开过的视频从句柄池借出，并回到离开时的位置，画面仍在帧缓存中时不重新解码
+        
+        Args:
+            video_path: 视频文件路径
             
-            # 读取第一帧
-            self.seek_to_frame(0)
-            return True
+        Returns:
+            dict: 包含 path、signature、reader、position、frame，交给 attach_video 或 discard_video；
+                  失败返回None
+        """
+        try:
+            path = os.path.abspath(video_path)
+            signature = FileUtils.get_file_signature(path)
+            # 只对 sessions 做一次读取，界面线程同时切换视频也不会读到不一致的状态
+            session = self.sessions.get(path)
+            position = session[1] if session and session[0] == signature else 0
+            # 借出读取位置紧接上次画面的句柄，继续向后播放时不必 seek
+            reader = self.pool.acquire(path, position + 1 if position else 0)
+            if not reader:
+                return None
+            frame = self._read_frame(reader, signature, position)
+            return {'path': path, 'signature': signature, 'reader': reader, 'position': position, 'frame': frame}
             
         except Exception as e:
             print(f"加载视频失败: {e}")
-            return False
+            return None
+    
+    def attach_video(self, opened: dict) -> bool:
+        """
+        切换到 open_video 打开的视频并发送信号（在界面线程中调用）
+        
+        Args:
+            opened: open_video 的返回值
+            
+        Returns:
+            bool: 切换成功返回True
+        """
+        self._check_in()
+        self.sessions.pop(opened['path'], None)
+        self.reader = opened['reader']
+        self.video_path = opened['path']
+        self.signature = opened['signature']
+        
+        # 获取视频信息
+        self.total_frames = self.reader.total_frames
+        self.fps = self.reader.fps
+        self.current_position = opened['position']
+        self.current_frame = opened['frame']
+        
+        # 发送时长信号（毫秒）
+        duration_ms = int((self.total_frames / self.fps) * 1000) if self.fps > 0 else 0
+        self.duration_changed.emit(duration_ms)
+        
+        if self.current_frame is not None:
+            self.frame_changed.emit(self._cv_frame_to_pixmap(self.current_frame))
+            self.position_changed.emit(self.current_position)
+        return True
+    
+    def discard_video(self, opened: dict):
+        """归还已打开但不再需要的视频（如加载被新的打开请求取代）"""
+        self.pool.release(opened['reader'])
     
-    def seek_to_frame(self, frame_number: int) -> bool:
+    def seek_to_frame(self, frame_number: int, priority: int = TaskScheduler.PRIORITY_INTERACTIVE) -> bool:
         """
-        跳转到指定帧
+        跳转到指定帧（读取期间后台任务在帧边界让出）
         
         Args:
             frame_number: 帧号
+            priority: 调度优先级，播放时读取下一帧使用 PRIORITY_PLAYBACK
             
         Returns:
             bool: 跳转成功返回True
         """
-        if not self.cap or frame_number < 0 or frame_number >= self.total_frames:
+        if not self.reader or frame_number < 0 or frame_number >= self.total_frames:
             return False
             
         try:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            ret, frame = self.cap.read()
+            with TaskScheduler.instance().active(priority):
+                # 播放时顺序解码很快，只有跳转目标写入磁盘缓存
+                frame = self._read_frame(self.reader, self.signature, frame_number,
+                                         store_on_disk=priority != TaskScheduler.PRIORITY_PLAYBACK)
             
-            if ret:
+            if frame is not None:
                 self.current_frame = frame
                 self.current_position = frame_number
                 
@@ -95,6 +194,45 @@ class VideoProcessor(QObject):
             
         return False
     
+    def _read_frame(self, reader: FrameReader, signature, frame_number: int,
+                    store_on_disk: bool = True) -> Optional[np.ndarray]:
+        """
+        读取一帧：内存帧缓存 -> 磁盘帧缓存 -> 解码（可在工作线程中调用）
+        
+        向后近距离跳转（含播放时的下一帧）由读取器跳帧，不重新 seek；
+        store_on_disk 为True时解码结果交给后台线程写入磁盘缓存
+        """
+        frame = self.frame_cache.get(signature, frame_number)
+        if frame is not None:
+            return frame
+        frame = self.disk_cache.get(signature, frame_number)
+        if frame is not None:
+            # 缩小的画面不放入内存帧缓存，内存缓存中只保存原始尺寸的帧
+            if self._is_full_resolution(reader, frame):
+                self.frame_cache.put(signature, frame_number, frame)
+            return frame
+        frame = reader.read_at(frame_number)
+        if store_on_disk:
+            self.disk_cache.put_async(signature, frame_number, frame)
+        self.frame_cache.put(signature, frame_number, frame)
+        return frame
+    
+    @staticmethod
+    def _is_full_resolution(reader: FrameReader, frame: Optional[np.ndarray]) -> bool:
+        """帧是否为原始尺寸（磁盘缓存可能返回缩小的画面）"""
+        return frame is not None and frame.shape[:2] == (reader.height, reader.width)
+    
+    def _full_resolution_frame(self) -> Optional[np.ndarray]:
+        """当前帧的原始尺寸画面（来自磁盘缓存的缩小画面时重新解码）"""
+        frame = self.current_frame
+        if frame is None or not self.reader:
+            return frame
+        if not self._is_full_resolution(self.reader, frame):
+            full = self.reader.read_at(self.current_position)
+            if full is not None:
+                self.current_frame = frame = full
+        return frame
+    
     def seek_to_time(self, time_ms: int) -> bool:
         """
         跳转到指定时间
@@ -111,6 +249,50 @@ class VideoProcessor(QObject):
         frame_number = int((time_ms / 1000.0) * self.fps)
         return self.seek_to_frame(frame_number)
     
+    def find_sharpest_frame(self, video_path: str, center: int, radius: int) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        在 center±radius 帧范围内查找最清晰的一帧（可在工作线程中调用，使用从句柄池借出的独立句柄）
+        
+        窗口只定位一次，之后顺序解码，每帧在缩小的灰度图上计算拉普拉斯方差
+        
+        Args:
+            video_path: 视频文件路径
+            center: 中心帧号
+            radius: 搜索半径（帧）
+            
+        Returns:
+            Tuple[int, np.ndarray]: (帧号, BGR帧)，失败返回None
+        """
+        start = max(0, center - radius)
+        try:
+            with self.pool.checkout(video_path, start) as reader:
+                if reader is None or reader.total_frames <= 0:
+                    return None
+                end = min(reader.total_frames, center + radius + 1)
+                best = SharpnessScorer.pick_sharpest(reader.iter_range(start, end))
+        except Exception as e:
+            print(f"查找最清晰帧失败: {e}")
+            return None
+        if best is None:
+            return None
+        frame_number, frame, _ = best
+        return frame_number, frame
+    
+    def show_frame(self, frame_number: int, frame: np.ndarray):
+        """
+        把已解码的帧设为当前帧（如 find_sharpest_frame 的结果），不再重新解码
+        
+        Args:
+            frame_number: 帧号
+            frame: BGR格式的帧数据
+        """
+        if not self.reader or not 0 <= frame_number < self.total_frames:
+            return
+        self.current_frame = frame
+        self.current_position = frame_number
+        self.frame_changed.emit(self._cv_frame_to_pixmap(frame))
+        self.position_changed.emit(frame_number)
+    
     def get_current_frame_bgr(self) -> Optional[np.ndarray]:
         """
         获取当前帧的BGR格式数据
@@ -118,7 +300,8 @@ class VideoProcessor(QObject):
         Returns:
             np.ndarray: BGR格式的帧数据，失败返回None
         """
-        return self.current_frame.copy() if self.current_frame is not None else None
+        frame = self._full_resolution_frame()
+        return frame.copy() if frame is not None else None
     
     def get_current_frame_rgb(self) -> Optional[np.ndarray]:
         """
@@ -127,44 +310,55 @@ class VideoProcessor(QObject):
         Returns:
             np.ndarray: RGB格式的帧数据，失败返回None
         """
-        if self.current_frame is not None:
-            return cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2RGB)
+        frame = self._full_resolution_frame()
+        if frame is not None:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return None
     
-    def save_current_frame(self, output_path: str, size: Optional[Tuple[int, int]] = None) -> bool:
+    def save_current_frame(self, output_path: str, size: Optional[Tuple[int, int]] = None,
+                           quality: Optional[int] = None,
+                           roi: Optional[Tuple[int, int, int, int]] = None) -> bool:
         """
         保存当前帧为图片
         
         Args:
             output_path: 输出文件路径
             size: 可选的输出尺寸 (width, height)
+            quality: 可选的编码质量 1-100
+            roi: 可选的裁剪区域 (x, y, width, height)
             
         Returns:
             bool: 保存成功返回True
         """
+        spec = {
+            'format': ImageUtils.get_format_from_extension(output_path),
+            'size': size,
+            'quality': quality,
+            'path': output_path
+        }
+        return bool(self.save_current_frame_outputs(output_path, [spec], roi))
+    
+    def save_current_frame_outputs(self, output_path: str, outputs: List[dict],
+                                   roi: Optional[Tuple[int, int, int, int]] = None) -> List[str]:
+        """
+        将当前帧按多个输出规格一次性导出（只解码一次，级联缩放，并行编码）
+        
+        Args:
+            output_path: 基础输出路径
+            outputs: 输出规格列表，格式见 FrameExporter
+            roi: 可选的裁剪区域 (x, y, width, height)，在缩放和编码之前应用
+            
+        Returns:
+            List[str]: 写入的文件路径列表，失败返回空列表
+        """
         if self.current_frame is None:
-            return False
+            return []
             
         try:
-            # 获取RGB格式的帧
-            rgb_frame = self.get_current_frame_rgb()
-            if rgb_frame is None:
-                return False
-                
-            # 转换为PIL Image
-            pil_image = Image.fromarray(rgb_frame)
-            
-            # 如果指定了尺寸，进行缩放
-            if size:
-                pil_image = pil_image.resize(size, Image.Resampling.LANCZOS)
-            
-            # 保存图片
-            pil_image.save(output_path)
-            return True
-            
+            return FrameExporter.export_frame(self._full_resolution_frame(), outputs, output_path, roi)
         except Exception as e:
             print(f"保存帧失败: {e}")
-            return False
+            return []
     
     def get_video_info(self) -> dict:
         """
@@ -173,17 +367,14 @@ class VideoProcessor(QObject):
         Returns:
             dict: 包含视频信息的字典
         """
-        if not self.cap:
+        if not self.reader:
             return {}
-            
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         
         return {
             'total_frames': self.total_frames,
             'fps': self.fps,
-            'width': width,
-            'height': height,
+            'width': self.reader.width,
+            'height': self.reader.height,
             'duration_seconds': self.total_frames / self.fps if self.fps > 0 else 0
         }
     
@@ -197,18 +388,21 @@ class VideoProcessor(QObject):
         Returns:
             QPixmap: Qt格式的图像
         """
-        rgb_frame = cv2.cvtColor(cv_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        return QPixmap.fromImage(qt_image)
+        with PerfStats.measure('display'):
+            rgb_frame = cv2.cvtColor(cv_frame, cv2.COLOR_BGR2RGB)
+            h, w, ch = rgb_frame.shape
+            bytes_per_line = ch * w
+            
+            qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+            return QPixmap.fromImage(qt_image)
     
     def release(self):
-        """释放视频资源"""
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        """释放视频资源（关闭句柄池中的所有视频，清空帧缓存）"""
+        self._check_in()
+        self.pool.clear()
+        self.frame_cache.clear()
+        self.disk_cache.close()
+        self.sessions.clear()
         self.current_frame = None
         self.total_frames = 0
         self.fps = 0
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导出对话框模块
+在导出设置的基础上选择导出哪些帧，在后台线程中导出当前视频，
+显示速度、剩余时间，可暂停和取消；对话框不阻塞主窗口，导出期间可继续浏览视频
+"""
+
+import os
+from PySide6.QtWidgets import (QGridLayout, QLabel, QPushButton, QComboBox, QSpinBox,
+                               QCheckBox, QGroupBox, QFileDialog, QMessageBox, QProgressBar,
+                               QVBoxLayout)
+from PySide6.QtCore import Qt
+
+from .export_dialog import ExportDialog
+from .workers import BatchExportWorker
+
+
+class BatchExportDialog(ExportDialog):
+    """批量导出对话框类"""
+
+    # 选帧模式 (显示名称, BatchExporter 的 mode)
+    MODES = [
+        ("按间隔", 'interval'),
+        ("每个镜头一帧", 'scene'),
+        ("每个区间最清晰的一帧", 'sharpest'),
+        ("画面变化时", 'motion'),
+    ]
+
+    def __init__(self, video_path: str, video_info: dict, current_frame: int, parent=None):
+        self.video_path = video_path
+        self.worker = None
+        self.close_requested = False
+        super().__init__(video_info, current_frame, parent)
+
+    def init_ui(self):
+        """在导出设置下方添加选帧设置、进度区域和暂停按钮"""
+        super().init_ui()
+        self.setWindowTitle("批量导出")
+        self.setModal(False)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.resize(440, 560)
+
+        layout = self.layout()
+        button_index = layout.count() - 1
+
+        # 选帧设置组
+        selection_group = QGroupBox("导出哪些帧")
+        selection_layout = QGridLayout(selection_group)
+
+        selection_layout.addWidget(QLabel("选帧方式:"), 0, 0)
+        self.mode_combo = QComboBox()
+        for text, mode in self.MODES:
+            self.mode_combo.addItem(text, mode)
+        selection_layout.addWidget(self.mode_combo, 0, 1)
+
+        selection_layout.addWidget(QLabel("间隔(帧):"), 1, 0)
+        self.step_spinbox = QSpinBox()
+        self.step_spinbox.setRange(1, 100000)
+        self.step_spinbox.setValue(max(1, round(self.video_info.get('fps') or 25)))
+        selection_layout.addWidget(self.step_spinbox, 1, 1)
+
+        total_frames = max(1, self.video_info.get('total_frames', 1))
+        selection_layout.addWidget(QLabel("起始帧:"), 2, 0)
+        self.start_spinbox = QSpinBox()
+        self.start_spinbox.setRange(0, total_frames - 1)
+        selection_layout.addWidget(self.start_spinbox, 2, 1)
+
+        selection_layout.addWidget(QLabel("结束帧:"), 3, 0)
+        self.end_spinbox = QSpinBox()
+        self.end_spinbox.setRange(1, total_frames)
+        self.end_spinbox.setValue(total_frames)
+        selection_layout.addWidget(self.end_spinbox, 3, 1)
+
+        self.dedup_checkbox = QCheckBox("跳过近似重复的画面")
+        selection_layout.addWidget(self.dedup_checkbox, 4, 0, 1, 2)
+
+        self.resume_checkbox = QCheckBox("可续传（重新导出时跳过已完成的帧）")
+        self.resume_checkbox.setChecked(True)
+        selection_layout.addWidget(self.resume_checkbox, 5, 0, 1, 2)
+
+        layout.insertWidget(button_index, selection_group)
+
+        # 进度区域
+        progress_group = QGroupBox("进度")
+        progress_layout = QVBoxLayout(progress_group)
+        self.progress_bar = QProgressBar()
+        progress_layout.addWidget(self.progress_bar)
+        self.speed_label = QLabel("未开始")
+        progress_layout.addWidget(self.speed_label)
+        layout.insertWidget(button_index + 1, progress_group)
+
+        # 暂停按钮放在取消按钮之前
+        self.pause_button = QPushButton("暂停")
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        button_layout = layout.itemAt(layout.count() - 1).layout()
+        button_layout.insertWidget(button_layout.indexOf(self.cancel_button), self.pause_button)
+
+        self.export_button.setText("开始导出")
+        self.cancel_button.setText("关闭")
+
+    def load_default_settings(self):
+        """默认输出到视频旁边的同名目录"""
+        base = os.path.splitext(self.video_path)[0]
+        self.path_edit.setText(f"{base}_frames")
+
+    def browse_output_path(self):
+        """选择输出目录"""
+        directory = QFileDialog.getExistingDirectory(self, "选择输出目录", self.path_edit.text())
+        if directory:
+            self.path_edit.setText(directory)
+
+    def get_batch_settings(self) -> dict:
+        """
+        获取批量导出规格
+
+        Returns:
+            dict: BatchExporter 的导出规格
+        """
+        settings = self.get_export_settings()
+        return {
+            'format': settings['format'],
+            'size': settings['size'],
+            'roi': settings['roi'],
+            'mode': self.mode_combo.currentData(),
+            'frame_step': self.step_spinbox.value(),
+            'start_frame': self.start_spinbox.value(),
+            'end_frame': self.end_spinbox.value(),
+            'dedup': self.dedup_checkbox.isChecked(),
+            'resume': self.resume_checkbox.isChecked(),
+        }
+
+    def accept_export(self):
+        """开始导出（对话框保持打开，显示进度）"""
+        if self.worker:
+            return
+        if not self.path_edit.text().strip():
+            QMessageBox.warning(self, "警告", "请选择输出目录")
+            return
+        if self.start_spinbox.value() >= self.end_spinbox.value():
+            QMessageBox.warning(self, "警告", "结束帧必须大于起始帧")
+            return
+
+        self.output_path = self.path_edit.text()
+        os.makedirs(self.output_path, exist_ok=True)
+        self.worker = BatchExportWorker(self.get_batch_settings(), self.video_path, self.output_path, parent=self)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.export_finished.connect(self.on_export_finished)
+        self.worker.start()
+
+        self.progress_bar.setRange(0, 0)  # 镜头检测等准备阶段无法预估进度
+        self.speed_label.setText("正在准备...")
+        self.export_button.setEnabled(False)
+        self.pause_button.setEnabled(True)
+        self.pause_button.setText("暂停")
+        self.cancel_button.setText("取消")
+
+    def toggle_pause(self):
+        """暂停或继续"""
+        if not self.worker:
+            return
+        if self.worker.is_paused():
+            self.worker.resume()
+            self.pause_button.setText("暂停")
+        else:
+            self.worker.pause()
+            self.pause_button.setText("继续")
+            self.speed_label.setText(self.speed_label.text() + "（已暂停）")
+
+    def on_progress(self, info: dict):
+        """进度事件（已节流）"""
+        if info['planned'] > 0:
+            self.progress_bar.setRange(0, info['planned'])
+            self.progress_bar.setValue(info['processed'])
+        minutes, seconds = divmod(int(info['eta_seconds']), 60)
+        self.speed_label.setText(
+            f"{info['processed']}/{info['planned']} 帧，已导出 {info['frames_exported']} 张 "
+            f"({info['bytes_written'] / 1024 / 1024:.1f} MB)\n"
+            f"{info['frames_per_second']:.1f} 帧/秒，{info['mb_per_second']:.1f} MB/秒，"
+            f"剩余约 {minutes:d}:{seconds:02d}")
+
+    def on_export_finished(self, stats: dict):
+        """导出结束事件"""
+        cancelled = self.worker.exporter.cancelled
+        # 信号发出后线程随即结束，等待其退出后再释放，避免关闭对话框时销毁运行中的线程
+        self.worker.wait()
+        self.worker = None
+        self.export_button.setEnabled(True)
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setText("关闭")
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0 if cancelled else 1)
+
+        summary = (f"导出 {stats['frames_exported']} 张，写入 {stats['bytes_written'] / 1024 / 1024:.1f} MB，"
+                   f"用时 {stats['elapsed_seconds']:.1f} 秒")
+        if stats.get('frames_resumed'):
+            summary += f"，跳过已完成的 {stats['frames_resumed']} 帧"
+        if stats.get('frames_skipped'):
+            summary += f"，跳过重复 {stats['frames_skipped']} 帧"
+        if stats.get('frames_failed'):
+            summary += f"，失败 {stats['frames_failed']} 帧"
+        self.speed_label.setText(("已取消: " if cancelled else "完成: ") + summary)
+
+        if self.close_requested:
+            super().reject()
+
+    def reject(self):
+        """导出中点击取消只取消导出，对话框保持打开；否则关闭"""
+        if self.worker:
+            self.worker.cancel()
+            self.speed_label.setText("正在取消...")
+            return
+        super().reject()
+
+    def closeEvent(self, event):
+        """导出中关闭窗口：取消导出，线程结束后再关闭"""
+        if self.worker:
+            self.close_requested = True
+            self.reject()
+            event.ignore()
+            return
+        super().closeEvent(event)
+
+    def cancel_export(self):
+        """取消导出并等待线程结束（主窗口关闭时调用）"""
+        if self.worker:
+            self.worker.cancel()
+            self.worker.wait()
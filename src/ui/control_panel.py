@@ -14,6 +14,7 @@ from PySide6.QtCore import Signal
 
 from ..utils.file_utils import FileUtils
 from ..utils.image_utils import ImageUtils
+from .media_library_dialog import MediaLibraryDialog
 
 
 class ControlPanel(QWidget):
@@ -26,6 +27,8 @@ class ControlPanel(QWidget):
     prev_frame_requested = Signal()  # 请求上一帧
     next_frame_requested = Signal()  # 请求下一帧
     export_requested = Signal(dict)  # 请求导出
+    roi_changed = Signal(object)  # 裁剪区域变化（None 表示不裁剪）
+    detect_borders_requested = Signal()  # 请求检测黑边
     
     def __init__(self):
         super().__init__()
@@ -45,6 +48,9 @@ class ControlPanel(QWidget):
         # 导出设置组
         self.create_export_group(layout)
         
+        # 裁剪区域组
+        self.create_roi_group(layout)
+        
         # 导出按钮
         self.export_button = QPushButton("导出当前帧")
         self.export_button.setStyleSheet("QPushButton { font-weight: bold; padding: 10px; }")
@@ -64,6 +70,10 @@ class ControlPanel(QWidget):
         self.open_button.clicked.connect(self.on_open_clicked)
         file_layout.addWidget(self.open_button)
         
+        self.library_button = QPushButton("媒体库...")
+        self.library_button.clicked.connect(self.on_library_clicked)
+        file_layout.addWidget(self.library_button)
+        
         self.video_info_label = QLabel("未加载视频")
         self.video_info_label.setWordWrap(True)
         file_layout.addWidget(self.video_info_label)
@@ -112,9 +122,36 @@ class ControlPanel(QWidget):
         # 输出格式
         export_layout.addWidget(QLabel("输出格式:"), 0, 0)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(['JPEG', 'PNG', 'BMP', 'TIFF'])
+        self.format_combo.addItems(['JPEG', 'PNG', 'BMP', 'TIFF', 'WEBP'])
         export_layout.addWidget(self.format_combo, 0, 1)
         
+        # 编码质量
+        export_layout.addWidget(QLabel("图片质量:"), 4, 0)
+        self.quality_spinbox = QSpinBox()
+        self.quality_spinbox.setRange(1, 100)
+        self.quality_spinbox.setValue(95)
+        export_layout.addWidget(self.quality_spinbox, 4, 1)
+        
+        # 附加输出（同一帧只解码一次，级联缩放后并行编码）
+        export_layout.addWidget(QLabel("附加输出:"), 5, 0)
+        extra_layout = QVBoxLayout()
+        self.extra_1080p_checkbox = QCheckBox("1080p")
+        extra_layout.addWidget(self.extra_1080p_checkbox)
+        self.extra_thumbnail_checkbox = QCheckBox("320px 缩略图")
+        extra_layout.addWidget(self.extra_thumbnail_checkbox)
+        self.extra_webp_checkbox = QCheckBox("同时导出 WEBP")
+        extra_layout.addWidget(self.extra_webp_checkbox)
+        export_layout.addLayout(extra_layout, 5, 1)
+        
+        # 导出附近最清晰的帧（避免运动模糊）
+        self.sharpest_checkbox = QCheckBox("导出附近最清晰帧 ±")
+        export_layout.addWidget(self.sharpest_checkbox, 6, 0)
+        self.sharpest_radius_spinbox = QSpinBox()
+        self.sharpest_radius_spinbox.setRange(1, 120)
+        self.sharpest_radius_spinbox.setValue(5)
+        self.sharpest_radius_spinbox.setSuffix(" 帧")
+        export_layout.addWidget(self.sharpest_radius_spinbox, 6, 1)
+        
         # 尺寸设置 - 直接下拉选择
         export_layout.addWidget(QLabel("输出尺寸:"), 1, 0)
         self.size_combo = QComboBox()
@@ -151,6 +188,35 @@ class ControlPanel(QWidget):
         
         parent_layout.addWidget(export_group)
     
+    def create_roi_group(self, parent_layout):
+        """创建裁剪区域组"""
+        roi_group = QGroupBox("裁剪区域")
+        roi_layout = QGridLayout(roi_group)
+        
+        self.roi_checkbox = QCheckBox("只导出选定区域")
+        self.roi_checkbox.toggled.connect(self.on_roi_changed)
+        roi_layout.addWidget(self.roi_checkbox, 0, 0, 1, 4)
+        
+        self.roi_spinboxes = []
+        for index, name in enumerate(["X:", "Y:", "宽:", "高:"]):
+            spinbox = QSpinBox()
+            spinbox.setRange(0, 9999)
+            spinbox.setEnabled(False)
+            spinbox.valueChanged.connect(self.on_roi_changed)
+            roi_layout.addWidget(QLabel(name), 1 + index // 2, (index % 2) * 2)
+            roi_layout.addWidget(spinbox, 1 + index // 2, (index % 2) * 2 + 1)
+            self.roi_spinboxes.append(spinbox)
+        
+        self.detect_borders_button = QPushButton("自动检测黑边")
+        self.detect_borders_button.clicked.connect(self.detect_borders_requested.emit)
+        self.detect_borders_button.setEnabled(False)
+        roi_layout.addWidget(self.detect_borders_button, 3, 0, 1, 4)
+        
+        self.auto_crop_checkbox = QCheckBox("批量导出时自动去除黑边")
+        roi_layout.addWidget(self.auto_crop_checkbox, 4, 0, 1, 4)
+        
+        parent_layout.addWidget(roi_group)
+    
     def on_open_clicked(self):
         """打开文件按钮点击事件"""
         file_dialog = QFileDialog(self)
@@ -162,6 +228,12 @@ class ControlPanel(QWidget):
             if file_paths:
                 self.open_video_requested.emit(file_paths[0])
     
+    def on_library_clicked(self):
+        """媒体库按钮点击事件"""
+        dialog = MediaLibraryDialog(self)
+        dialog.video_selected.connect(self.open_video_requested.emit)
+        dialog.exec()
+    
     def populate_size_options(self):
         """填充尺寸选项"""
         # 原始尺寸
@@ -223,6 +295,39 @@ class ControlPanel(QWidget):
         self.height_spinbox.setVisible(is_custom)
         self.keep_aspect_checkbox.setVisible(is_custom)
     
+    def on_roi_changed(self):
+        """裁剪区域变化事件"""
+        enabled = self.roi_checkbox.isChecked()
+        for spinbox in self.roi_spinboxes:
+            spinbox.setEnabled(enabled)
+        self.roi_changed.emit(self.get_roi())
+    
+    def set_roi(self, roi):
+        """
+        设置裁剪区域
+        
+        Args:
+            roi: 裁剪区域 (x, y, width, height)，None 表示不裁剪
+        """
+        self.roi_checkbox.blockSignals(True)
+        self.roi_checkbox.setChecked(roi is not None)
+        self.roi_checkbox.blockSignals(False)
+        if roi:
+            for spinbox, value in zip(self.roi_spinboxes, roi):
+                spinbox.blockSignals(True)
+                spinbox.setValue(value)
+                spinbox.blockSignals(False)
+        self.on_roi_changed()
+    
+    def get_roi(self):
+        """获取裁剪区域 (x, y, width, height)，未启用时返回None"""
+        if not self.roi_checkbox.isChecked():
+            return None
+        x, y, w, h = (spinbox.value() for spinbox in self.roi_spinboxes)
+        if w <= 0 or h <= 0:
+            return None
+        return (x, y, w, h)
+    
     def on_export_clicked(self):
         """导出按钮点击事件"""
         settings = self.get_export_settings()
@@ -232,6 +337,7 @@ class ControlPanel(QWidget):
         """更新视频信息显示"""
         self.video_info = info
         self.export_button.setEnabled(True)
+        self.detect_borders_button.setEnabled(True)
         
         info_text = f"文件: {os.path.basename(video_path)}\n"
         info_text += f"分辨率: {info['width']}×{info['height']}\n"
@@ -247,6 +353,16 @@ class ControlPanel(QWidget):
         # 更新自定义尺寸默认值
         self.width_spinbox.setValue(info['width'])
         self.height_spinbox.setValue(info['height'])
+        
+        # 更新裁剪区域范围，默认为整帧
+        limits = [info['width'] - 1, info['height'] - 1, info['width'], info['height']]
+        defaults = [0, 0, info['width'], info['height']]
+        for spinbox, limit, value in zip(self.roi_spinboxes, limits, defaults):
+            spinbox.blockSignals(True)
+            spinbox.setMaximum(limit)
+            spinbox.setValue(value)
+            spinbox.blockSignals(False)
+        self.roi_changed.emit(self.get_roi())
     
     def update_position(self, frame_number: int):
         """更新位置显示"""
@@ -260,12 +376,16 @@ class ControlPanel(QWidget):
         current_data = self.size_combo.currentData()
         
         output_size = None
+        roi = self.get_roi()
         
         if current_data == "custom":
             # 自定义尺寸
             if self.keep_aspect_checkbox.isChecked():
-                # 保持宽高比
-                original_size = (self.video_info['width'], self.video_info['height'])
+                # 保持宽高比（启用裁剪时以裁剪区域为原始尺寸）
+                if roi:
+                    original_size = (roi[2], roi[3])
+                else:
+                    original_size = (self.video_info['width'], self.video_info['height'])
                 target_width = self.width_spinbox.value()
                 target_height = self.height_spinbox.value()
                 
@@ -285,7 +405,29 @@ class ControlPanel(QWidget):
             # 预设尺寸
             output_size = current_data
         
+        quality = self.quality_spinbox.value()
+        
         return {
             'format': format_name,
-            'size': output_size
-        }
\ No newline at end of file
+            'size': output_size,
+            'quality': quality,
+            'roi': roi,
+            'auto_crop': self.auto_crop_checkbox.isChecked(),
+            'sharpest_radius': self.sharpest_radius_spinbox.value() if self.sharpest_checkbox.isChecked() else 0,
+            'outputs': self.get_output_specs(format_name, output_size, quality)
+        }
+    
+    def get_output_specs(self, format_name: str, output_size, quality: int) -> list:
+        """获取多输出规格列表（第一项为主输出）"""
+        variants = [{'size': output_size, 'suffix': ''}]
+        if self.extra_1080p_checkbox.isChecked():
+            variants.append({'height': 1080, 'suffix': '_1080p'})
+        if self.extra_thumbnail_checkbox.isChecked():
+            variants.append({'width': 320, 'suffix': '_320px'})
+        
+        formats = [format_name]
+        if self.extra_webp_checkbox.isChecked() and format_name != 'WEBP':
+            formats.append('WEBP')
+        
+        return [dict(variant, format=fmt, quality=quality)
+                for variant in variants for fmt in formats]
\ No newline at end of file
@@ -115,6 +115,29 @@ class ExportDialog(QDialog):
         
         layout.addWidget(size_group)
         
+        # 裁剪区域组
+        roi_group = QGroupBox("裁剪区域")
+        roi_layout = QGridLayout(roi_group)
+        
+        self.roi_checkbox = QCheckBox("只导出选定区域")
+        self.roi_checkbox.toggled.connect(self.on_roi_toggled)
+        roi_layout.addWidget(self.roi_checkbox, 0, 0, 1, 4)
+        
+        self.roi_spinboxes = []
+        limits = [self.video_info['width'] - 1, self.video_info['height'] - 1,
+                  self.video_info['width'], self.video_info['height']]
+        defaults = [0, 0, self.video_info['width'], self.video_info['height']]
+        for index, name in enumerate(["X:", "Y:", "宽:", "高:"]):
+            spinbox = QSpinBox()
+            spinbox.setRange(0, limits[index])
+            spinbox.setValue(defaults[index])
+            spinbox.setEnabled(False)
+            roi_layout.addWidget(QLabel(name), 1 + index // 2, (index % 2) * 2)
+            roi_layout.addWidget(spinbox, 1 + index // 2, (index % 2) * 2 + 1)
+            self.roi_spinboxes.append(spinbox)
+        
+        layout.addWidget(roi_group)
+        
         # 按钮区域
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -238,6 +261,32 @@ class ExportDialog(QDialog):
         if checked and self.size_combo.currentText() == "自定义尺寸":
             self.on_custom_size_changed()
     
+    def on_roi_toggled(self, checked: bool):
+        """裁剪区域选项变化事件"""
+        for spinbox in self.roi_spinboxes:
+            spinbox.setEnabled(checked)
+    
+    def set_roi(self, roi):
+        """
+        预设裁剪区域（用于在多次导出间复用）
+        
+        Args:
+            roi: 裁剪区域 (x, y, width, height)，None 表示不裁剪
+        """
+        self.roi_checkbox.setChecked(roi is not None)
+        if roi:
+            for spinbox, value in zip(self.roi_spinboxes, roi):
+                spinbox.setValue(value)
+    
+    def get_roi(self):
+        """获取裁剪区域 (x, y, width, height)，未启用时返回None"""
+        if not self.roi_checkbox.isChecked():
+            return None
+        x, y, w, h = (spinbox.value() for spinbox in self.roi_spinboxes)
+        if w <= 0 or h <= 0:
+            return None
+        return (x, y, w, h)
+    
     def browse_output_path(self):
         """浏览输出路径"""
         format_name = self.format_combo.currentText()
@@ -282,5 +331,6 @@ class ExportDialog(QDialog):
             'output_path': self.output_path,
             'format': self.format_combo.currentText(),
             'size': output_size,
-            'keep_aspect_ratio': self.keep_aspect_checkbox.isChecked()
+            'keep_aspect_ratio': self.keep_aspect_checkbox.isChecked(),
+            'roi': self.get_roi()
         }
\ No newline at end of file
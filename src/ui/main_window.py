@@ -6,18 +6,25 @@
 """
 
 import os
+import cv2
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QSplitter, QFrame, QFileDialog, QMessageBox)
+                               QSplitter, QFrame, QFileDialog, QMessageBox, QInputDialog, QProgressBar, QLabel)
 from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QAction, QIcon
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QAction, QIcon, QImage, QPixmap
 
 from ..core.video_processor import VideoProcessor
+from ..core.task_scheduler import TaskScheduler
+from ..core.perf_stats import PerfStats
 from ..utils.file_utils import FileUtils
 from ..utils.image_utils import ImageUtils
 from ..utils.config_utils import ConfigUtils
 from .video_widget import VideoWidget
 from .control_panel import ControlPanel
 from .playback_controls import PlaybackControls
+from .batch_export_dialog import BatchExportDialog
+from .memory_diagnostics_dialog import MemoryDiagnosticsDialog
+from .workers import (VideoLoadWorker, BorderDetectWorker, SharpestFrameWorker, SceneDetectWorker, ThumbnailStripWorker,
+                      ContactSheetWorker, BatchJobWorker)
 from ..utils.ui_utils import get_os_specific_icon_path
 
 
@@ -29,6 +36,15 @@ class MainWindow(QMainWindow):
         self.video_processor = VideoProcessor()
         self.current_video_path = None
         self.play_timer = QTimer()
+        self.scene_cuts = []
+        self.load_worker = None
+        self.border_worker = None
+        self.sharpest_worker = None
+        self.export_settings = None  # 等待最清晰帧查找结束后导出的设置
+        self.scene_worker = None
+        self.thumbnail_worker = None
+        self.contact_sheet_worker = None
+        self.batch_worker = None
         
         self.init_ui()
         self.connect_signals()
@@ -100,6 +116,11 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self.control_panel.on_open_clicked)
         file_menu.addAction(open_action)
         
+        library_action = QAction("媒体库...", self)
+        library_action.setShortcut("Ctrl+L")
+        library_action.triggered.connect(self.control_panel.on_library_clicked)
+        file_menu.addAction(library_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("退出", self)
@@ -107,9 +128,51 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
         
+        # 工具菜单
+        tools_menu = menubar.addMenu("工具")
+        
+        detect_scenes_action = QAction("检测镜头切换", self)
+        detect_scenes_action.triggered.connect(self.detect_scenes)
+        tools_menu.addAction(detect_scenes_action)
+        
+        prev_scene_action = QAction("上一个镜头", self)
+        prev_scene_action.setShortcut("Ctrl+Left")
+        prev_scene_action.triggered.connect(self.prev_scene)
+        tools_menu.addAction(prev_scene_action)
+        
+        next_scene_action = QAction("下一个镜头", self)
+        next_scene_action.setShortcut("Ctrl+Right")
+        next_scene_action.triggered.connect(self.next_scene)
+        tools_menu.addAction(next_scene_action)
+        
+        tools_menu.addSeparator()
+        
+        batch_export_action = QAction("批量导出当前视频...", self)
+        batch_export_action.setShortcut("Ctrl+Shift+E")
+        batch_export_action.triggered.connect(self.export_video_frames)
+        tools_menu.addAction(batch_export_action)
+        
+        contact_sheet_action = QAction("导出拼版图...", self)
+        contact_sheet_action.triggered.connect(self.export_contact_sheet)
+        tools_menu.addAction(contact_sheet_action)
+        
+        batch_action = QAction("批量处理目录...", self)
+        batch_action.triggered.connect(self.run_batch_directory)
+        tools_menu.addAction(batch_action)
+        
         # 帮助菜单
         help_menu = menubar.addMenu("帮助")
         
+        memory_action = QAction("内存使用...", self)
+        memory_action.triggered.connect(self.show_memory_diagnostics)
+        help_menu.addAction(memory_action)
+        
+        perf_action = QAction("显示性能统计", self)
+        perf_action.setCheckable(True)
+        perf_action.setChecked(PerfStats.enabled)
+        perf_action.toggled.connect(self.toggle_perf_overlay)
+        help_menu.addAction(perf_action)
+        
         about_action = QAction("关于", self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
@@ -118,6 +181,19 @@ class MainWindow(QMainWindow):
         """创建状态栏"""
         self.status_bar = self.statusBar()
         self.status_bar.showMessage("就绪")
+        
+        # 后台加载和缩略图条生成进度
+        self.background_progress = QProgressBar()
+        self.background_progress.setMaximumWidth(160)
+        self.background_progress.setTextVisible(False)
+        self.background_progress.hide()
+        self.status_bar.addPermanentWidget(self.background_progress)
+        
+        # 批量处理中子进程刚导出的帧
+        self.batch_preview = QLabel()
+        self.batch_preview.setFixedHeight(36)
+        self.batch_preview.hide()
+        self.status_bar.addPermanentWidget(self.batch_preview)
     
     def connect_signals(self):
         """连接信号和槽"""
@@ -133,6 +209,8 @@ class MainWindow(QMainWindow):
         self.control_panel.prev_frame_requested.connect(self.prev_frame)
         self.control_panel.next_frame_requested.connect(self.next_frame)
         self.control_panel.export_requested.connect(self.export_current_frame)
+        self.control_panel.roi_changed.connect(self.video_widget.set_roi)
+        self.control_panel.detect_borders_requested.connect(self.detect_borders)
         
         # 播放控制信号
         self.playback_controls.play_pause_clicked.connect(self.toggle_play)
@@ -161,18 +239,61 @@ class MainWindow(QMainWindow):
             self.load_video(video_path)
     
     def load_video(self, video_path: str):
-        """加载视频文件"""
-        if self.video_processor.load_video(video_path):
-            self.current_video_path = video_path
-            
-            # 更新视频信息
-            info = self.video_processor.get_video_info()
-            self.control_panel.update_video_info(video_path, info)
-            self.playback_controls.set_duration(info['total_frames'])
-            
-            self.status_bar.showMessage(f"已加载视频: {os.path.basename(video_path)}")
-        else:
+        """在后台线程加载视频文件，加载期间界面保持响应，打开其他文件时取消本次加载"""
+        self.cancel_video_load()
+        self.cancel_border_detection()
+        self.cancel_sharpest_frame_search()
+        self.cancel_scene_detection()
+        self.cancel_thumbnail_build()
+        
+        self.load_worker = VideoLoadWorker(self.video_processor, video_path, parent=self)
+        self.load_worker.loaded.connect(self.on_video_loaded)
+        self.load_worker.finished.connect(self.load_worker.deleteLater)
+        self.load_worker.start()
+        
+        self.background_progress.setRange(0, 0)  # 打开耗时未知，显示忙碌状态
+        self.background_progress.show()
+        self.status_bar.showMessage(f"正在打开: {os.path.basename(video_path)}...")
+    
+    def cancel_video_load(self):
+        """取消正在进行的加载（不等待线程结束，结果由线程自行归还）"""
+        if self.load_worker:
+            self.load_worker.cancel()
+            self.load_worker = None
+            self.background_progress.hide()
+    
+    def on_video_loaded(self, opened):
+        """视频加载完成事件（首帧已解码）"""
+        worker = self.sender()
+        if worker is not self.load_worker:
+            # 取消之后才到达的结果
+            if opened:
+                self.video_processor.discard_video(opened)
+            return
+        video_path = worker.video_path
+        self.load_worker = None
+        self.background_progress.hide()
+        
+        if not opened:
+            self.status_bar.showMessage(f"无法加载视频: {os.path.basename(video_path)}")
             QMessageBox.warning(self, "错误", "无法加载视频文件")
+            return
+        
+        self.scene_cuts = []
+        self.playback_controls.set_scene_markers([])
+        self.playback_controls.set_thumbnail_strip(None)
+        self.video_widget.set_source_size(opened['reader'].width, opened['reader'].height)
+        self.video_processor.attach_video(opened)
+        self.current_video_path = video_path
+        
+        # 更新视频信息
+        info = self.video_processor.get_video_info()
+        self.control_panel.update_video_info(video_path, info)
+        self.playback_controls.set_duration(info['total_frames'])
+        self.on_position_changed(self.video_processor.current_position)
+        
+        self.status_bar.showMessage(f"已加载视频: {os.path.basename(video_path)}")
+        self.build_thumbnail_strip()
     
     def toggle_play(self):
         """切换播放/暂停状态"""
@@ -204,7 +325,7 @@ class MainWindow(QMainWindow):
         total_frames = self.video_processor.total_frames
         
         if current_pos < total_frames - 1:
-            self.video_processor.seek_to_frame(current_pos + 1)
+            self.video_processor.seek_to_frame(current_pos + 1, TaskScheduler.PRIORITY_PLAYBACK)
         else:
             self.pause_video()  # 播放结束
     
@@ -239,14 +360,277 @@ class MainWindow(QMainWindow):
         if current_pos < total_frames - 1:
             self.video_processor.seek_to_frame(current_pos + 1)
     
+    def build_thumbnail_strip(self):
+        """在后台线程生成进度条缩略图条"""
+        self.thumbnail_worker = ThumbnailStripWorker(self.current_video_path, parent=self)
+        self.thumbnail_worker.progress.connect(self.on_thumbnail_progress)
+        self.thumbnail_worker.strip_ready.connect(self.playback_controls.set_thumbnail_strip)
+        self.thumbnail_worker.finished.connect(self.background_progress.hide)
+        self.thumbnail_worker.start()
+    
+    def cancel_thumbnail_build(self):
+        """取消正在进行的缩略图条生成"""
+        if self.thumbnail_worker and self.thumbnail_worker.isRunning():
+            self.thumbnail_worker.cancel()
+            self.thumbnail_worker.wait()
+        self.thumbnail_worker = None
+        self.background_progress.hide()
+    
+    def on_thumbnail_progress(self, done: int, total: int):
+        """缩略图条生成进度事件"""
+        self.background_progress.setRange(0, total)
+        self.background_progress.setValue(done)
+        self.background_progress.setToolTip(f"正在生成缩略图条 {done}/{total}")
+        self.background_progress.show()
+    
+    def detect_scenes(self):
+        """在后台线程检测镜头切换"""
+        if not self.current_video_path:
+            return
+        
+        self.cancel_scene_detection()
+        self.scene_worker = SceneDetectWorker(self.current_video_path, parent=self)
+        self.scene_worker.progress.connect(self.on_scene_progress)
+        self.scene_worker.scenes_detected.connect(self.on_scenes_detected)
+        self.scene_worker.start()
+        self.status_bar.showMessage("正在检测镜头切换...")
+    
+    def cancel_scene_detection(self):
+        """取消正在进行的镜头检测"""
+        if self.scene_worker and self.scene_worker.isRunning():
+            self.scene_worker.cancel()
+            self.scene_worker.wait()
+        self.scene_worker = None
+    
+    def on_scene_progress(self, frame_number: int, total_frames: int):
+        """镜头检测进度事件"""
+        percent = frame_number * 100 // max(1, total_frames)
+        self.status_bar.showMessage(f"正在检测镜头切换... {percent}%")
+    
+    def on_scenes_detected(self, cuts: list):
+        """镜头检测完成事件"""
+        self.scene_cuts = cuts
+        self.playback_controls.set_scene_markers(cuts)
+        self.status_bar.showMessage(f"检测到 {len(cuts)} 个镜头")
+    
+    def prev_scene(self):
+        """跳转到上一个镜头起始帧"""
+        current_pos = self.video_processor.current_position
+        previous = [cut for cut in self.scene_cuts if cut < current_pos]
+        if previous:
+            self.video_processor.seek_to_frame(previous[-1])
+    
+    def next_scene(self):
+        """跳转到下一个镜头起始帧"""
+        current_pos = self.video_processor.current_position
+        following = [cut for cut in self.scene_cuts if cut > current_pos]
+        if following:
+            self.video_processor.seek_to_frame(following[0])
+    
+    def detect_borders(self):
+        """在后台线程检测黑边，完成后设置为裁剪区域"""
+        if not self.current_video_path:
+            return
+        
+        self.cancel_border_detection()
+        self.border_worker = BorderDetectWorker(self.current_video_path, parent=self)
+        self.border_worker.detected.connect(self.on_borders_detected)
+        self.border_worker.finished.connect(self.border_worker.deleteLater)
+        self.border_worker.start()
+        self.status_bar.showMessage("正在检测黑边...")
+    
+    def cancel_border_detection(self):
+        """取消正在进行的黑边检测（不等待线程结束）"""
+        if self.border_worker:
+            self.border_worker.cancel()
+            self.border_worker = None
+    
+    def on_borders_detected(self, roi):
+        """黑边检测完成事件"""
+        if self.sender() is not self.border_worker:
+            return
+        self.border_worker = None
+        if roi:
+            self.control_panel.set_roi(roi)
+            self.status_bar.showMessage(f"检测到有效画面区域: {roi[2]}×{roi[3]} (偏移 {roi[0]}, {roi[1]})")
+        else:
+            self.status_bar.showMessage("未检测到黑边")
+    
+    def export_video_frames(self):
+        """打开批量导出对话框（非模态，导出在后台线程中进行）"""
+        if not self.current_video_path:
+            QMessageBox.information(self, "提示", "请先打开视频")
+            return
+        dialog = BatchExportDialog(self.current_video_path, self.video_processor.get_video_info(),
+                                   self.video_processor.current_position, parent=self)
+        dialog.set_roi(self.control_panel.get_export_settings().get('roi'))
+        dialog.show()
+    
+    def export_contact_sheet(self):
+        """在后台线程导出拼版图及索引"""
+        if not self.current_video_path:
+            QMessageBox.warning(self, "警告", "请先加载视频文件")
+            return
+        if self.contact_sheet_worker and self.contact_sheet_worker.isRunning():
+            return
+        
+        base_name = os.path.splitext(os.path.basename(self.current_video_path))[0]
+        default_path = os.path.join(os.path.dirname(self.current_video_path), f"{base_name}_sheet.jpg")
+        output_path, _ = QFileDialog.getSaveFileName(self, "导出拼版图", default_path,
+                                                     "图片文件 (*.jpg *.jpeg *.png *.webp *.bmp *.tif *.tiff)")
+        if not output_path:
+            return
+        
+        self.contact_sheet_worker = ContactSheetWorker(self.current_video_path, output_path,
+                                                       roi=self.control_panel.get_roi(), parent=self)
+        self.contact_sheet_worker.progress.connect(self.on_contact_sheet_progress)
+        self.contact_sheet_worker.finished_export.connect(self.on_contact_sheet_finished)
+        self.contact_sheet_worker.start()
+    
+    def cancel_contact_sheet(self):
+        """取消正在进行的拼版图导出"""
+        if self.contact_sheet_worker and self.contact_sheet_worker.isRunning():
+            self.contact_sheet_worker.cancel()
+            self.contact_sheet_worker.wait()
+        self.contact_sheet_worker = None
+    
+    def on_contact_sheet_progress(self, done: int, total: int):
+        """拼版图导出进度事件"""
+        self.status_bar.showMessage(f"正在导出拼版图... {done}/{total}")
+    
+    def on_contact_sheet_finished(self, index):
+        """拼版图导出完成事件"""
+        if index:
+            self.status_bar.showMessage(f"拼版图已导出: {', '.join(index['sheets'])}（含 .json / .vtt 索引）")
+        else:
+            QMessageBox.critical(self, "错误", "拼版图导出失败")
+    
+    def run_batch_directory(self):
+        """按当前导出设置处理目录中的所有视频（多进程）"""
+        if self.batch_worker and self.batch_worker.isRunning():
+            reply = QMessageBox.question(self, "批量处理", "批量处理正在进行，是否取消？")
+            if reply == QMessageBox.Yes:
+                self.batch_worker.cancel()
+            return
+        
+        directory = QFileDialog.getExistingDirectory(self, "选择视频目录")
+        if not directory:
+            return
+        output_root = QFileDialog.getExistingDirectory(self, "选择输出目录")
+        if not output_root:
+            return
+        
+        modes = ["interval", "scene", "sharpest", "motion"]
+        labels = ["按固定间隔", "每个镜头一帧", "每个区间最清晰的一帧", "画面变化时导出"]
+        label, ok = QInputDialog.getItem(self, "批量处理", "选帧模式:", labels, 0, False)
+        if not ok:
+            return
+        mode = modes[labels.index(label)]
+        frame_step = 1
+        if mode != "scene":
+            frame_step, ok = QInputDialog.getInt(self, "批量处理", "帧间隔 / 区间长度 / 探测步长:", 25, 1, 100000)
+            if not ok:
+                return
+        
+        export_settings = self.control_panel.get_export_settings()
+        settings = {
+            'outputs': export_settings['outputs'],
+            'auto_crop': export_settings.get('auto_crop', False),
+            'mode': mode,
+            'frame_step': frame_step,
+            'resume': True,
+            'output_cache': True,
+        }
+        self.batch_worker = BatchJobWorker(settings, directory, output_root, parent=self)
+        self.batch_worker.job_finished.connect(self.on_batch_job_finished)
+        self.batch_worker.preview_ready.connect(self.on_batch_preview)
+        self.batch_worker.batch_finished.connect(self.on_batch_finished)
+        self.batch_worker.start()
+        self.status_bar.showMessage("正在批量处理...")
+    
+    def cancel_batch(self):
+        """取消正在进行的批量处理"""
+        if self.batch_worker and self.batch_worker.isRunning():
+            self.batch_worker.cancel()
+            self.batch_worker.wait()
+        self.batch_worker = None
+    
+    def on_batch_job_finished(self, done: int, total: int, stats: dict):
+        """批量处理中单个文件完成事件"""
+        name = os.path.basename(stats['video'])
+        if stats.get('error'):
+            self.status_bar.showMessage(f"批量处理 {done}/{total}: {name} 失败")
+        else:
+            self.status_bar.showMessage(f"批量处理 {done}/{total}: {name} 导出 {stats['frames_exported']} 帧，"
+                                        f"{stats['frames_per_second']:.1f} 帧/秒")
+    
+    def on_batch_preview(self, video_path: str, frame_number: int, frame):
+        """批量处理预览帧事件（帧已在子进程中缩小）"""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w = rgb.shape[:2]
+        image = QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888).copy()
+        self.batch_preview.setPixmap(QPixmap.fromImage(image).scaledToHeight(36, Qt.SmoothTransformation))
+        self.batch_preview.setToolTip(f"{os.path.basename(video_path)} 第 {frame_number} 帧")
+        self.batch_preview.show()
+    
+    def on_batch_finished(self, summary: dict):
+        """批量处理完成事件"""
+        self.batch_preview.hide()
+        message = (f"完成 {len(summary['jobs'])} 个视频，导出 {summary['frames_exported']} 帧，"
+                   f"用时 {summary['elapsed_seconds']:.1f} 秒（{summary['frames_per_second']:.1f} 帧/秒）")
+        if summary['cache_hits']:
+            message += f"，输出缓存命中率 {summary['cache_hit_rate']:.0%}"
+        if summary['frames_failed']:
+            message += f"，导出失败 {summary['frames_failed']} 帧"
+        if summary['failed']:
+            message += f"，失败 {len(summary['failed'])} 个"
+        self.status_bar.showMessage(message)
+        QMessageBox.information(self, "批量处理", message)
+    
     def export_current_frame(self, settings: dict):
-        """导出当前帧"""
+        """导出当前帧（需要挑选附近最清晰的帧时，先在后台线程查找，找到后跳转过去再导出）"""
         if not self.current_video_path:
             return
         
+        if settings.get('sharpest_radius'):
+            self.cancel_sharpest_frame_search()
+            self.export_settings = settings
+            self.sharpest_worker = SharpestFrameWorker(self.video_processor, self.current_video_path,
+                                                       self.video_processor.current_position,
+                                                       settings['sharpest_radius'], parent=self)
+            self.sharpest_worker.found.connect(self.on_sharpest_frame_found)
+            self.sharpest_worker.finished.connect(self.sharpest_worker.deleteLater)
+            self.sharpest_worker.start()
+            self.status_bar.showMessage("正在查找附近最清晰的帧...")
+            return
+        self.save_current_frame(settings)
+    
+    def cancel_sharpest_frame_search(self):
+        """取消正在进行的最清晰帧查找及其后的导出（不等待线程结束）"""
+        if self.sharpest_worker:
+            self.sharpest_worker.cancel()
+            self.sharpest_worker = None
+            self.export_settings = None
+    
+    def on_sharpest_frame_found(self, best):
+        """最清晰帧查找完成事件：跳转到该帧以便确认，然后导出"""
+        if self.sender() is not self.sharpest_worker:
+            return
+        self.sharpest_worker = None
+        settings, self.export_settings = self.export_settings, None
+        if best is not None:
+            frame_number, frame = best
+            if frame_number != self.video_processor.current_position:
+                self.video_processor.show_frame(frame_number, frame)
+                self.status_bar.showMessage(f"已选择附近最清晰的第 {frame_number} 帧")
+        self.save_current_frame(settings)
+    
+    def save_current_frame(self, settings: dict):
+        """选择保存路径并按导出设置保存当前帧"""
         # 获取导出设置
         format_name = settings['format']
-        output_size = settings['size']
+        outputs = settings['outputs']
+        roi = settings.get('roi')
         
         # 选择保存路径
         ext = ImageUtils.SUPPORTED_FORMATS[format_name][0]
@@ -270,13 +654,27 @@ class MainWindow(QMainWindow):
             # 确保目录存在
             FileUtils.ensure_directory_exists(output_path)
             
-            # 保存帧
-            if self.video_processor.save_current_frame(output_path, output_size):
-                QMessageBox.information(self, "成功", f"帧已保存到:\n{output_path}")
+            # 保存帧（主输出使用用户选择的路径，格式以扩展名为准；附加输出按后缀生成文件名）
+            primary = dict(outputs[0], path=output_path,
+                           format=ImageUtils.get_format_from_extension(output_path))
+            outputs = [primary] + outputs[1:]
+            saved_paths = self.video_processor.save_current_frame_outputs(output_path, outputs, roi)
+            if saved_paths:
+                QMessageBox.information(self, "成功", "帧已保存到:\n" + "\n".join(saved_paths))
                 self.status_bar.showMessage(f"帧已导出: {os.path.basename(output_path)}")
             else:
                 QMessageBox.warning(self, "错误", "保存帧失败")
     
+    def show_memory_diagnostics(self):
+        """显示内存诊断（非模态）"""
+        dialog = MemoryDiagnosticsDialog(self)
+        dialog.show()
+    
+    def toggle_perf_overlay(self, enabled: bool):
+        """开关性能统计及视频画面上的叠加显示"""
+        PerfStats.enable(enabled)
+        self.video_widget.set_perf_overlay(enabled)
+    
     def show_about(self):
         """显示关于对话框"""
         about_text = ConfigUtils.get_about_text()
@@ -285,5 +683,19 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """窗口关闭事件"""
         self.pause_video()
+        self.cancel_video_load()
+        # 已取消的加载线程无法中途打断，等待其结束后再销毁窗口
+        self.cancel_border_detection()
+        self.cancel_sharpest_frame_search()
+        # 先取消后台任务再等待：排在调度器队列中的检测要等其他后台任务让出线程
+        self.cancel_scene_detection()
+        self.cancel_thumbnail_build()
+        self.cancel_contact_sheet()
+        for worker in (self.findChildren(VideoLoadWorker) + self.findChildren(BorderDetectWorker)
+                       + self.findChildren(SharpestFrameWorker)):
+            worker.wait()
+        self.cancel_batch()
+        for dialog in self.findChildren(BatchExportDialog):
+            dialog.cancel_export()
         self.video_processor.release()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+媒体库对话框模块
+从本地媒体库中列出、搜索视频，不需要逐个打开文件
+"""
+
+import os
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QComboBox, QSpinBox, QLineEdit, QFileDialog, QTableWidget,
+                               QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Signal
+
+from ..core.media_catalog import MediaCatalog
+from .workers import CatalogScanWorker
+
+
+class MediaLibraryDialog(QDialog):
+    """媒体库对话框类"""
+
+    # 信号定义
+    video_selected = Signal(str)  # 选中视频（双击或点击打开）
+
+    # 表格列标题
+    HEADERS = ["文件名", "时长", "分辨率", "帧率", "编码", "大小", "路径"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.catalog = MediaCatalog()
+        self.scan_worker = None
+
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle("媒体库")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+
+        # 过滤条件
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("搜索:"))
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("文件名或路径")
+        self.search_edit.textChanged.connect(self.refresh)
+        filter_layout.addWidget(self.search_edit)
+
+        filter_layout.addWidget(QLabel("最短时长(分钟):"))
+        self.min_duration_spinbox = QSpinBox()
+        self.min_duration_spinbox.setRange(0, 100000)
+        self.min_duration_spinbox.valueChanged.connect(self.refresh)
+        filter_layout.addWidget(self.min_duration_spinbox)
+
+        filter_layout.addWidget(QLabel("最低分辨率:"))
+        self.resolution_combo = QComboBox()
+        for text, height in [("全部", 0), ("720p", 720), ("1080p", 1080), ("4K", 2160)]:
+            self.resolution_combo.addItem(text, height)
+        self.resolution_combo.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.resolution_combo)
+
+        layout.addLayout(filter_layout)
+
+        # 视频列表
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(len(self.HEADERS) - 1, QHeaderView.Stretch)
+        self.table.cellDoubleClicked.connect(self.open_selected)
+        layout.addWidget(self.table)
+
+        # 底部按钮
+        button_layout = QHBoxLayout()
+        self.scan_button = QPushButton("扫描目录...")
+        self.scan_button.clicked.connect(self.scan_directory)
+        button_layout.addWidget(self.scan_button)
+
+        self.status_label = QLabel()
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+
+        open_button = QPushButton("打开")
+        open_button.clicked.connect(self.open_selected)
+        button_layout.addWidget(open_button)
+
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.reject)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        """按过滤条件从媒体库重新查询"""
+        min_minutes = self.min_duration_spinbox.value()
+        results = self.catalog.search(text=self.search_edit.text().strip(),
+                                      min_duration=min_minutes * 60 if min_minutes else None,
+                                      min_height=self.resolution_combo.currentData() or None)
+
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(results))
+        for row, info in enumerate(results):
+            minutes, seconds = divmod(int(info['duration']), 60)
+            values = [
+                os.path.basename(info['path']),
+                f"{minutes // 60:d}:{minutes % 60:02d}:{seconds:02d}",
+                f"{info['width']}×{info['height']}",
+                f"{info['fps']:.2f}",
+                info['codec'],
+                f"{info['size'] / 1024 / 1024:.1f} MB",
+                info['path'],
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.setSortingEnabled(True)
+
+        if not self.scan_worker:
+            self.status_label.setText(f"共 {len(results)} 个视频")
+
+    def scan_directory(self):
+        """在后台扫描目录并写入媒体库"""
+        if self.scan_worker and self.scan_worker.isRunning():
+            return
+        directory = QFileDialog.getExistingDirectory(self, "选择要扫描的目录")
+        if not directory:
+            return
+
+        self.scan_button.setEnabled(False)
+        self.status_label.setText("正在扫描...")
+        self.scan_worker = CatalogScanWorker(self.catalog, directory, parent=self)
+        self.scan_worker.progress.connect(lambda count: self.status_label.setText(f"正在扫描... {count}"))
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+
+    def on_scan_finished(self, count: int):
+        """扫描完成事件"""
+        self.scan_worker = None
+        self.scan_button.setEnabled(True)
+        self.refresh()
+        self.status_label.setText(f"扫描完成，共 {count} 个视频")
+
+    def open_selected(self, *args):
+        """打开选中的视频"""
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        path = self.table.item(row, len(self.HEADERS) - 1).text()
+        self.video_selected.emit(path)
+        self.accept()
+
+    def done(self, result: int):
+        """关闭对话框时停止扫描并关闭媒体库"""
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.cancel()
+            self.scan_worker.wait()
+        self.catalog.close()
+        super().done(result)
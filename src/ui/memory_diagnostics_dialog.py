@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存诊断对话框模块
+列出登记到内存预算的各个缓存和队列的当前占用、淘汰次数，可调整总预算
+"""
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+                               QProgressBar)
+from PySide6.QtCore import Qt, QTimer
+
+from ..core.memory_budget import MemoryBudget
+
+
+class MemoryDiagnosticsDialog(QDialog):
+    """内存诊断对话框类"""
+
+    # 表格列标题
+    HEADERS = ["使用方", "淘汰优先级", "占用", "可淘汰", "淘汰次数", "已淘汰"]
+
+    # 刷新间隔（毫秒）
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.budget = MemoryBudget.instance()
+
+        self.init_ui()
+        self.refresh()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(self.REFRESH_INTERVAL)
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle("内存使用")
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.resize(640, 320)
+
+        layout = QVBoxLayout(self)
+
+        # 总预算
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("内存预算(MB):"))
+        self.budget_spinbox = QSpinBox()
+        self.budget_spinbox.setRange(64, 1024 * 1024)
+        self.budget_spinbox.setValue(self.budget.budget_bytes // 1024 // 1024)
+        budget_layout.addWidget(self.budget_spinbox)
+        apply_button = QPushButton("应用")
+        apply_button.clicked.connect(self.apply_budget)
+        budget_layout.addWidget(apply_button)
+        budget_layout.addStretch()
+        layout.addLayout(budget_layout)
+
+        self.usage_bar = QProgressBar()
+        layout.addWidget(self.usage_bar)
+
+        # 各使用方
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.close)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    @staticmethod
+    def format_bytes(nbytes: int) -> str:
+        """格式化字节数"""
+        return f"{nbytes / 1024 / 1024:.1f} MB"
+
+    def refresh(self):
+        """刷新占用"""
+        snapshot = self.budget.snapshot()
+        budget_mb = snapshot['budget_bytes'] // 1024 // 1024
+        used_mb = snapshot['used_bytes'] // 1024 // 1024
+        self.usage_bar.setRange(0, max(1, budget_mb))
+        self.usage_bar.setValue(min(used_mb, budget_mb))
+        self.usage_bar.setFormat(f"已用 {self.format_bytes(snapshot['used_bytes'])} / "
+                                 f"{self.format_bytes(snapshot['budget_bytes'])}")
+
+        consumers = snapshot['consumers']
+        self.table.setRowCount(len(consumers))
+        for row, consumer in enumerate(consumers):
+            values = [
+                consumer['name'],
+                str(consumer['priority']),
+                self.format_bytes(consumer['bytes']),
+                "是" if consumer['evictable'] else "否",
+                str(consumer['evictions']),
+                self.format_bytes(consumer['evicted_bytes']),
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def apply_budget(self):
+        """应用新的总预算（超出时立即淘汰）"""
+        self.budget.set_budget(self.budget_spinbox.value())
+        self.refresh()
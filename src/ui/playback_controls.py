@@ -5,8 +5,10 @@
 包含播放/暂停、进度条、时间显示等功能
 """
 
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QSlider, QLabel
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QLabel
+from PySide6.QtCore import Signal
+
+from .timeline_slider import TimelineSlider
 
 
 class PlaybackControls(QWidget):
@@ -32,7 +34,7 @@ class PlaybackControls(QWidget):
         layout.addWidget(self.play_button)
         
         # 进度滑块
-        self.progress_slider = QSlider(Qt.Horizontal)
+        self.progress_slider = TimelineSlider()
         self.progress_slider.setMinimum(0)
         self.progress_slider.valueChanged.connect(self.progress_changed.emit)
         layout.addWidget(self.progress_slider)
@@ -55,6 +57,14 @@ class PlaybackControls(QWidget):
         """设置总时长"""
         self.progress_slider.setMaximum(total_frames - 1)
     
+    def set_scene_markers(self, cuts: list):
+        """设置镜头切换标记"""
+        self.progress_slider.set_markers(cuts)
+    
+    def set_thumbnail_strip(self, strip):
+        """设置进度条下方的缩略图条"""
+        self.progress_slider.set_thumbnail_strip(strip)
+    
     def update_position(self, frame_number: int, fps: float):
         """更新播放位置"""
         self.progress_slider.blockSignals(True)
@@ -73,5 +83,7 @@ class PlaybackControls(QWidget):
     def reset(self):
         """重置控件状态"""
         self.progress_slider.setValue(0)
+        self.progress_slider.clear_markers()
+        self.progress_slider.set_thumbnail_strip(None)
         self.time_label.setText("00:00 / 00:00")
         self.set_playing_state(False)
\ No newline at end of file
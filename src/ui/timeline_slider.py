@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时间轴滑块模块
+在进度条上标记镜头切换点，绘制缩略图条并在悬停时显示预览
+缩略图条占用计入全局内存预算，预算不足时最后被淘汰（淘汰后不再绘制，重新加载视频时重建）
+"""
+
+from typing import List
+import cv2
+from PySide6.QtWidgets import QSlider, QStyle, QStyleOptionSlider, QLabel
+from PySide6.QtCore import Qt, QPoint, QRect, Signal
+from PySide6.QtGui import QPainter, QPen, QColor, QImage, QPixmap
+
+from ..core.memory_budget import MemoryBudget
+
+
+class TimelineSlider(QSlider):
+    """时间轴滑块类"""
+
+    # 显示缩略图条时滑块的高度
+    STRIP_HEIGHT = 36
+
+    # 悬停预览宽度
+    PREVIEW_WIDTH = 200
+
+    # 内存预算要求释放缩略图条（可能在其他线程中发出，由界面线程清除）
+    strip_evicted = Signal()
+
+    def __init__(self):
+        super().__init__(Qt.Horizontal)
+        self.markers = []  # 标记的帧号列表
+        self.thumbnail_strip = None
+        self.strip_image = None  # 缩略图条雪碧图（QImage，RGB）
+        self.strip_bytes = 0
+        self.setMouseTracking(True)
+
+        self.strip_evicted.connect(lambda: self.set_thumbnail_strip(None))
+        self.memory = MemoryBudget.instance().register(
+            "缩略图条", MemoryBudget.PRIORITY_THUMBNAILS, lambda: self.strip_bytes, self.evict_strip)
+        memory = self.memory
+        self.destroyed.connect(lambda: memory.unregister())
+
+        # 悬停预览窗口
+        self.preview_label = QLabel(self, Qt.ToolTip)
+        self.preview_label.setStyleSheet("QLabel { border: 1px solid #888888; background: #000000; }")
+        self.preview_label.hide()
+
+    def set_markers(self, markers: List[int]):
+        """
+        设置标记帧号（如镜头切换点）
+
+        Args:
+            markers: 帧号列表
+        """
+        self.markers = list(markers)
+        self.update()
+
+    def clear_markers(self):
+        """清除所有标记"""
+        self.set_markers([])
+
+    def set_thumbnail_strip(self, strip):
+        """
+        设置缩略图条
+
+        Args:
+            strip: ThumbnailStrip 对象，None 表示清除
+        """
+        self.thumbnail_strip = strip
+        self.strip_image = None
+        self.strip_bytes = 0
+        # 缩略图数组和转换后的图像各一份；旧缩略图条已清除，申请时不会淘汰到自己
+        if strip is not None and not self.memory.request(strip.nbytes * 2):
+            print("内存预算不足，不显示缩略图条")
+            self.thumbnail_strip = strip = None
+        if strip is not None:
+            # 整条雪碧图只转换一次颜色，绘制时一次 drawImage 完成
+            rgb = cv2.cvtColor(strip.sprite(), cv2.COLOR_BGR2RGB)
+            h, w = rgb.shape[:2]
+            self.strip_image = QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888).copy()
+            self.strip_bytes = strip.nbytes + self.strip_image.sizeInBytes()
+        self.setMinimumHeight(self.STRIP_HEIGHT if strip is not None else 0)
+        self.preview_label.hide()
+        self.update()
+
+    def evict_strip(self, nbytes: int) -> int:
+        """
+        释放缩略图条（供内存预算调用）
+
+        Returns:
+            int: 释放的字节数
+        """
+        freed = self.strip_bytes
+        if freed:
+            self.strip_evicted.emit()
+        return freed
+
+    def value_to_x(self, value: int) -> int:
+        """将帧号换算为滑槽上的横坐标"""
+        groove, handle = self._groove_and_handle()
+        span = groove.width() - handle.width()
+        offset = QStyle.sliderPositionFromValue(self.minimum(), self.maximum(), value, span)
+        return groove.x() + handle.width() // 2 + offset
+
+    def x_to_value(self, x: int) -> int:
+        """将横坐标换算为帧号"""
+        groove, handle = self._groove_and_handle()
+        span = groove.width() - handle.width()
+        position = x - groove.x() - handle.width() // 2
+        return QStyle.sliderValueFromPosition(self.minimum(), self.maximum(), position, span)
+
+    def _groove_and_handle(self):
+        """获取滑槽和滑块的矩形区域"""
+        option = QStyleOptionSlider()
+        self.initStyleOption(option)
+        groove = self.style().subControlRect(QStyle.CC_Slider, option, QStyle.SC_SliderGroove, self)
+        handle = self.style().subControlRect(QStyle.CC_Slider, option, QStyle.SC_SliderHandle, self)
+        return groove, handle
+
+    def paintEvent(self, event):
+        """绘制缩略图条、滑块及标记"""
+        if self.strip_image is not None:
+            painter = QPainter(self)
+            painter.setOpacity(0.6)
+            groove, handle = self._groove_and_handle()
+            target = QRect(groove.x() + handle.width() // 2, 0,
+                           groove.width() - handle.width(), self.height())
+            painter.drawImage(target, self.strip_image)
+            painter.end()
+
+        super().paintEvent(event)
+        if not self.markers or self.maximum() <= self.minimum():
+            return
+
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor(255, 170, 0), 2))
+        for marker in self.markers:
+            x = self.value_to_x(marker)
+            painter.drawLine(x, 2, x, 7)
+            painter.drawLine(x, self.height() - 7, x, self.height() - 2)
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        """鼠标移动时显示悬停预览"""
+        super().mouseMoveEvent(event)
+        self.show_preview(event.position().toPoint())
+
+    def leaveEvent(self, event):
+        """鼠标离开时隐藏预览"""
+        super().leaveEvent(event)
+        self.preview_label.hide()
+
+    def show_preview(self, pos: QPoint):
+        """
+        显示鼠标位置对应的缩略图
+
+        Args:
+            pos: 鼠标在控件内的位置
+        """
+        if self.strip_image is None or self.maximum() <= self.minimum():
+            return
+
+        strip = self.thumbnail_strip
+        index = strip.nearest_index(self.x_to_value(pos.x()))
+        thumb_w, thumb_h = strip.thumb_size
+        thumb = self.strip_image.copy(index * thumb_w, 0, thumb_w, thumb_h)
+        pixmap = QPixmap.fromImage(thumb).scaledToWidth(self.PREVIEW_WIDTH, Qt.SmoothTransformation)
+
+        self.preview_label.setPixmap(pixmap)
+        self.preview_label.resize(pixmap.size())
+        global_pos = self.mapToGlobal(QPoint(pos.x() - pixmap.width() // 2, -pixmap.height() - 6))
+        self.preview_label.move(global_pos)
+        self.preview_label.show()
@@ -6,8 +6,10 @@
 """
 
 from PySide6.QtWidgets import QLabel, QSizePolicy
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QPainter
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QFont
+
+from ..core.perf_stats import PerfStats
 
 
 class VideoWidget(QLabel):
@@ -16,6 +18,9 @@ class VideoWidget(QLabel):
     def __init__(self):
         super().__init__()
         self.original_pixmap = None
+        self.roi = None  # 裁剪区域 (x, y, width, height)，原始帧坐标
+        self.source_size = None  # 原始帧尺寸 (width, height)，显示的画面可能是缩小的缓存帧
+        self.perf_overlay = False  # 是否叠加显示性能统计
         self.setup_ui()
     
     def setup_ui(self):
@@ -54,8 +59,79 @@ class VideoWidget(QLabel):
             Qt.SmoothTransformation
         )
         
+        if self.roi:
+            self.draw_roi_overlay(scaled_pixmap)
+        if self.perf_overlay:
+            self.draw_perf_overlay(scaled_pixmap)
+        
         self.setPixmap(scaled_pixmap)
     
+    def set_roi(self, roi):
+        """
+        设置裁剪区域叠加显示
+        
+        Args:
+            roi: 裁剪区域 (x, y, width, height)，None 表示不显示
+        """
+        self.roi = roi
+        self.update_display()
+    
+    def set_source_size(self, width: int, height: int):
+        """
+        设置原始帧尺寸（裁剪区域按原始帧坐标换算）
+        
+        Args:
+            width: 原始帧宽度
+            height: 原始帧高度
+        """
+        self.source_size = (width, height) if width > 0 and height > 0 else None
+    
+    def draw_roi_overlay(self, scaled_pixmap: QPixmap):
+        """在缩放后的图像上绘制裁剪区域，区域外部半透明遮罩"""
+        # 按原始帧宽度换算，磁盘缓存命中时显示的画面可能已缩小
+        source_width = self.source_size[0] if self.source_size else self.original_pixmap.width()
+        scale = scaled_pixmap.width() / source_width
+        x, y, w, h = self.roi
+        rect = QRectF(x * scale, y * scale, w * scale, h * scale)
+        
+        painter = QPainter(scaled_pixmap)
+        mask = QColor(0, 0, 0, 120)
+        full_w, full_h = scaled_pixmap.width(), scaled_pixmap.height()
+        painter.fillRect(QRectF(0, 0, full_w, rect.top()), mask)
+        painter.fillRect(QRectF(0, rect.bottom(), full_w, full_h - rect.bottom()), mask)
+        painter.fillRect(QRectF(0, rect.top(), rect.left(), rect.height()), mask)
+        painter.fillRect(QRectF(rect.right(), rect.top(), full_w - rect.right(), rect.height()), mask)
+        painter.setPen(QPen(QColor(0, 200, 255), 2, Qt.DashLine))
+        painter.drawRect(rect)
+        painter.end()
+    
+    def set_perf_overlay(self, enabled: bool):
+        """
+        设置是否叠加显示性能统计（每次显示新帧时刷新）
+        
+        Args:
+            enabled: 是否显示
+        """
+        self.perf_overlay = enabled
+        self.update_display()
+    
+    def draw_perf_overlay(self, scaled_pixmap: QPixmap):
+        """在缩放后的图像左上角绘制各阶段最近一次耗时、平均值和 p95"""
+        lines = PerfStats.summary_lines()
+        if not lines:
+            return
+        painter = QPainter(scaled_pixmap)
+        font = QFont("monospace", 9)
+        font.setStyleHint(QFont.Monospace)
+        painter.setFont(font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().horizontalAdvance(line) for line in lines) + 12
+        painter.fillRect(QRectF(4, 4, width, line_height * len(lines) + 8), QColor(0, 0, 0, 160))
+        painter.setPen(QColor(0, 255, 120))
+        for i, line in enumerate(lines):
+            painter.drawText(10, 8 + line_height * (i + 1) - painter.fontMetrics().descent(), line)
+        painter.end()
+    
     def resizeEvent(self, event):
         """窗口大小变化事件"""
         super().resizeEvent(event)
@@ -64,5 +140,6 @@ class VideoWidget(QLabel):
     def clear_frame(self):
         """清除显示内容"""
         self.original_pixmap = None
+        self.source_size = None
         self.clear()
         self.setText("拖拽视频文件到此处\n或点击\"打开视频文件\"按钮")
\ No newline at end of file
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务模块
+在工作线程中运行耗时的核心任务，通过信号把结果送回界面线程；
+任务本身按优先级类别提交到 TaskScheduler 的线程池执行（统计排队延迟，后台任务不占用交互任务的线程），
+逐帧处理的任务在每帧的进度回调中让出给交互跳转和播放（TaskScheduler.yield_point）
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+from PySide6.QtCore import QThread, Signal
+
+from ..core.batch_exporter import BatchExporter
+from ..core.border_detector import BorderDetector
+from ..core.contact_sheet import ContactSheetExporter
+from ..core.job_runner import BatchJobRunner
+from ..core.media_catalog import MediaCatalog
+from ..core.media_prober import MediaProber
+from ..core.scene_detector import SceneDetector
+from ..core.task_scheduler import TaskScheduler
+from ..core.thumbnail_strip import ThumbnailStrip, ThumbnailStripBuilder
+from ..utils.image_utils import ImageUtils
+
+
+class ScheduledWorker(QThread):
+    """在 TaskScheduler 线程池中执行任务的线程基类（线程本身只等待结果并发送信号）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.future = None
+
+    def run_scheduled(self, priority: int, fn, *args, **kwargs):
+        """
+        把任务提交到 TaskScheduler 并等待结果（在 run 中调用）
+
+        Args:
+            priority: 优先级类别（TaskScheduler.PRIORITY_*）
+            fn: 任务函数
+
+        Returns:
+            任务函数的返回值，任务在开始前被撤回时返回None
+        """
+        self.future = TaskScheduler.instance().submit(priority, fn, *args, **kwargs)
+        try:
+            return self.future.result()
+        except CancelledError:
+            return None
+
+    def withdraw(self):
+        """撤回仍在排队的任务（已开始的任务由各自的取消标志停止），等待线程的调用方不必等后台任务让出线程"""
+        if self.future is not None:
+            self.future.cancel()
+
+
+class VideoLoadWorker(ScheduledWorker):
+    """视频加载线程类（打开文件、探测并解码首帧）
+
+    打开视频无法中途打断；取消后加载结果直接归还句柄池，不再发送信号
+    """
+
+    # 信号定义
+    loaded = Signal(object)  # 加载完成，参数为 VideoProcessor.open_video 的结果（失败为None）
+
+    def __init__(self, processor, video_path: str, parent=None):
+        super().__init__(parent)
+        self.processor = processor
+        self.video_path = video_path
+        self.cancelled = False
+
+    def run(self):
+        """线程入口"""
+        opened = self.run_scheduled(TaskScheduler.PRIORITY_INTERACTIVE, self.processor.open_video, self.video_path)
+        if self.cancelled:
+            if opened:
+                self.processor.discard_video(opened)
+            return
+        self.loaded.emit(opened)
+
+    def cancel(self):
+        """取消加载"""
+        self.cancelled = True
+        self.withdraw()
+
+
+class BorderDetectWorker(ScheduledWorker):
+    """黑边检测线程类
+
+    检测只采样少量帧，无法中途打断；取消后不再发送信号
+    """
+
+    # 信号定义
+    detected = Signal(object)  # 检测完成，参数为有效区域 (x, y, width, height)，无黑边为None
+
+    def __init__(self, video_path: str, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.cancelled = False
+
+    def run(self):
+        """线程入口"""
+        roi = self.run_scheduled(TaskScheduler.PRIORITY_INDEX, BorderDetector.detect, self.video_path)
+        if not self.cancelled:
+            self.detected.emit(roi)
+
+    def cancel(self):
+        """取消检测"""
+        self.cancelled = True
+        self.withdraw()
+
+
+class SharpestFrameWorker(ScheduledWorker):
+    """最清晰帧查找线程类（在当前位置附近的窗口内逐帧解码评分）
+
+    窗口较小，无法中途打断；取消后不再发送信号
+    """
+
+    # 信号定义
+    found = Signal(object)  # 查找完成，参数为 (帧号, BGR帧)，失败为None
+
+    def __init__(self, processor, video_path: str, center: int, radius: int, parent=None):
+        super().__init__(parent)
+        self.processor = processor
+        self.video_path = video_path
+        self.center = center
+        self.radius = radius
+        self.cancelled = False
+
+    def run(self):
+        """线程入口"""
+        best = self.run_scheduled(TaskScheduler.PRIORITY_INTERACTIVE, self.processor.find_sharpest_frame,
+                                  self.video_path, self.center, self.radius)
+        if not self.cancelled:
+            self.found.emit(best)
+
+    def cancel(self):
+        """取消查找"""
+        self.cancelled = True
+        self.withdraw()
+
+
+class SceneDetectWorker(ScheduledWorker):
+    """镜头切换检测线程类"""
+
+    # 信号定义
+    progress = Signal(int, int)     # 进度 (当前帧号, 总帧数)
+    scenes_detected = Signal(list)  # 检测完成，参数为镜头起始帧列表
+
+    def __init__(self, video_path: str, method: str = 'luma', parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.detector = SceneDetector(method=method)
+        self.last_percent = -1
+
+    def run(self):
+        """线程入口"""
+        cuts = self.run_scheduled(TaskScheduler.PRIORITY_INDEX, self.detector.detect, self.video_path,
+                                  self.on_progress)
+        if not self.detector.cancelled:
+            self.scenes_detected.emit(cuts)
+
+    def on_progress(self, frame_number: int, total_frames: int):
+        """进度回调，按百分比节流后再发送信号"""
+        TaskScheduler.instance().yield_point(TaskScheduler.PRIORITY_INDEX, lambda: self.detector.cancelled)
+        percent = frame_number * 100 // max(1, total_frames)
+        if percent != self.last_percent:
+            self.last_percent = percent
+            self.progress.emit(frame_number, total_frames)
+
+    def cancel(self):
+        """取消检测"""
+        self.detector.cancel()
+        self.withdraw()
+
+
+class ThumbnailStripWorker(ScheduledWorker):
+    """缩略图条生成线程类"""
+
+    # 信号定义
+    progress = Signal(int, int)     # 进度 (已生成数量, 计划数量)
+    strip_ready = Signal(object)    # 生成完成，参数为 ThumbnailStrip
+
+    def __init__(self, video_path: str, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.builder = ThumbnailStripBuilder()
+
+    def run(self):
+        """线程入口"""
+        strip = self.run_scheduled(TaskScheduler.PRIORITY_INDEX, self.builder.build, self.video_path,
+                                   self.on_progress)
+        if strip is not None and not self.builder.cancelled:
+            self.strip_ready.emit(strip)
+            # 记录到媒体库（文件已在媒体库中时）
+            catalog = MediaCatalog()
+            catalog.update(self.video_path, has_index=1, thumbnail_path=ThumbnailStrip.cache_path(
+                self.video_path, self.builder.count, self.builder.thumb_width))
+            catalog.close()
+
+    def on_progress(self, done: int, total: int):
+        """进度回调：让出后发送信号"""
+        TaskScheduler.instance().yield_point(TaskScheduler.PRIORITY_INDEX, lambda: self.builder.cancelled)
+        self.progress.emit(done, total)
+
+    def cancel(self):
+        """取消生成"""
+        self.builder.cancel()
+        self.withdraw()
+
+
+class ContactSheetWorker(ScheduledWorker):
+    """拼版图导出线程类"""
+
+    # 信号定义
+    progress = Signal(int, int)     # 进度 (已完成格子数, 总格子数)
+    finished_export = Signal(object)  # 导出完成，参数为索引信息（失败为None）
+
+    def __init__(self, video_path: str, output_path: str, roi=None, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.output_path = output_path
+        self.exporter = ContactSheetExporter(format_name=ImageUtils.get_format_from_extension(output_path),
+                                             roi=roi)
+
+    def run(self):
+        """线程入口"""
+        index = self.run_scheduled(TaskScheduler.PRIORITY_BATCH, self.exporter.export, self.video_path,
+                                   self.output_path, progress_callback=self.on_progress)
+        if not self.exporter.cancelled:
+            self.finished_export.emit(index)
+
+    def on_progress(self, done: int, total: int):
+        """进度回调：让出后发送信号"""
+        TaskScheduler.instance().yield_point(TaskScheduler.PRIORITY_BATCH, lambda: self.exporter.cancelled)
+        self.progress.emit(done, total)
+
+    def cancel(self):
+        """取消导出"""
+        self.exporter.cancel()
+        self.withdraw()
+
+
+class BatchExportWorker(ScheduledWorker):
+    """单个视频批量导出线程类（支持暂停和取消）"""
+
+    # 信号定义
+    progress = Signal(object)         # 进度信息，见 on_progress
+    export_finished = Signal(object)  # 导出结束，参数为 BatchExporter 的统计信息
+
+    # 进度信号的最小间隔（秒），避免每帧一个信号占满界面线程
+    EMIT_INTERVAL = 0.2
+
+    def __init__(self, settings: dict, video_path: str, output_dir: str, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.output_dir = output_dir
+        self.exporter = BatchExporter(settings, progress_callback=self.on_progress)
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self.start_time = 0.0
+        self.paused_seconds = 0.0
+        self.last_emit = 0.0
+
+    def run(self):
+        """线程入口"""
+        self.start_time = time.monotonic()
+        stats = self.run_scheduled(TaskScheduler.PRIORITY_BATCH, self.exporter.export_video, self.video_path,
+                                   self.output_dir)
+        if stats is None:
+            # 开始前已取消
+            stats = {'video': self.video_path, 'frames_exported': 0, 'bytes_written': 0, 'elapsed_seconds': 0.0}
+        self.export_finished.emit(stats)
+
+    def on_progress(self, processed: int, planned: int):
+        """
+        导出进度回调（在工作线程中每帧调用一次）
+
+        暂停时在此等待，导出在帧边界停住；有交互跳转或播放时让出（让出时间与暂停一样不计入速度）；
+        按间隔发送包含 processed、planned、frames_exported、bytes_written、frames_per_second、
+        mb_per_second、eta_seconds 的进度信息
+        """
+        if not self.resume_event.is_set():
+            paused_at = time.monotonic()
+            self.resume_event.wait()
+            self.paused_seconds += time.monotonic() - paused_at
+        self.paused_seconds += TaskScheduler.instance().yield_point(
+            TaskScheduler.PRIORITY_BATCH, lambda: self.exporter.cancelled)
+
+        now = time.monotonic()
+        if now - self.last_emit < self.EMIT_INTERVAL and processed < planned:
+            return
+        self.last_emit = now
+
+        # 速度和剩余时间不计暂停的时间
+        elapsed = max(now - self.start_time - self.paused_seconds, 1e-9)
+        stats = self.exporter.current_stats
+        rate = processed / elapsed
+        self.progress.emit({
+            'processed': processed,
+            'planned': planned,
+            'frames_exported': stats['frames_exported'],
+            'bytes_written': stats['bytes_written'],
+            'frames_per_second': rate,
+            'mb_per_second': stats['bytes_written'] / 1024 / 1024 / elapsed,
+            'eta_seconds': (planned - processed) / rate if rate > 0 and planned > processed else 0.0,
+        })
+
+    def pause(self):
+        """暂停（在下一帧边界生效）"""
+        self.resume_event.clear()
+
+    def resume(self):
+        """继续"""
+        self.resume_event.set()
+
+    def is_paused(self) -> bool:
+        """是否已暂停"""
+        return not self.resume_event.is_set()
+
+    def cancel(self):
+        """取消导出（暂停中也会立即结束等待）"""
+        self.exporter.cancel()
+        self.resume_event.set()
+        self.withdraw()
+
+
+class BatchJobWorker(QThread):
+    """目录批量导出线程类（任务本身在子进程中运行）"""
+
+    # 信号定义
+    job_finished = Signal(int, int, object)  # 单个文件完成 (已完成数, 总数, 该文件统计)
+    preview_ready = Signal(str, int, object)  # 子进程刚导出的帧 (视频路径, 帧号, 缩小的BGR帧)
+    batch_finished = Signal(object)          # 全部完成，参数为汇总信息
+
+    def __init__(self, settings: dict, directory: str, output_root: str, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.output_root = output_root
+        self.runner = BatchJobRunner(settings, progress_callback=self.job_finished.emit,
+                                     preview_callback=self.preview_ready.emit)
+
+    def run(self):
+        """线程入口"""
+        jobs = self.runner.plan_jobs(self.directory, self.output_root)
+        self.batch_finished.emit(self.runner.run(jobs))
+
+    def cancel(self):
+        """取消批量导出"""
+        self.runner.cancel()
+
+
+class CatalogScanWorker(QThread):
+    """媒体库扫描线程类"""
+
+    # 信号定义
+    progress = Signal(int)          # 已扫描的视频数量
+    scan_finished = Signal(int)     # 扫描完成，参数为视频数量
+
+    # 进度信号的最小间隔（秒），避免大目录扫描时信号过多
+    EMIT_INTERVAL = 0.2
+
+    def __init__(self, catalog, directory: str, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.directory = directory
+        self.cancelled = False
+
+    def run(self):
+        """线程入口"""
+        count = 0
+        last_emit = 0.0
+        for _ in MediaProber(self.catalog).scan(self.directory):
+            if self.cancelled:
+                break
+            count += 1
+            now = time.monotonic()
+            if now - last_emit >= self.EMIT_INTERVAL:
+                last_emit = now
+                self.progress.emit(count)
+        self.catalog.remove_missing(self.directory)
+        self.scan_finished.emit(count)
+
+    def cancel(self):
+        """取消扫描"""
+        self.cancelled = True
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存工具模块
+提供本地缓存目录和按视频文件区分的缓存路径
+"""
+
+import hashlib
+import os
+import platform
+from typing import Optional
+
+from .file_utils import FileUtils
+
+
+class CacheUtils:
+    """缓存工具类"""
+
+    # 缓存目录名
+    APP_CACHE_DIR = "video-frame-extractor"
+
+    # 环境变量：覆盖默认缓存目录
+    CACHE_DIR_ENV = "VFE_CACHE_DIR"
+
+    @staticmethod
+    def get_cache_dir(subdir: str = "") -> str:
+        """
+        获取缓存目录（不存在时创建）
+
+        Args:
+            subdir: 子目录名
+
+        Returns:
+            str: 缓存目录路径
+        """
+        base = os.environ.get(CacheUtils.CACHE_DIR_ENV)
+        if not base:
+            system = platform.system()
+            if system == "Windows":
+                root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            elif system == "Darwin":
+                root = os.path.expanduser("~/Library/Caches")
+            else:
+                root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+            base = os.path.join(root, CacheUtils.APP_CACHE_DIR)
+
+        directory = os.path.join(base, subdir) if subdir else base
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def get_video_key(video_path: str) -> Optional[str]:
+        """
+        根据视频文件签名（路径、大小、修改时间）生成缓存键，文件变化后键随之变化
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            str: 缓存键，文件不存在返回None
+        """
+        signature = FileUtils.get_file_signature(video_path)
+        if signature is None:
+            return None
+        text = "|".join(str(part) for part in signature)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_video_cache_path(video_path: str, subdir: str, suffix: str) -> Optional[str]:
+        """
+        获取视频的缓存文件路径
+
+        Args:
+            video_path: 视频文件路径
+            subdir: 缓存子目录
+            suffix: 文件名后缀（含扩展名）
+
+        Returns:
+            str: 缓存文件路径，文件不存在返回None
+        """
+        key = CacheUtils.get_video_key(video_path)
+        if key is None:
+            return None
+        return os.path.join(CacheUtils.get_cache_dir(subdir), f"{key}{suffix}")
+
+    @staticmethod
+    def trim_cache_dir(directory: str, max_bytes: int, keep: Optional[str] = None) -> int:
+        """
+        按修改时间从旧到新删除缓存文件，直到目录总大小不超过上限
+
+        Args:
+            directory: 缓存目录（只处理其中的文件，不递归）
+            max_bytes: 总大小上限（字节）
+            keep: 不删除的文件（如刚写入的缓存）
+
+        Returns:
+            int: 删除的字节数
+        """
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            print(f"读取缓存目录失败: {e}")
+            return 0
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if keep and os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            freed += size
+        return freed
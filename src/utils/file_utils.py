@@ -5,8 +5,9 @@
 提供文件路径处理、格式验证等工具函数
 """
 
+import hashlib
 import os
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 
 class FileUtils:
@@ -33,30 +34,57 @@ class FileUtils:
         return ext in FileUtils.SUPPORTED_VIDEO_FORMATS
     
     @staticmethod
-    def get_video_files_in_directory(directory: str) -> List[str]:
+    def scan_video_files(directory: str, recursive: bool = True) -> Iterator[Tuple[str, int, int]]:
+        """
+        扫描目录中的视频文件（基于 os.scandir，边扫描边返回）
+        
+        目录项自带文件类型信息，只对扩展名匹配的文件取一次 stat；
+        不跟随目录符号链接，避免循环
+        
+        Args:
+            directory: 目录路径
+            recursive: 是否包含子目录
+            
+        Yields:
+            Tuple[str, int, int]: (文件路径, 文件大小, 修改时间纳秒)
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    subdirs.append(entry.path)
+                            elif FileUtils.is_video_file(entry.name) and entry.is_file():
+                                stat = entry.stat()
+                                yield entry.path, stat.st_size, stat.st_mtime_ns
+                        except OSError:
+                            continue
+            except OSError as e:
+                print(f"读取目录失败: {e}")
+                continue
+            # 逆序入栈，使子目录按名称顺序遍历
+            stack.extend(sorted(subdirs, reverse=True))
+    
+    @staticmethod
+    def get_video_files_in_directory(directory: str, recursive: bool = False) -> List[str]:
         """
         获取目录中的所有视频文件
         
         Args:
             directory: 目录路径
+            recursive: 是否包含子目录
             
         Returns:
             List[str]: 视频文件路径列表
         """
-        video_files = []
-        
         if not os.path.isdir(directory):
-            return video_files
-            
-        try:
-            for filename in os.listdir(directory):
-                file_path = os.path.join(directory, filename)
-                if os.path.isfile(file_path) and FileUtils.is_video_file(file_path):
-                    video_files.append(file_path)
-        except Exception as e:
-            print(f"读取目录失败: {e}")
-            
-        return sorted(video_files)
+            return []
+        return sorted(path for path, _, _ in FileUtils.scan_video_files(directory, recursive))
     
     @staticmethod
     def generate_output_filename(video_path: str, frame_number: int, 
@@ -75,6 +103,47 @@ class FileUtils:
         video_name = os.path.splitext(os.path.basename(video_path))[0]
         return f"{video_name}_frame_{frame_number:06d}.{output_format}"
     
+    @staticmethod
+    def get_file_signature(file_path: str) -> Optional[Tuple[str, int, int]]:
+        """
+        获取文件签名，用于判断文件是否变化（缓存键）
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            Tuple[str, int, int]: (绝对路径, 文件大小, 修改时间纳秒)，文件不存在返回None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    
+    @staticmethod
+    def get_content_fingerprint(file_path: str, sample_size: int = 65536) -> Optional[str]:
+        """
+        获取文件内容指纹（文件大小 + 首尾各一段数据的哈希），文件移动或改名后不变
+        
+        Args:
+            file_path: 文件路径
+            sample_size: 首尾各读取的字节数
+            
+        Returns:
+            str: 指纹字符串，读取失败返回None
+        """
+        try:
+            size = os.path.getsize(file_path)
+            digest = hashlib.sha1(str(size).encode('ascii'))
+            with open(file_path, 'rb') as f:
+                digest.update(f.read(sample_size))
+                if size > sample_size:
+                    f.seek(max(sample_size, size - sample_size))
+                    digest.update(f.read(sample_size))
+        except OSError:
+            return None
+        return digest.hexdigest()
+    
     @staticmethod
     def ensure_directory_exists(file_path: str):
         """